@@ -1,47 +1,322 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
 import pandas as pd
 import numpy as np
-import networkx as nx
-import os
+from scipy.linalg import eigh
+from scipy.spatial.distance import cdist
+
+from heroes_cache import default_cache_path, load_cache, source_hashes
+
+# Layout cache lives inside the instance cache directory
+LAYOUT_DIR = 'layouts'
+
+def symmetric_distances(dist_full: np.ndarray, rows=None, cols=None) -> np.ndarray:
+    """
+    Float block of the symmetrized distance matrix (D + D.T) / 2, without materializing the full float matrix
+    """
+
+    rows = np.arange(dist_full.shape[0]) if rows is None else np.asarray(rows)
+    cols = np.arange(dist_full.shape[1]) if cols is None else np.asarray(cols)
+    block = (np.asarray(dist_full[np.ix_(rows, cols)], dtype=float) + np.asarray(dist_full[np.ix_(cols, rows)], dtype=float).T) / 2
+    block[rows[:, None] == cols[None, :]] = 0
+    return block
+
+def classical_mds(dist: np.ndarray, n_components: int = 2) -> np.ndarray:
+    """
+    Classical (Torgerson) MDS: double-centred squared distances, top eigenvectors scaled by sqrt of eigenvalues
+    """
+
+    n = dist.shape[0]
+    squared = dist ** 2
+    # B = -1/2 J D^2 J, done with row/column means instead of building J
+    row_mean = squared.mean(axis=1)
+    B = -0.5 * (squared - row_mean[:, None] - row_mean[None, :] + squared.mean())
+
+    eigenvalues, eigenvectors = eigh(B, subset_by_index=[n - n_components, n - 1])
+    order = np.argsort(eigenvalues)[::-1]
+    return eigenvectors[:, order] * np.sqrt(np.maximum(eigenvalues[order], 0))
+
+def select_landmarks(dist_full: np.ndarray, num_landmarks: int, seed: int = 0) -> np.ndarray:
+    """
+    MaxMin landmark selection: start from a random node, then repeatedly take the node farthest from chosen ones
+    """
+
+    num_nodes = dist_full.shape[0]
+    rng = np.random.default_rng(seed)
+    landmarks = [int(rng.integers(num_nodes))]
+    min_dist = symmetric_distances(dist_full, landmarks)[0]
+    for _ in range(min(num_landmarks, num_nodes) - 1):
+        landmarks.append(int(np.argmax(min_dist)))
+        min_dist = np.minimum(min_dist, symmetric_distances(dist_full, landmarks[-1:])[0])
+    return np.array(landmarks)
+
+def landmark_mds(dist_full: np.ndarray, num_landmarks: int, seed: int = 0, chunk_size: int = 4096) -> np.ndarray:
+    """
+    Landmark MDS (de Silva & Tenenbaum): classical MDS on landmarks, other nodes placed by distance-based triangulation
+    Only num_nodes x num_landmarks distances are touched, so it scales to instances with tens of thousands of objects
+    """
+
+    landmarks = select_landmarks(dist_full, num_landmarks, seed)
+    landmark_squared = symmetric_distances(dist_full, landmarks, landmarks) ** 2
+
+    landmark_coords = classical_mds(np.sqrt(landmark_squared))
+    # Pseudo-inverse of landmark embedding: L# = coords / eigenvalues (eigenvalue_i = |coords_i|^2)
+    pseudo_inverse = landmark_coords / np.maximum((landmark_coords ** 2).sum(axis=0), 1e-12)
+    mean_squared = landmark_squared.mean(axis=0)
+
+    coords = np.zeros((dist_full.shape[0], landmark_coords.shape[1]))
+    for start in range(0, dist_full.shape[0], chunk_size):
+        rows = np.arange(start, min(start + chunk_size, dist_full.shape[0]))
+        squared = symmetric_distances(dist_full, rows, landmarks) ** 2
+        coords[rows] = -0.5 * (squared - mean_squared[None, :]) @ pseudo_inverse
+    return coords
+
+def smacof(dist: np.ndarray, init: np.ndarray, max_iter: int = 300, eps: float = 1e-6) -> np.ndarray:
+    """
+    Stress majorization (SMACOF, unit weights): repeated Guttman transform X = B(X) X / n until stress stops improving
+    """
+
+    n = dist.shape[0]
+    coords = init.copy()
+    previous_stress = np.inf
+    for _ in range(max_iter):
+        embedded = cdist(coords, coords)
+        stress = ((dist - embedded) ** 2).sum() / 2
+        if previous_stress - stress < eps * previous_stress:
+            break
+        previous_stress = stress
+
+        ratio = np.divide(dist, embedded, out=np.zeros_like(dist), where=embedded > 0)
+        B = -ratio
+        B[np.diag_indices(n)] = ratio.sum(axis=1)
+        coords = B @ coords / n
+    return coords
+
+def layout_stress(dist_full: np.ndarray, coords: np.ndarray, sample_rows: int = None, seed: int = 0,
+                  chunk_size: int = 2048) -> float:
+    """
+    Kruskal stress-1 of a layout, sqrt(sum (d - |xi - xj|)^2 / sum d^2), computed in row chunks
+    Scale-free only after the best uniform rescaling of coords, so layouts in different units compare fairly
+    With sample_rows it is estimated from a random subset of rows (large instances)
+    """
+
+    all_rows = np.arange(dist_full.shape[0])
+    if sample_rows is not None and sample_rows < len(all_rows):
+        all_rows = np.sort(np.random.default_rng(seed).choice(all_rows, sample_rows, replace=False))
+
+    # Accumulate terms of sum (d - s * e)^2 for the optimal scale s = sum(d e) / sum(e^2)
+    sum_dd = sum_de = sum_ee = 0.0
+    for start in range(0, len(all_rows), chunk_size):
+        rows = all_rows[start:start + chunk_size]
+        dist = symmetric_distances(dist_full, rows)
+        embedded = cdist(coords[rows], coords)
+        sum_dd += (dist ** 2).sum()
+        sum_de += (dist * embedded).sum()
+        sum_ee += (embedded ** 2).sum()
+
+    scale = sum_de / sum_ee if sum_ee > 0 else 0
+    return float(np.sqrt(max(sum_dd - 2 * scale * sum_de + scale ** 2 * sum_ee, 0) / sum_dd)) if sum_dd > 0 else 0.0
+
+def compute_layout(dist_full, method='smacof', landmarks=None, max_iter=300, seed=0, init=None) -> np.ndarray:
+    """
+    Layout in distance units, init (if given) replaces classical MDS as SMACOF starting point
+    """
+
+    if landmarks:
+        # Large instances: only distances to landmarks are used, no full float matrix
+        print(f"Running landmark MDS with {landmarks} landmarks...")
+        return landmark_mds(dist_full, landmarks, seed)
 
-def generate_coords():
-    print("Loading distance matrices...")
-    dist_objects = pd.read_csv('dist_objects.csv')
-    dist_start = pd.read_csv('dist_start.csv')
-    
-    num_objects = len(dist_objects)
-    full_dist_matrix = np.zeros((num_objects + 1, num_objects + 1))
-    
-    # Fill object-to-object distances
-    dist_matrix_objs = dist_objects.select_dtypes(include=[np.number]).to_numpy()
-    full_dist_matrix[1:, 1:] = dist_matrix_objs
-    
-    # Fill depot-to-object and object-to-depot distances
-    dist_start_arr = dist_start['dist_start'].to_numpy()
-    full_dist_matrix[0, 1:] = dist_start_arr
-    full_dist_matrix[1:, 0] = dist_start_arr
-    
     # Ensure symmetry just in case
-    full_dist_matrix = (full_dist_matrix + full_dist_matrix.T) / 2
-    full_dist_matrix[np.diag_indices_from(full_dist_matrix)] = 0
-    
-    print("Running Kamada-Kawai layout (force-directed) via NetworkX...")
-    # Kamada-Kawai layout works well directly on distance matrices
-    # Treat the distance matrix as shortest path distances
-    G = nx.from_numpy_array(full_dist_matrix)
-    
-    # Use kamada_kawai_layout, which tries to map graph distances to geometric distances
-    pos = nx.kamada_kawai_layout(G, dist=dict(nx.all_pairs_dijkstra_path_length(G, weight='weight')))
-    
-    # Extract coordinates
-    coords = np.zeros((num_objects + 1, 2))
-    for i in range(num_objects + 1):
-        coords[i] = [pos[i][0], pos[i][1]]
-    
-    print("Saving to coords.csv...")
-    coords_df = pd.DataFrame(coords, columns=['x', 'y'])
-    coords_df.to_csv('coords.csv', index_label='node_id')
+    full_dist_matrix = symmetric_distances(dist_full)
+
+    if init is None or method != 'smacof':
+        print("Running classical MDS (eigendecomposition)...")
+        init = classical_mds(full_dist_matrix)
+        if method != 'smacof':
+            return init
+    else:
+        print("Warm start from previous layout...")
+
+    print("Refining with stress majorization (SMACOF)...")
+    return smacof(full_dist_matrix, init, max_iter)
+
+def layout_params(method='smacof', landmarks=None, max_iter=300, seed=0) -> dict:
+    return {'method': method, 'landmarks': landmarks, 'max_iter': max_iter, 'seed': seed}
+
+def distance_hash(data_path='') -> str:
+    """
+    Content hash of the two distance inputs (taken from the instance cache, no re-hashing of CSVs)
+    """
+
+    hashes = source_hashes(data_path)
+    return hashlib.sha256(f"{hashes['dist_objects.csv']}:{hashes['dist_start.csv']}".encode()).hexdigest()
+
+def block_hash(dist_full, num_nodes: int, chunk_size: int = 4096) -> str:
+    """
+    Content hash of the leading num_nodes x num_nodes distance block, hashed in row chunks (dist_full may be memory-mapped)
+    """
+
+    digest = hashlib.sha256(str(num_nodes).encode())
+    for start in range(0, num_nodes, chunk_size):
+        rows = np.asarray(dist_full[start:min(start + chunk_size, num_nodes), :num_nodes], dtype=np.int64)
+        digest.update(np.ascontiguousarray(rows).tobytes())
+    return digest.hexdigest()
+
+def layout_key(dist_hash: str, params: dict) -> str:
+    return hashlib.sha256(json.dumps({'dist': dist_hash, 'params': params}, sort_keys=True).encode()).hexdigest()[:16]
+
+def layout_cache_path(data_path='') -> str:
+    return f'{default_cache_path(data_path)}{LAYOUT_DIR}/'
+
+def read_layout_index(layout_path: str) -> dict:
+    try:
+        with open(f'{layout_path}index.json') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'layouts': {}, 'outputs': {}}
+
+def write_layout_index(layout_path: str, index: dict):
+    # Atomic swap, same as the instance cache
+    suffix = f'.{os.getpid()}.tmp'
+    with open(f'{layout_path}index.json{suffix}', 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(f'{layout_path}index.json{suffix}', f'{layout_path}index.json')
+
+def warm_start_coords(dist_full, previous: np.ndarray, neighbours: int = 3) -> np.ndarray:
+    """
+    Initial layout from a previous one: known nodes keep their coordinates, added nodes (ids past the previous
+    ones) start at the distance-weighted mean of their nearest known nodes
+    """
+
+    num_nodes, num_known = dist_full.shape[0], previous.shape[0]
+    init = np.zeros((num_nodes, previous.shape[1]))
+    init[:num_known] = previous
+    if num_nodes > num_known:
+        dist = symmetric_distances(dist_full, np.arange(num_known, num_nodes), np.arange(num_known))
+        k = min(neighbours, num_known)
+        nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        weights = 1 / (np.take_along_axis(dist, nearest, axis=1) + 1)
+        init[num_known:] = (previous[nearest] * weights[:, :, None]).sum(axis=1) / weights.sum(axis=1, keepdims=True)
+    return init
+
+def find_warm_start(layout_path: str, index: dict, params: dict, dist_full):
+    """
+    Largest cached layout with the same parameters, no more nodes than now and the same distances between its nodes
+    (leading block of dist_full, see block_hash), most recent wins ties, or None
+    """
+
+    candidates = sorted(((entry['num_nodes'], entry['created'], key) for key, entry in index['layouts'].items()
+                         if entry['params'] == params and entry['num_nodes'] <= dist_full.shape[0]
+                         and 'block_hash' in entry and os.path.exists(f'{layout_path}{key}.npy')), reverse=True)
+    block_hashes = {}
+    for num_nodes, _, key in candidates:
+        if num_nodes not in block_hashes:
+            block_hashes[num_nodes] = block_hash(dist_full, num_nodes)
+        if index['layouts'][key]['block_hash'] == block_hashes[num_nodes]:
+            return np.load(f'{layout_path}{key}.npy')
+    return None
+
+def generate_coords(method='smacof', landmarks=None, max_iter=300, seed=0, data_path='', output_path='coords.csv',
+                    use_cache=True):
+    print("Loading distance matrices...")
+    # Binary cache is memory-mapped, CSVs are only parsed when the cache is missing or stale
+    cache = load_cache(data_path)
+
+    # Depot-to-object and object-to-depot distances are already row/column 0
+    dist_full = cache['dist_full']
+    num_objects = dist_full.shape[0] - 1
+
+    # Layout cache keyed by distance content hash and layout parameters
+    params = layout_params(method, landmarks, max_iter, seed)
+    dist_hash = distance_hash(data_path)
+    key = layout_key(dist_hash, params)
+    layout_path = layout_cache_path(data_path)
+    index = read_layout_index(layout_path)
+
+    if use_cache and key in index['layouts'] and os.path.exists(f'{layout_path}{key}.npy'):
+        print("Layout found in cache, distances and parameters unchanged")
+        coords = np.load(f'{layout_path}{key}.npy')
+        stress = index['layouts'][key]['stress']
+    else:
+        previous = find_warm_start(layout_path, index, params, dist_full) if use_cache else None
+        init = warm_start_coords(dist_full, previous) if previous is not None else None
+        coords = compute_layout(dist_full, method, landmarks, max_iter, seed, init)
+
+        # Exact stress is O(n^2) too, landmark mode estimates it from a row sample
+        sample_rows = 2000 if landmarks else None
+        stress = layout_stress(dist_full, coords, sample_rows, seed)
+
+        if use_cache:
+            os.makedirs(layout_path, exist_ok=True)
+            suffix = f'.{os.getpid()}.tmp'
+            with open(f'{layout_path}{key}.npy{suffix}', 'wb') as f:
+                np.save(f, coords)
+            os.replace(f'{layout_path}{key}.npy{suffix}', f'{layout_path}{key}.npy')
+            index['layouts'][key] = {'dist_hash': dist_hash, 'params': params, 'num_nodes': num_objects + 1,
+                                     'block_hash': block_hash(dist_full, num_objects + 1), 'stress': stress,
+                                     'created': time.time()}
+
+    sampled = ', sampled' if landmarks else ''
+    print(f"Layout stress (Kruskal stress-1{sampled}): {stress:.4f}")
+
+    # Same value range as before (unit box), the visualizer rescales to canvas anyway
+    coords = coords / (np.abs(coords).max() or 1)
+
+    print(f"Saving to {output_path}...")
+    coords_df = pd.DataFrame(coords[:num_objects + 1], columns=['x', 'y'])
+    coords_df.to_csv(output_path, index_label='node_id')
+
+    if use_cache:
+        # Remember what coords.csv was built from, so ensure_coords can tell when it goes stale
+        stat = os.stat(output_path)
+        index['outputs'][os.path.abspath(output_path)] = {'dist_hash': dist_hash, 'key': key,
+                                                          'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        write_layout_index(layout_path, index)
     print("Done!")
 
+    return coords
+
+def is_coords_stale(data_path='', output_path='coords.csv') -> bool:
+    """
+    coords.csv is stale when missing, built from other distances, or (hand-made / unknown origin) with wrong node count
+    """
+
+    if not os.path.exists(output_path):
+        return True
+
+    record = read_layout_index(layout_cache_path(data_path))['outputs'].get(os.path.abspath(output_path))
+    stat = os.stat(output_path)
+    if record and record['size'] == stat.st_size and record['mtime_ns'] == stat.st_mtime_ns:
+        return record['dist_hash'] != distance_hash(data_path)
+
+    with open(output_path) as f:
+        num_rows = sum(1 for _ in f) - 1
+    return num_rows != load_cache(data_path)['dist_full'].shape[0]
+
+def ensure_coords(data_path='', output_path='coords.csv', **params) -> bool:
+    """
+    Build coords.csv lazily, only when it is missing or stale, returns whether it was (re)built
+    """
+
+    if not is_coords_stale(data_path, output_path):
+        return False
+    generate_coords(data_path=data_path, output_path=output_path, **params)
+    return True
+
 if __name__ == '__main__':
-    generate_coords()
+    parser = argparse.ArgumentParser(description = 'Generate 2D node coordinates (coords.csv) from the distance matrix')
+    parser.add_argument('--method', choices = ['mds', 'smacof'], default = 'smacof', help = 'classical MDS only, or refined with SMACOF')
+    parser.add_argument('--landmarks', type = int, default = None, help = 'landmark MDS with this many landmarks (large instances)')
+    parser.add_argument('--max-iter', type = int, default = 300, help = 'SMACOF iterations')
+    parser.add_argument('--seed', type = int, default = 0, help = 'landmark selection seed')
+    parser.add_argument('--no-cache', action = 'store_true', help = 'always recompute, do not read or write the layout cache')
+    parser.add_argument('--data-path', default = '', help = 'directory prefix of instance CSVs')
+    parser.add_argument('-o', '--output', default = 'coords.csv')
+    args = parser.parse_args()
 
+    generate_coords(args.method, args.landmarks, args.max_iter, args.seed, args.data_path, args.output, not args.no_cache)
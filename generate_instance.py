@@ -0,0 +1,277 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import polars as pl
+
+from heroes_cache import CACHE_VERSION, SOURCE_FILES, default_cache_path, save_cache, source_fingerprint
+from heroes_distances import SparseDistances
+
+MP_DISTRIBUTIONS = ['uniform', 'normal', 'bimodal']
+MATRIX_FORMATS = ['csv', 'binary', 'both']
+
+# Distance block size (matrix cells) filled per chunk, bounds the float working set to a few hundred MB
+CHUNK_CELLS = 1 << 24
+
+
+def object_positions(num_objects: int, clusters: int = 0, cluster_std: float = 60.0, extent: float = 900.0,
+                     rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Castle/Depot (row 0, map centre) and object positions in an extent x extent square
+    clusters=0 spreads objects uniformly, otherwise they are Gaussian blobs (cluster_std) around uniform centres
+    """
+
+    rng = rng or np.random.default_rng()
+    if clusters > 0:
+        centres = rng.uniform(0, extent, size=(clusters, 2))
+        points = centres[rng.integers(0, clusters, size=num_objects)] + rng.normal(0, cluster_std, size=(num_objects, 2))
+        points = np.clip(points, 0, extent)
+    else:
+        points = rng.uniform(0, extent, size=(num_objects, 2))
+    return np.vstack([[extent / 2, extent / 2], points])
+
+
+def mix32(x: np.ndarray) -> np.ndarray:
+    """
+    In-place 32-bit integer hash finalizer (lowbias32), uint32 arithmetic wraps around
+    """
+
+    x ^= x >> np.uint32(16)
+    x *= np.uint32(0x7FEB352D)
+    x ^= x >> np.uint32(15)
+    x *= np.uint32(0x846CA68B)
+    x ^= x >> np.uint32(16)
+    return x
+
+
+def pair_noise(rows: np.ndarray, cols: np.ndarray, seed: int = 0) -> np.ndarray:
+    """
+    Symmetric pseudo-random value in [0, 1) per (row, col) pair, a hash of the pair itself (rows and cols broadcast)
+    Node keys are combined with commutative operations, so every chunk agrees on both halves of the matrix
+    without any shared random state
+    """
+
+    row_keys = mix32((rows.astype(np.uint32) ^ np.uint32(seed & 0xFFFFFFFF)) * np.uint32(0x9E3779B1))
+    col_keys = mix32((cols.astype(np.uint32) ^ np.uint32(seed & 0xFFFFFFFF)) * np.uint32(0x9E3779B1))
+
+    x = row_keys + col_keys
+    x ^= row_keys * col_keys
+    return mix32(x).astype(np.float32) * np.float32(2.0 ** -32)
+
+
+def pair_distances(points: np.ndarray, rows: np.ndarray, cols: np.ndarray, detour: float = 0.2, seed: int = 0) -> np.ndarray:
+    """
+    Rounded Euclidean distances of (row, col) node pairs stretched by a symmetric per-pair detour factor in [1, 1 + detour)
+    rows and cols broadcast against each other, rows[:, None] and cols[None, :] give a block of the matrix
+    Detours break the triangle inequality like the contest matrix does, detour=0 gives plain Euclidean distances
+    """
+
+    # float32 and in-place operations keep the working set small (distances stay well within precision)
+    points = np.asarray(points, dtype=np.float32)
+    block = points[rows, 0] - points[cols, 0]
+    block *= block
+    dy = points[rows, 1] - points[cols, 1]
+    dy *= dy
+    block += dy
+    np.sqrt(block, out=block)
+    if detour > 0:
+        noise = pair_noise(rows, cols, seed)
+        noise *= np.float32(detour)
+        noise += np.float32(1)
+        block *= noise
+    return np.rint(block, out=block)
+
+
+def fill_distances(points: np.ndarray, out: np.ndarray, detour: float = 0.2, seed: int = 0, chunk_size: int = None):
+    """
+    Generator distance matrix (see pair_distances) filled in row chunks straight into out (int32 array or memory map),
+    no float copy of the whole matrix
+    """
+
+    for start, block in distance_blocks(points, detour, seed, chunk_size):
+        out[start:start + len(block)] = block
+
+
+def distance_blocks(points: np.ndarray, detour: float = 0.2, seed: int = 0, chunk_size: int = None):
+    """
+    Generator distance matrix as (first row, float block) row chunks, for fill_distances and sparse neighbourhoods
+    """
+
+    num_nodes = len(points)
+    chunk_size = chunk_size or max(1, CHUNK_CELLS // num_nodes)
+    points = np.asarray(points, dtype=np.float32)
+    cols = np.arange(num_nodes)
+    for start in range(0, num_nodes, chunk_size):
+        yield start, pair_distances(points, cols[start:start + chunk_size, None], cols[None, :], detour, seed)
+
+
+class CoordinateFallback:
+    """
+    SparseDistances fallback recomputing missing entries from generator coordinates,
+    exact for the same points, detour and seed as the generated matrix
+    """
+
+    def __init__(self, points: np.ndarray, detour: float = 0.2, seed: int = 0):
+        self.points = np.asarray(points, dtype=np.float32)
+        self.detour = detour
+        self.seed = seed
+
+    def __call__(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        return pair_distances(self.points, rows, cols, self.detour, self.seed).astype(np.int64)
+
+
+def hero_move_points(num_heroes: int, move_points: tuple = (1500, 1900), distribution: str = 'uniform',
+                     rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Daily move points of every hero within [low, high]
+    - uniform: integers spread evenly over the range
+    - normal: centred on the range, 99.7% of heroes inside it (clipped)
+    - bimodal: a mix of weak (low) and strong (high) heroes
+    """
+
+    rng = rng or np.random.default_rng()
+    low, high = move_points
+    if distribution == 'uniform':
+        return rng.integers(low, high, size=num_heroes, endpoint=True)
+    if distribution == 'normal':
+        return np.clip(np.rint(rng.normal((low + high) / 2, (high - low) / 6, size=num_heroes)), low, high).astype(np.int64)
+    if distribution == 'bimodal':
+        return np.where(rng.random(num_heroes) < 0.5, low, high).astype(np.int64)
+    raise ValueError(f"Unknown move point distribution '{distribution}', expected one of {MP_DISTRIBUTIONS}")
+
+
+def generate_arrays(num_objects: int, num_heroes: int = 100, num_days: int = 7, clusters: int = 0,
+                    cluster_std: float = 60.0, extent: float = 900.0, detour: float = 0.2, move_points: tuple = (1500, 1900),
+                    mp_distribution: str = 'uniform', reward: int = 500, seed: int = 0, dist_out: np.ndarray = None,
+                    sparse_k: int = None) -> dict:
+    """
+    Seeded synthetic instance as cache-style arrays (see heroes_cache.CACHE_ARRAYS)
+    Defaults follow the contest data: 100 heroes, 7 days, 1500-1900 move points, reward 500, distances of a few hundred
+    dist_out is an optional preallocated (num_objects + 1)^2 int32 target, e.g. a memory map for instances beyond RAM
+    With sparse_k, dist_full is a heroes_distances.SparseDistances of the sparse_k nearest neighbours per object instead
+    (other entries recomputed from coordinates on demand), the dense matrix is never stored
+    """
+
+    rng = np.random.default_rng(seed)
+    points = object_positions(num_objects, clusters, cluster_std, extent, rng)
+
+    if sparse_k:
+        blocks = ((start, block.astype(np.int32)) for start, block in distance_blocks(points, detour, seed))
+        dist_full = SparseDistances.from_blocks(blocks, (num_objects + 1, num_objects + 1), sparse_k,
+                                                CoordinateFallback(points, detour, seed))
+    else:
+        dist_full = dist_out if dist_out is not None else np.empty((num_objects + 1, num_objects + 1), dtype=np.int32)
+        fill_distances(points, dist_full, detour, seed)
+
+    object_id = np.arange(1, num_objects + 1)
+    return {
+        'hero_id': np.arange(1, num_heroes + 1),
+        'move_points': hero_move_points(num_heroes, move_points, mp_distribution, rng),
+        'object_id': object_id,
+        'day_open': rng.integers(1, num_days, size=num_objects, endpoint=True),
+        'reward': np.full(num_objects, reward),
+        'dist_start_object_id': object_id,
+        'dist_start': np.asarray(dist_full[0, 1:], dtype=np.int64),
+        'dist_full': dist_full,
+    }
+
+
+def write_dist_csv(dist_full: np.ndarray, path: str, chunk_size: int = 256):
+    """
+    Objects-only matrix as dist_objects.csv (header object_1, object_2, ...), written in row chunks
+    """
+
+    num_objects = dist_full.shape[0] - 1
+    with open(path, 'w') as f:
+        f.write(','.join(f'object_{i}' for i in range(1, num_objects + 1)) + '\n')
+        for start in range(1, num_objects + 1, chunk_size):
+            np.savetxt(f, dist_full[start:start + chunk_size, 1:], fmt='%d', delimiter=',')
+
+
+def generate_instance(output_dir: str, num_objects: int, num_heroes: int = 100, num_days: int = 7, clusters: int = 0,
+                      cluster_std: float = 60.0, extent: float = 900.0, detour: float = 0.2, move_points: tuple = (1500, 1900),
+                      mp_distribution: str = 'uniform', reward: int = 500, seed: int = 0, matrix_format: str = 'csv') -> str:
+    """
+    Write a synthetic instance into output_dir in the layout HeroesInstance loads
+    - data_heroes.csv, data_objects.csv and dist_start.csv are always written
+    - csv: dist_objects.csv as well, load with HeroesInstance(data_path = output_dir + '/')
+    - binary: distance matrix goes straight into the binary cache (.heroes_cache/, memory-mapped while filled),
+      load with HeroesInstance(data_path = output_dir + '/', use_cache = True)
+    - both: CSV and binary cache
+    Returns the data path (output_dir with a trailing slash)
+    """
+
+    if matrix_format not in MATRIX_FORMATS:
+        raise ValueError(f"Unknown matrix format '{matrix_format}', expected one of {MATRIX_FORMATS}")
+
+    data_path = os.path.join(output_dir, '')
+    os.makedirs(data_path, exist_ok=True)
+    params = {'num_objects': num_objects, 'num_heroes': num_heroes, 'num_days': num_days, 'clusters': clusters,
+              'cluster_std': cluster_std, 'extent': extent, 'detour': detour, 'move_points': list(move_points),
+              'mp_distribution': mp_distribution, 'reward': reward, 'seed': seed}
+
+    cache_path = default_cache_path(data_path)
+    dist_out, dist_tmp = None, None
+    if matrix_format != 'csv':
+        os.makedirs(cache_path, exist_ok=True)
+        dist_tmp = f'{cache_path}dist_full.npy.{os.getpid()}.tmp'
+        dist_out = np.lib.format.open_memmap(dist_tmp, mode='w+', dtype=np.int32, shape=(num_objects + 1, num_objects + 1))
+
+    arrays = generate_arrays(num_objects, num_heroes, num_days, clusters, cluster_std, extent, detour, move_points,
+                             mp_distribution, reward, seed, dist_out)
+
+    pl.DataFrame({'hero_id': arrays['hero_id'], 'move_points': arrays['move_points']}).write_csv(f'{data_path}data_heroes.csv')
+    pl.DataFrame({'object_id': arrays['object_id'], 'day_open': arrays['day_open'],
+                  'reward': arrays['reward']}).write_csv(f'{data_path}data_objects.csv')
+    pl.DataFrame({'object_id': arrays['dist_start_object_id'],
+                  'dist_start': arrays['dist_start']}).write_csv(f'{data_path}dist_start.csv')
+    if matrix_format != 'binary':
+        write_dist_csv(arrays['dist_full'], f'{data_path}dist_objects.csv')
+    elif os.path.exists(f'{data_path}dist_objects.csv'):
+        # A stale matrix CSV would make the cache look out of date
+        os.remove(f'{data_path}dist_objects.csv')
+
+    if matrix_format != 'csv':
+        dist_out.flush()
+        del arrays['dist_full'], dist_out
+        os.replace(dist_tmp, f'{cache_path}dist_full.npy')
+
+        if matrix_format == 'both':
+            sources = source_fingerprint(data_path)
+        else:
+            # No matrix CSV to hash, the generator parameters identify its content (generation is seeded)
+            params_hash = json.dumps(params, sort_keys=True)
+            sources = source_fingerprint(data_path, names=[name for name in SOURCE_FILES if name != 'dist_objects.csv'])
+            sources['dist_objects.csv'] = {'sha256': hashlib.sha256(f'{params_hash}:dist_objects.csv'.encode()).hexdigest()}
+        save_cache(arrays, cache_path, {'version': CACHE_VERSION, 'sources': sources, 'generator': params})
+
+    return data_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Generate a synthetic Heroes instance (seeded, vectorized)')
+    parser.add_argument('-o', '--output', required = True, help = 'output directory')
+    parser.add_argument('-n', '--objects', type = int, default = 7000, help = 'number of objects')
+    parser.add_argument('--heroes', type = int, default = 100, help = 'number of heroes')
+    parser.add_argument('--days', type = int, default = 7, help = 'number of days')
+    parser.add_argument('--clusters', type = int, default = 0, help = 'object clusters (0 = uniform spread)')
+    parser.add_argument('--cluster-std', type = float, default = 60.0, help = 'cluster spread, distance units')
+    parser.add_argument('--extent', type = float, default = 900.0, help = 'map side, distance units')
+    parser.add_argument('--detour', type = float, default = 0.2, help = 'max relative detour over Euclidean distance')
+    parser.add_argument('--move-points', type = int, nargs = 2, default = [1500, 1900], help = 'hero move point range')
+    parser.add_argument('--mp-distribution', choices = MP_DISTRIBUTIONS, default = 'uniform')
+    parser.add_argument('--reward', type = int, default = 500, help = 'reward of every object')
+    parser.add_argument('--format', choices = MATRIX_FORMATS, default = 'csv',
+                        help = 'distance matrix as dist_objects.csv, binary cache, or both')
+    parser.add_argument('--seed', type = int, default = 0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data_path = generate_instance(args.output, args.objects, args.heroes, args.days, args.clusters, args.cluster_std,
+                                  args.extent, args.detour, tuple(args.move_points), args.mp_distribution, args.reward,
+                                  args.seed, args.format)
+    print(f"Instance with {args.objects} objects and {args.heroes} heroes written to {data_path} "
+          f"in {time.perf_counter() - start:.1f}s")
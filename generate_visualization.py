@@ -1,81 +1,182 @@
-import pandas as pd
+import argparse
+import base64
 import polars as pl
 import json
 import os
-from heroes_utils import HeroesInstance
+import zlib
+from heroes_profiling import Profiler, stage
+from heroes_utils import HeroesInstance, JOURNEY_COLUMNS
+from generate_coords import ensure_coords
+
+# Page timeline: every day is DAY_LENGTH time units, move points used so far are added within the day
+DAY_LENGTH = 2000
+
+# Page event kinds, codes are shared with the page script (EVENT_* constants there)
+EVENT_KINDS = ['day', 'depart', 'visit', 'arrive', 'rest']
+
+# Typed array element types of the page payload (little-endian, as typed arrays on all browsers)
+PAGE_DTYPES = {'Uint8': 'u1', 'Uint16': '<u2', 'Int16': '<i2', 'Int32': '<i4', 'Float32': '<f4'}
+
+def page_dtype(series: pl.Series) -> str:
+    """
+    Narrowest typed array that holds a column: floats go to Float32, integers to the smallest fitting type
+    """
+
+    if series.dtype.is_float():
+        return 'Float32'
+    if series.dtype == pl.Boolean:
+        return 'Uint8'
+    if len(series) == 0 or series.null_count() == len(series):
+        return 'Int32'
+    low, high = series.min(), series.max()
+    if low >= 0:
+        return 'Uint8' if high < 2**8 else 'Uint16' if high < 2**16 else 'Int32'
+    return 'Int16' if -2**15 <= low and high < 2**15 else 'Int32'
+
+def package_nodes(hi: HeroesInstance, coords: pl.DataFrame) -> pl.DataFrame:
+    """
+    Node table for the page: Castle/Depot (id 0) followed by objects in instance order, coordinates joined by id
+    """
+
+    depot = pl.DataFrame({'id': [0], 'day_open': [1], 'reward': [0], 'is_depot': [True]},
+                         schema={'id': pl.Int64, 'day_open': pl.Int64, 'reward': pl.Int64, 'is_depot': pl.Boolean})
+    objects = hi.objects.select(
+        pl.col('object_id').cast(pl.Int64).alias('id'),
+        pl.col('day_open').cast(pl.Int64),
+        pl.col('reward').cast(pl.Int64),
+        pl.lit(False).alias('is_depot'),
+    )
+    nodes = pl.concat([depot, objects]).with_row_index('order')
+    coords = coords.select(pl.col('node_id').cast(pl.Int64).alias('id'), pl.col('x').cast(pl.Float64), pl.col('y').cast(pl.Float64))
+
+    return nodes.join(coords, on='id', how='left').sort('order').select(['id', 'x', 'y', 'day_open', 'reward', 'is_depot'])
+
+def package_journeys(hi: HeroesInstance, detailed_submit: pl.DataFrame) -> pl.DataFrame:
+    """
+    Journey table for the page, timeline positions are (day - 1) * DAY_LENGTH + move points used by then
+    """
+
+    heroes = hi.heroes.select(pl.col('hero_id').cast(pl.Int64), pl.col('move_points').cast(pl.Int64).alias('max_mp'))
+
+    def timeline(day: str, move_points: str) -> pl.Expr:
+        return (pl.col(day) - 1) * DAY_LENGTH + pl.col('max_mp') - pl.col(move_points)
+
+    return detailed_submit.with_columns(pl.col('hero_id').cast(pl.Int64)).join(heroes, on='hero_id', how='left', maintain_order='left').select(
+        pl.col('hero_id'),
+        pl.col('max_mp'),
+        pl.col('object_id_from').alias('from'),
+        pl.col('object_id_to').alias('to'),
+        timeline('day_start', 'move_points_start').alias('time_start'),
+        timeline('day_arrive', 'move_points_arrive').alias('time_arrive'),
+        timeline('day_leave', 'move_points_leave').alias('time_leave'),
+        pl.col('reward'),
+        pl.col('is_late').cast(pl.Boolean),
+    )
+
+def package_events(journeys: pl.DataFrame, max_time: int) -> pl.DataFrame:
+    """
+    Sorted event timeline of the page: time, kind (EVENT_KINDS code) and index (journey row, or new day number)
+    - day: a new day starts at every DAY_LENGTH boundary
+    - depart: hero starts journey at time_start
+    - visit: visit is completed at time_leave
+    - arrive / rest: hero arrived (trail ends) / hero is done with the journey and rests
+    Journeys are closed intervals on the page, so arrive and rest take effect one unit after time_arrive / time_leave
+    """
+
+    kind = {name: code for code, name in enumerate(EVENT_KINDS)}
+    rows = journeys.select(pl.int_range(pl.len(), dtype=pl.Int64).alias('index'),
+                           pl.col('time_start'), pl.col('time_arrive'), pl.col('time_leave'))
+
+    def journey_events(name: str, time: pl.Expr) -> pl.DataFrame:
+        return rows.select(time.cast(pl.Int64).alias('time'), pl.lit(kind[name], dtype=pl.Int64).alias('kind'), pl.col('index'))
+
+    days = pl.DataFrame({'time': [day * DAY_LENGTH for day in range(1, max_time // DAY_LENGTH + 1)]}, schema={'time': pl.Int64})
+    days = days.select(pl.col('time'), pl.lit(kind['day'], dtype=pl.Int64).alias('kind'), (pl.col('time') // DAY_LENGTH + 1).alias('index'))
+
+    return pl.concat([
+        days,
+        journey_events('depart', pl.col('time_start')),
+        journey_events('visit', pl.col('time_leave')),
+        journey_events('arrive', pl.col('time_arrive') + 1),
+        journey_events('rest', pl.col('time_leave') + 1),
+    ]).sort(['time', 'kind', 'index'])
+
+def deflate_column(series: pl.Series) -> tuple:
+    """
+    Deflated (zlib) little-endian bytes of a column as its narrowest typed array
+    Integer columns are delta-encoded when that deflates smaller (sorted times, ids, per-hero timelines)
+    Returns (bytes, dtype of the stored deltas or None)
+    """
+
+    data = zlib.compress(series.to_numpy().astype(PAGE_DTYPES[page_dtype(series)]).tobytes(), 9)
+    if not series.dtype.is_integer() or len(series) < 2:
+        return data, None
+
+    deltas = series.cast(pl.Int64).diff().fill_null(series[0])
+    delta_dtype = page_dtype(deltas)
+    delta_data = zlib.compress(deltas.to_numpy().astype(PAGE_DTYPES[delta_dtype]).tobytes(), 9)
+    return (delta_data, delta_dtype) if len(delta_data) < len(data) else (data, None)
+
+def encode_columns(df: pl.DataFrame, payload: str = 'json') -> str:
+    """
+    Column-oriented page payload, decoded into typed arrays (Uint8Array ... Float32Array) by the page
+    - json: {column: {dtype, values: [...]}}
+    - binary: {column: {dtype, data: base64 of deflated typed array bytes, delta: dtype of deltas (optional)}},
+      with delta the page restores values by a running sum, about 4x smaller than json on the contest data
+    Every column uses the narrowest typed array that fits its values
+    """
+
+    if payload not in ('json', 'binary'):
+        raise ValueError(f"Unknown payload '{payload}', expected 'json' or 'binary'")
+
+    columns = {}
+    for name in df.columns:
+        dtype = page_dtype(df[name])
+        if payload == 'json':
+            columns[name] = {'dtype': dtype, 'values': df[name].to_numpy().astype(PAGE_DTYPES[dtype]).tolist()}
+            continue
+        data, delta_dtype = deflate_column(df[name])
+        columns[name] = {'dtype': dtype, 'data': base64.b64encode(data).decode('ascii')}
+        if delta_dtype is not None:
+            columns[name]['delta'] = delta_dtype
+    return json.dumps(columns, separators=(',', ':'))
+
+def generate_visualization(solution_path='sample_submit.csv', output_path='heroes_solution_visualization.html', payload='json',
+                           renderer='dom', profiler=None):
+    """
+    Write the interactive HTML page of a submission
+    With a heroes_profiling.Profiler the page stages (and the evaluator stages of the instance) are timed
+    """
+
+    if renderer not in ('dom', 'canvas'):
+        raise ValueError(f"Unknown renderer '{renderer}', expected 'dom' or 'canvas'")
 
-def generate_visualization(solution_path='sample_submit.csv', output_path='heroes_solution_visualization.html'):
     print(f"Loading data and extending solution from {solution_path}...")
-    # Load coordinates
-    coords_df = pd.read_csv('coords.csv', index_col='node_id')
+    # Load coordinates, coords.csv is (re)built only when missing or stale (layout cache keyed by distance hash)
+    with stage(profiler, 'ensure_coords'):
+        ensure_coords('')
+        coords = pl.read_csv('coords.csv')
     
     # Load HeroesInstance
-    hi = HeroesInstance(data_path='')
-    submit = pl.read_csv(solution_path)
+    hi = HeroesInstance(data_path='', use_cache=True, profiler=profiler)
+    with stage(profiler, 'read_submit'):
+        submit = pl.read_csv(solution_path)
     # Use remove_out_of_time=True to only include actions within the 7-day limit
-    detailed_submit = hi.expand_solution(hi.basic_check(submit), remove_out_of_time=True)
+    # Columnar NumPy engine, same rows and values as expand_solution
+    detailed_submit = pl.DataFrame(hi.expand_solution_numpy(hi.basic_check(submit), remove_out_of_time=True))
+    if len(detailed_submit) == 0:
+        detailed_submit = pl.DataFrame(schema={col: pl.Int64 for col in JOURNEY_COLUMNS})
     
-    # Package nodes
-    nodes_data = []
-    nodes_data.append({
-        'id': 0,
-        'x': float(coords_df.loc[0, 'x']),
-        'y': float(coords_df.loc[0, 'y']),
-        'day_open': 1,
-        'reward': 0,
-        'is_depot': True
-    })
-    for row in hi.objects.iter_rows(named=True):
-        nid = row['object_id']
-        nodes_data.append({
-            'id': nid,
-            'x': float(coords_df.loc[nid, 'x']),
-            'y': float(coords_df.loc[nid, 'y']),
-            'day_open': row['day_open'],
-            'reward': row['reward'],
-            'is_depot': False
-        })
-        
-    # Collect unique hero ids used in the solution
-    used_hero_ids = sorted(set(row['hero_id'] for row in detailed_submit.iter_rows(named=True)))
-    
-    heroes_data = []
-    for row in hi.heroes.iter_rows(named=True):
-        heroes_data.append({
-            'id': row['hero_id'],
-            'max_move_points': row['move_points']
-        })
-        
-    # Build journeys with is_late info
-    journeys = []
-    for row in detailed_submit.iter_rows(named=True):
-        hid = row['hero_id']
-        max_mp = hi.hero_mp_map[hid]
-        from_id = row['object_id_from']
-        to_id = row['object_id_to']
-        
-        mp_used_start = max_mp - row['move_points_start']
-        time_start = (row['day_start'] - 1) * 2000 + mp_used_start
-        
-        mp_used_arrive = max_mp - row['move_points_arrive']
-        time_arrive = (row['day_arrive'] - 1) * 2000 + mp_used_arrive
-        
-        mp_used_leave = max_mp - row['move_points_leave']
-        time_leave = (row['day_leave'] - 1) * 2000 + mp_used_leave
-        
-        journeys.append({
-            'hero_id': hid,
-            'max_mp': max_mp,
-            'from': from_id,
-            'to': to_id,
-            'time_start': time_start,
-            'time_arrive': time_arrive,
-            'time_leave': time_leave,
-            'reward': row['reward'],
-            'is_late': bool(row['is_late'])
-        })
-
-    max_time = max([j['time_leave'] for j in journeys]) if journeys else 14000
+    # Package nodes and journeys as whole columns (joins and expressions, no per-row Python)
+    with stage(profiler, 'package'):
+        nodes = package_nodes(hi, coords)
+        journeys = package_journeys(hi, detailed_submit)
+
+        # Collect unique hero ids used in the solution
+        used_hero_ids = detailed_submit['hero_id'].unique().sort().to_list()
+
+        max_time = int(journeys['time_leave'].max()) if len(journeys) > 0 else 14000
+        events = package_events(journeys, max_time)
     
     html_template = """<!DOCTYPE html>
 <html>
@@ -154,11 +255,55 @@ def generate_visualization(solution_path='sample_submit.csv', output_path='heroe
     
     <div id="legend" class="legend"></div>
 
-    <script>
-        const nodes = NODES_DATA;
-        const journeys = JOURNEYS_DATA;
+    <script type="module">
+        // ─────────────────────────────────────────────
+        //  Column payload decoder: every column is either
+        //  { dtype, values: [...] } (JSON) or { dtype, data: base64 }
+        //  (deflated little-endian typed array bytes, running sum of
+        //  the stored deltas when delta is set), both become typed arrays
+        // ─────────────────────────────────────────────
+        const TYPED_ARRAYS = { Uint8: Uint8Array, Uint16: Uint16Array, Int16: Int16Array, Int32: Int32Array, Float32: Float32Array };
+
+        async function inflate(base64) {
+            const bin = atob(base64);
+            const bytes = new Uint8Array(bin.length);
+            for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+            return new Response(stream).arrayBuffer();
+        }
+
+        async function decodeColumns(payload) {
+            const cols = {};
+            for (const name in payload) {
+                const col = payload[name];
+                const Typed = TYPED_ARRAYS[col.dtype];
+                if (col.values !== undefined) {
+                    cols[name] = Typed.from(col.values);
+                    continue;
+                }
+                const buffer = await inflate(col.data);
+                if (col.delta === undefined) {
+                    cols[name] = new Typed(buffer);
+                    continue;
+                }
+                const deltas = new TYPED_ARRAYS[col.delta](buffer);
+                const values = new Typed(deltas.length);
+                for (let i = 0, sum = 0; i < deltas.length; i++) values[i] = sum += deltas[i];
+                cols[name] = values;
+            }
+            return cols;
+        }
+
+        const N = await decodeColumns(NODES_DATA);
+        const J = await decodeColumns(JOURNEYS_DATA);
         const usedHeroIds = USED_HERO_IDS;
         const maxTime = MAX_TIME;
+        const numJourneys = J.hero_id.length;
+
+        // Node row objects carry per-node screen state, journeys stay columnar (index k into J.*)
+        const nodes = Array.from(N.id, (id, i) => ({
+            id: id, x: N.x[i], y: N.y[i], day_open: N.day_open[i], reward: N.reward[i], is_depot: N.is_depot[i] === 1
+        }));
 
         // ─────────────────────────────────────────────
         //  SVG Asset Data URIs
@@ -252,40 +397,50 @@ def generate_visualization(solution_path='sample_submit.csv', output_path='heroe
         // ─────────────────────────────────────────────
         const routesCtx = document.getElementById('routes-canvas').getContext('2d');
         // Pass 1 – dark shadow for readability
-        journeys.forEach(j => {
-            const n1 = nodes[j.from], n2 = nodes[j.to];
+        for (let k = 0; k < numJourneys; k++) {
+            const n1 = nodes[J.from[k]], n2 = nodes[J.to[k]];
             routesCtx.strokeStyle = 'rgba(0,0,0,0.45)';
             routesCtx.lineWidth = 4.5;
             routesCtx.beginPath();
             routesCtx.moveTo(n1.cx, n1.cy);
             routesCtx.lineTo(n2.cx, n2.cy);
             routesCtx.stroke();
-        });
+        }
         // Pass 2 – hero-coloured line on top
-        journeys.forEach(j => {
-            const n1 = nodes[j.from], n2 = nodes[j.to];
-            routesCtx.strokeStyle = heroHSLA(j.hero_id, 80, 62, 0.60);
+        for (let k = 0; k < numJourneys; k++) {
+            const n1 = nodes[J.from[k]], n2 = nodes[J.to[k]];
+            routesCtx.strokeStyle = heroHSLA(J.hero_id[k], 80, 62, 0.60);
             routesCtx.lineWidth = 2.2;
             routesCtx.beginPath();
             routesCtx.moveTo(n1.cx, n1.cy);
             routesCtx.lineTo(n2.cx, n2.cy);
             routesCtx.stroke();
-        });
+        }
 
-        const dynCtx   = document.getElementById('dynamic-canvas').getContext('2d');
+        const dynCanvas = document.getElementById('dynamic-canvas');
+        const dynCtx   = dynCanvas.getContext('2d');
         const objLayer = document.getElementById('objects-layer');
         const heroLayer= document.getElementById('heroes-layer');
         const tooltip  = document.getElementById('tooltip');
 
+        // 'dom': one <img> per node and hero, 'canvas': sprites drawn on dynamic-canvas
+        const renderMode = 'RENDER_MODE';
+
+        function nodeTooltip(n) {
+            return n.is_depot
+                ? `<b>Castle (Depot)</b>`
+                : `<b>Target #${n.id}</b><br>Day open: ${n.day_open}<br>Reward: ${n.reward}`;
+        }
+
         // ─────────────────────────────────────────────
-        //  Create node <img> elements
+        //  Create node <img> elements (dom mode)
         // ─────────────────────────────────────────────
         const objElements = {};
         // Build node lookup by id
         const nodeById = {};
         nodes.forEach(n => { nodeById[n.id] = n; });
 
-        nodes.forEach(n => {
+        if (renderMode === 'dom') nodes.forEach(n => {
             const img = document.createElement('img');
             img.className = 'target';
             img.style.left = n.cx + 'px';
@@ -303,9 +458,7 @@ def generate_visualization(solution_path='sample_submit.csv', output_path='heroe
 
             img.onmouseover = (e) => {
                 tooltip.style.display = 'block';
-                tooltip.innerHTML = n.is_depot
-                    ? `<b>Castle (Depot)</b>`
-                    : `<b>Target #${n.id}</b><br>Day open: ${n.day_open}<br>Reward: ${n.reward}`;
+                tooltip.innerHTML = nodeTooltip(n);
             };
             img.onmousemove = (e) => {
                 tooltip.style.left = (e.offsetX + 15) + 'px';
@@ -391,12 +544,12 @@ def generate_visualization(solution_path='sample_submit.csv', output_path='heroe
         // ─────────────────────────────────────────────
         //  Animation helpers
         // ─────────────────────────────────────────────
-        function getHeroPosition(j, t) {
-            const n1 = nodes[j.from];
-            const n2 = nodes[j.to];
-            if (t <= j.time_start) return { x: n1.cx, y: n1.cy };
-            if (t >= j.time_arrive) return { x: n2.cx, y: n2.cy };
-            const ratio = (t - j.time_start) / (j.time_arrive - j.time_start);
+        function getHeroPosition(k, t) {
+            const n1 = nodes[J.from[k]];
+            const n2 = nodes[J.to[k]];
+            if (t <= J.time_start[k]) return { x: n1.cx, y: n1.cy };
+            if (t >= J.time_arrive[k]) return { x: n2.cx, y: n2.cy };
+            const ratio = (t - J.time_start[k]) / (J.time_arrive[k] - J.time_start[k]);
             return { x: n1.cx + (n2.cx - n1.cx) * ratio, y: n1.cy + (n2.cy - n1.cy) * ratio };
         }
 
@@ -404,165 +557,478 @@ def generate_visualization(solution_path='sample_submit.csv', output_path='heroe
         const heroLabels   = {};
 
         // ─────────────────────────────────────────────
-        //  Main update function
+        //  Event timeline (sorted by time in the generator)
+        //  A cursor points past the last applied event:
+        //  playing forward applies only new events, scrubbing
+        //  restores the snapshot of the target day and replays
+        //  up to the binary-searched end of the target time
         // ─────────────────────────────────────────────
-        function updateVisualization() {
-            const day        = Math.floor(currentTime / 2000) + 1;
-            const timeInDay  = currentTime % 2000;
-            dayDisp.innerText  = day;
-            timeDisp.innerText = Math.floor(timeInDay);
+        const dayLength = DAY_LENGTH;
+        // Same codes as EVENT_KINDS in generate_visualization.py
+        const EVENT_DAY = 0, EVENT_DEPART = 1, EVENT_VISIT = 2, EVENT_ARRIVE = 3, EVENT_REST = 4;
+        const EV = await decodeColumns(EVENTS_DATA);
+        const numEvents = EV.time.length;
+
+        // Number of events with time <= t
+        function eventsUpTo(t) {
+            let lo = 0, hi = numEvents;
+            while (lo < hi) {
+                const mid = (lo + hi) >> 1;
+                if (EV.time[mid] <= t) lo = mid + 1; else hi = mid;
+            }
+            return lo;
+        }
+
+        // Nodes grouped by opening day, a new day only changes these
+        const nodesByDay = {};
+        nodes.forEach(n => { if (!n.is_depot) (nodesByDay[n.day_open] = nodesByDay[n.day_open] || []).push(n.id); });
 
-            // ── 1. Determine visit state for each node ──
-            // visitInfo: node_id -> { hero_id, is_late, reward }
-            const visitInfo = {};
-            journeys.forEach(j => {
-                if (j.time_leave <= currentTime) {
-                    // keep latest arrival per node (last visit wins)
-                    visitInfo[j.to] = { hero_id: j.hero_id, is_late: j.is_late, reward: j.reward };
+        const numHeroSlots = usedHeroIds.reduce((a, b) => Math.max(a, b), 0) + 1;
+        const state = {
+            cursor: 0,
+            day: 1,
+            nodeVisit: new Int32Array(nodes.length).fill(-1),   // last completed visit (journey index) per node
+            heroMove:  new Int32Array(numHeroSlots).fill(-1),   // journey covering current time, per hero
+            heroRest:  new Int32Array(numHeroSlots).fill(-1),   // last finished journey, per hero
+            trails:    new Set(),                               // journeys still on their way to the target
+        };
+        const dirtyNodes = new Set();
+        let refreshAll = true;
+
+        function applyEvent(e) {
+            const kind = EV.kind[e], k = EV.index[e];
+            if (kind === EVENT_DAY) {
+                state.day = k;
+                // Today's nodes open, yesterday's unvisited nodes become missed
+                (nodesByDay[k] || []).forEach(id => dirtyNodes.add(id));
+                (nodesByDay[k - 1] || []).forEach(id => dirtyNodes.add(id));
+            } else if (kind === EVENT_DEPART) {
+                // Last covering journey (by index) wins
+                const hid = J.hero_id[k];
+                if (k > state.heroMove[hid]) state.heroMove[hid] = k;
+                state.trails.add(k);
+            } else if (kind === EVENT_VISIT) {
+                // Last visit (by index) wins
+                if (k > state.nodeVisit[J.to[k]]) {
+                    state.nodeVisit[J.to[k]] = k;
+                    dirtyNodes.add(J.to[k]);
                 }
+            } else if (kind === EVENT_ARRIVE) {
+                state.trails.delete(k);
+            } else if (kind === EVENT_REST) {
+                const hid = J.hero_id[k];
+                if (state.heroMove[hid] === k) state.heroMove[hid] = -1;
+                const rest = state.heroRest[hid];
+                if (rest < 0 || J.time_leave[k] > J.time_leave[rest]) state.heroRest[hid] = k;
+            }
+        }
+
+        function takeSnapshot() {
+            return {
+                cursor: state.cursor, day: state.day,
+                nodeVisit: state.nodeVisit.slice(), heroMove: state.heroMove.slice(), heroRest: state.heroRest.slice(),
+                trails: Array.from(state.trails)
+            };
+        }
+
+        function restoreSnapshot(snap) {
+            state.cursor = snap.cursor;
+            state.day = snap.day;
+            state.nodeVisit.set(snap.nodeVisit);
+            state.heroMove.set(snap.heroMove);
+            state.heroRest.set(snap.heroRest);
+            state.trails = new Set(snap.trails);
+            dirtyNodes.clear();
+            refreshAll = true;
+        }
+
+        // Per-day snapshots: state just before the first event of every day
+        const snapshots = [];
+        for (let d = 0; d * dayLength <= maxTime; d++) {
+            const end = eventsUpTo(d * dayLength - 1);
+            while (state.cursor < end) applyEvent(state.cursor++);
+            snapshots.push(takeSnapshot());
+        }
+        restoreSnapshot(snapshots[0]);
+
+        function seek(t) {
+            const target = eventsUpTo(t);
+            const snap = snapshots[Math.min(Math.floor(t / dayLength), snapshots.length - 1)];
+            // Going back needs a snapshot, going forward only when it skips more events than a full refresh costs
+            if (target < state.cursor || snap.cursor - state.cursor > nodes.length) restoreSnapshot(snap);
+            while (state.cursor < target) applyEvent(state.cursor++);
+        }
+
+        // ─────────────────────────────────────────────
+        //  Node icons: state key per node, the <img> is
+        //  only touched when its key changes
+        // ─────────────────────────────────────────────
+        const NODE_CLOSED = 0, NODE_OPEN = 1, NODE_MISSED = 2, NODE_VISITED = 3, NODE_LATE = 4, NODE_NO_REWARD = 5;
+        const nodeShown = new Int32Array(nodes.length).fill(-1);
+
+        function nodeKey(n) {
+            const k = state.nodeVisit[n.id];
+            if (k >= 0) {
+                const kind = J.reward[k] > 0 ? NODE_VISITED : J.is_late[k] === 1 ? NODE_LATE : NODE_NO_REWARD;
+                return kind * 65536 + J.hero_id[k];
+            }
+            if (state.day === n.day_open) return NODE_OPEN;
+            return state.day > n.day_open ? NODE_MISSED : NODE_CLOSED;
+        }
+
+        function drawNode(n, key) {
+            const img  = objElements[n.id];
+            const kind = Math.floor(key / 65536) || key;
+            const hid  = key % 65536;
+
+            if (kind === NODE_VISITED) {
+                // Successful visit — hero-coloured dark check icon
+                img.src = visitedAssets[hid] || ASSETS.visited;
+                img.style.width  = '22px';
+                img.style.height = '22px';
+                img.style.filter = `drop-shadow(0 0 5px ${heroHSL(hid, 70, 45)})`;
+            } else if (kind === NODE_LATE) {
+                // Late — red exclamation, hero-coloured glow
+                img.src = ASSETS.late;
+                img.style.width  = '24px';
+                img.style.height = '24px';
+                img.style.filter = `drop-shadow(0 0 6px ${heroHSL(hid, 90, 60)})`;
+            } else if (kind === NODE_NO_REWARD) {
+                // Visited but no reward
+                img.src = visitedAssets[hid] || ASSETS.visited;
+                img.style.width  = '20px';
+                img.style.height = '20px';
+                img.style.filter = 'none';
+            } else if (kind === NODE_OPEN) {
+                // Opening day, not yet collected — gold coin
+                img.src = ASSETS.open;
+                img.style.width  = '20px';
+                img.style.height = '20px';
+                img.style.filter = 'none';
+            } else if (kind === NODE_MISSED) {
+                // Was open on a previous day but never visited — missed (grey cross)
+                img.src = ASSETS.missed;
+                img.style.width  = '18px';
+                img.style.height = '18px';
+                img.style.filter = 'none';
+            } else {
+                // Not yet open — plain grey circle
+                img.src = ASSETS.closed;
+                img.style.width  = '16px';
+                img.style.height = '16px';
+                img.style.filter = 'none';
+            }
+        }
+
+        // Hero size scales with move-point capacity
+        const heroMaxMp = {};
+        for (let k = 0; k < numJourneys; k++) heroMaxMp[J.hero_id[k]] = J.max_mp[k];
+        function heroSize(maxMp) { return 18 + Math.max(0, Math.min(1, (maxMp - 1500) / 1000)) * 14; }
+
+        // Hero elements are only touched when their journey, activity or position changes
+        const heroShown = {};
+
+        function hideHeroElement(hid) {
+            if (heroElements[hid] && heroShown[hid] !== 'hidden') {
+                heroElements[hid].style.display = 'none';
+                heroLabels[hid].style.display = 'none';
+                heroShown[hid] = 'hidden';
+            }
+        }
+
+        function drawHeroElement(hid, active, k, pos) {
+            const key = `${active}:${k}:${pos.x}:${pos.y}`;
+            if (heroShown[hid] === key) return;
+
+            if (!heroElements[hid]) {
+                const img = document.createElement('img');
+                img.className = 'hero-icon';
+                img.src = ASSETS.hero;
+                heroElements[hid] = img;
+                heroLayer.appendChild(img);
+
+                const lbl = document.createElement('div');
+                lbl.className = 'hero-label';
+                lbl.innerText = `H${hid}`;
+                heroLabels[hid] = lbl;
+                heroLayer.appendChild(lbl);
+            }
+
+            const img = heroElements[hid];
+            const lbl = heroLabels[hid];
+            if (heroShown[hid] === 'hidden') {
+                img.style.display = '';
+                lbl.style.display = '';
+            }
+            heroShown[hid] = key;
+
+            const size = heroSize(J.max_mp[k]);
+
+            img.style.left   = pos.x + 'px';
+            img.style.top    = pos.y + 'px';
+            img.style.width  = size + 'px';
+            img.style.height = size + 'px';
+            img.style.opacity = active ? '1' : '0.45';
+
+            if (active) {
+                // Full hero colour
+                img.style.filter = heroImgFilter(hid);
+                lbl.style.color  = heroHSL(hid, 80, 80);
+            } else {
+                // Inactive (resting) — desaturated / white tint
+                const rot = ((heroHueMap[hid] - BASE_HERO_HUE) + 360) % 360;
+                img.style.filter = `hue-rotate(${rot}deg) saturate(0.1) brightness(1.6)`;
+                lbl.style.color  = '#888';
+            }
+
+            lbl.style.left = pos.x + 'px';
+            lbl.style.top  = (pos.y - size / 2 - 4) + 'px';
+        }
+
+        // ─────────────────────────────────────────────
+        //  Canvas mode: nodes and heroes are sprites from a
+        //  pre-rasterized atlas (a tile per node state and
+        //  per hero hue), drawn on dynamic-canvas. Node
+        //  sprites are cached in an offscreen layer that is
+        //  only redrawn when some node changes state
+        // ─────────────────────────────────────────────
+        const TILE = 48, ATLAS_COLS = 32;
+        const atlasTiles = [];   // { src, size, glow, blur } in tile order
+
+        function addTile(src, size, glow, blur) {
+            atlasTiles.push({ src: src, size: size, glow: glow || null, blur: blur || 0 });
+            return atlasTiles.length - 1;
+        }
+
+        // Hero face in the hero's own colour (canvas has no portable CSS filters)
+        function heroSprite(hid, active) {
+            const fill = active ? `hsl(${heroHueMap[hid]},80%,46%)` : `hsl(${heroHueMap[hid]},10%,72%)`;
+            const svg = `<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg">`
+                      + `<circle cx="50" cy="50" r="45" fill="${fill}" stroke="white" stroke-width="5"/>`
+                      + `<circle cx="35" cy="42" r="6" fill="white"/><circle cx="65" cy="42" r="6" fill="white"/>`
+                      + `<path d="M30 63 Q50 82 70 63" stroke="white" stroke-width="6" fill="none" stroke-linecap="round"/>`
+                      + `</svg>`;
+            return 'data:image/svg+xml;charset=utf-8,' + encodeURIComponent(svg);
+        }
+
+        const TILE_DEPOT  = addTile(ASSETS.depot, 36);
+        const TILE_CLOSED = addTile(ASSETS.closed, 16);
+        const TILE_OPEN   = addTile(ASSETS.open, 20);
+        const TILE_MISSED = addTile(ASSETS.missed, 18);
+        const heroTiles = {};
+        if (renderMode === 'canvas') usedHeroIds.forEach(hid => {
+            heroTiles[hid] = {
+                visited:  addTile(visitedAssets[hid], 22, heroHSL(hid, 70, 45), 5),
+                late:     addTile(ASSETS.late, 24, heroHSL(hid, 90, 60), 6),
+                noReward: addTile(visitedAssets[hid], 20),
+                active:   addTile(heroSprite(hid, true), heroSize(heroMaxMp[hid])),
+                rest:     addTile(heroSprite(hid, false), heroSize(heroMaxMp[hid])),
+            };
+        });
+
+        const atlas = document.createElement('canvas');
+        const nodeLayer = document.createElement('canvas');
+        const nodeTile = new Int32Array(nodes.length).fill(TILE_CLOSED);
+        nodeTile[0] = TILE_DEPOT;
+        let atlasReady = false, nodeLayerDirty = true;
+
+        // SVGs need an intrinsic size to be drawn on a canvas
+        function sizedSvg(src) {
+            return src.replace('<svg ', '<svg width="100" height="100" ')
+                      .replace('%3Csvg%20', '%3Csvg%20width%3D%22100%22%20height%3D%22100%22%20');
+        }
+
+        function buildAtlas() {
+            atlas.width  = ATLAS_COLS * TILE;
+            atlas.height = Math.ceil(atlasTiles.length / ATLAS_COLS) * TILE;
+            nodeLayer.width = W;
+            nodeLayer.height = H;
+
+            // One image per distinct SVG, tiles are rasterized once all of them are loaded
+            const images = {};
+            const loads = atlasTiles.map(tile => {
+                if (images[tile.src]) return images[tile.src].loaded;
+                const img = new Image();
+                img.loaded = new Promise(resolve => { img.onload = resolve; img.onerror = resolve; });
+                img.src = sizedSvg(tile.src);
+                images[tile.src] = img;
+                return img.loaded;
             });
 
-            nodes.forEach(n => {
-                if (n.is_depot) return;
-                const img  = objElements[n.id];
-                const info = visitInfo[n.id];
-
-                if (info) {
-                    if (info.reward > 0) {
-                        // Successful visit — hero-coloured dark check icon
-                        const asset = visitedAssets[info.hero_id] || ASSETS.visited;
-                        img.src = asset;
-                        img.style.width  = '22px';
-                        img.style.height = '22px';
-                        img.style.filter = `drop-shadow(0 0 5px ${heroHSL(info.hero_id, 70, 45)})`;
-                    } else if (info.is_late) {
-                        // Late — red exclamation, hero-coloured glow
-                        img.src = ASSETS.late;
-                        img.style.width  = '24px';
-                        img.style.height = '24px';
-                        img.style.filter = `drop-shadow(0 0 6px ${heroHSL(info.hero_id, 90, 60)})`;
-                    } else {
-                        // Visited but no reward
-                        const asset = visitedAssets[info.hero_id] || ASSETS.visited;
-                        img.src = asset;
-                        img.style.width  = '20px';
-                        img.style.height = '20px';
-                        img.style.filter = 'none';
+            Promise.all(loads).then(() => {
+                const ctx = atlas.getContext('2d');
+                atlasTiles.forEach((tile, i) => {
+                    const cx = (i % ATLAS_COLS) * TILE + TILE / 2, cy = Math.floor(i / ATLAS_COLS) * TILE + TILE / 2;
+                    ctx.save();
+                    if (tile.glow) {
+                        ctx.shadowColor = tile.glow;
+                        ctx.shadowBlur  = tile.blur;
                     }
-                } else if (day === n.day_open) {
-                    // Opening day, not yet collected — gold coin
-                    img.src = ASSETS.open;
-                    img.style.width  = '20px';
-                    img.style.height = '20px';
-                    img.style.filter = 'none';
-                } else if (day > n.day_open) {
-                    // Was open on a previous day but never visited — missed (grey cross)
-                    img.src = ASSETS.missed;
-                    img.style.width  = '18px';
-                    img.style.height = '18px';
-                    img.style.filter = 'none';
-                } else {
-                    // Not yet open — plain grey circle
-                    img.src = ASSETS.closed;
-                    img.style.width  = '16px';
-                    img.style.height = '16px';
-                    img.style.filter = 'none';
-                }
+                    ctx.drawImage(images[tile.src], cx - tile.size / 2, cy - tile.size / 2, tile.size, tile.size);
+                    ctx.restore();
+                });
+                atlasReady = true;
+                nodeLayerDirty = true;
+                updateVisualization();
             });
+        }
+
+        function drawSprite(ctx, tile, x, y) {
+            ctx.drawImage(atlas, (tile % ATLAS_COLS) * TILE, Math.floor(tile / ATLAS_COLS) * TILE, TILE, TILE,
+                          x - TILE / 2, y - TILE / 2, TILE, TILE);
+        }
+
+        function setNodeTile(n, key) {
+            const kind = Math.floor(key / 65536) || key;
+            const hid  = key % 65536;
+            nodeTile[n.id] = kind === NODE_VISITED ? heroTiles[hid].visited
+                           : kind === NODE_LATE ? heroTiles[hid].late
+                           : kind === NODE_NO_REWARD ? heroTiles[hid].noReward
+                           : kind === NODE_OPEN ? TILE_OPEN
+                           : kind === NODE_MISSED ? TILE_MISSED : TILE_CLOSED;
+            nodeLayerDirty = true;
+        }
+
+        // Nodes (cached layer), then hero sprites, then hero labels on top
+        function drawCanvasSprites(heroDraws) {
+            if (!atlasReady) return;
+            if (nodeLayerDirty) {
+                const ctx = nodeLayer.getContext('2d');
+                ctx.clearRect(0, 0, W, H);
+                nodes.forEach(n => drawSprite(ctx, nodeTile[n.id], n.cx, n.cy));
+                nodeLayerDirty = false;
+            }
+            dynCtx.drawImage(nodeLayer, 0, 0);
+
+            for (const h of heroDraws) {
+                dynCtx.globalAlpha = h.active ? 1 : 0.45;
+                drawSprite(dynCtx, h.active ? heroTiles[h.hid].active : heroTiles[h.hid].rest, h.pos.x, h.pos.y);
+            }
+            dynCtx.globalAlpha = 1;
+
+            dynCtx.font = 'bold 9px sans-serif';
+            dynCtx.textAlign = 'center';
+            dynCtx.textBaseline = 'bottom';
+            dynCtx.shadowColor = 'black';
+            dynCtx.shadowBlur = 3;
+            for (const h of heroDraws) {
+                dynCtx.fillStyle = h.active ? heroHSL(h.hid, 80, 80) : '#888';
+                dynCtx.fillText(`H${h.hid}`, h.pos.x, h.pos.y - heroSize(heroMaxMp[h.hid]) / 2 - 4);
+            }
+            dynCtx.shadowBlur = 0;
+        }
+
+        // Tooltips: nodes are bucketed into a uniform grid, the pointer only checks its 3x3 neighbourhood
+        const GRID_CELL = 24;
+        const gridCols = Math.ceil(W / GRID_CELL), gridRows = Math.ceil(H / GRID_CELL);
+        const grid = Array.from({ length: gridCols * gridRows }, () => []);
 
-            // ── 2. Update hero positions & active/inactive state ──
-            // trulyActive: hero has a journey segment covering currentTime
-            const trulyActive = new Set();
-            journeys.forEach(j => {
-                if (currentTime >= j.time_start && currentTime <= j.time_leave) {
-                    trulyActive.add(j.hero_id);
+        function nodeAt(x, y) {
+            const col = Math.floor(x / GRID_CELL), row = Math.floor(y / GRID_CELL);
+            let best = null, bestDist = Infinity;
+            for (let r = Math.max(row - 1, 0); r <= Math.min(row + 1, gridRows - 1); r++) {
+                for (let c = Math.max(col - 1, 0); c <= Math.min(col + 1, gridCols - 1); c++) {
+                    for (const id of grid[r * gridCols + c]) {
+                        const n = nodes[id];
+                        const radius = n.is_depot ? 18 : 12;
+                        const dist = (n.cx - x) ** 2 + (n.cy - y) ** 2;
+                        if (dist <= radius * radius && dist < bestDist) { best = n; bestDist = dist; }
+                    }
                 }
+            }
+            return best;
+        }
+
+        if (renderMode === 'canvas') {
+            nodes.forEach(n => {
+                const col = Math.min(Math.max(Math.floor(n.cx / GRID_CELL), 0), gridCols - 1);
+                const row = Math.min(Math.max(Math.floor(n.cy / GRID_CELL), 0), gridRows - 1);
+                grid[row * gridCols + col].push(n.id);
             });
 
-            // heroLastKnown: last position we can determine for each hero
-            const heroLastKnown = {};
-            journeys.forEach(j => {
-                if (currentTime >= j.time_start && currentTime <= j.time_leave) {
-                    heroLastKnown[j.hero_id] = { pos: getHeroPosition(j, currentTime), max_mp: j.max_mp };
-                } else if (currentTime > j.time_leave) {
-                    const existing = heroLastKnown[j.hero_id];
-                    if (!existing || (existing._leaveTime || 0) < j.time_leave) {
-                        heroLastKnown[j.hero_id] = {
-                            pos: { x: nodes[j.to].cx, y: nodes[j.to].cy },
-                            max_mp: j.max_mp,
-                            _leaveTime: j.time_leave
-                        };
-                    }
+            dynCanvas.addEventListener('mousemove', (e) => {
+                const n = nodeAt(e.offsetX, e.offsetY);
+                dynCanvas.style.cursor = n ? 'pointer' : 'default';
+                if (!n) {
+                    tooltip.style.display = 'none';
+                    return;
                 }
+                tooltip.style.display = 'block';
+                tooltip.innerHTML = nodeTooltip(n);
+                tooltip.style.left = (e.offsetX + 15) + 'px';
+                tooltip.style.top  = (e.offsetY + 15) + 'px';
             });
+            dynCanvas.addEventListener('mouseleave', () => { tooltip.style.display = 'none'; });
 
-            for (let hid in heroLastKnown) {
-                if (!heroElements[hid]) {
-                    const img = document.createElement('img');
-                    img.className = 'hero-icon';
-                    img.src = ASSETS.hero;
-                    heroElements[hid] = img;
-                    heroLayer.appendChild(img);
-
-                    const lbl = document.createElement('div');
-                    lbl.className = 'hero-label';
-                    lbl.innerText = `H${hid}`;
-                    heroLabels[hid] = lbl;
-                    heroLayer.appendChild(lbl);
+            buildAtlas();
+        }
+
+        // ─────────────────────────────────────────────
+        //  Main update function
+        // ─────────────────────────────────────────────
+        function updateVisualization() {
+            const day        = Math.floor(currentTime / dayLength) + 1;
+            const timeInDay  = currentTime % dayLength;
+            dayDisp.innerText  = day;
+            timeDisp.innerText = Math.floor(timeInDay);
+
+            seek(currentTime);
+
+            // ── 1. Node icons changed by applied events (or all after a snapshot restore) ──
+            const changed = refreshAll ? nodes.map(n => n.id) : Array.from(dirtyNodes);
+            for (const id of changed) {
+                const n = nodes[id];
+                if (n.is_depot) continue;
+                const key = nodeKey(n);
+                if (key !== nodeShown[id]) {
+                    nodeShown[id] = key;
+                    if (renderMode === 'canvas') setNodeTile(n, key); else drawNode(n, key);
                 }
+            }
+            dirtyNodes.clear();
+            refreshAll = false;
 
-                const hData = heroLastKnown[hid];
-                const img   = heroElements[hid];
-                const lbl   = heroLabels[hid];
-                const active = trulyActive.has(parseInt(hid));
-
-                // Size scaled by move-point capacity
-                const size = 18 + Math.max(0, Math.min(1, (hData.max_mp - 1500) / 1000)) * 14;
-
-                img.style.left   = hData.pos.x + 'px';
-                img.style.top    = hData.pos.y + 'px';
-                img.style.width  = size + 'px';
-                img.style.height = size + 'px';
-                img.style.opacity = active ? '1' : '0.45';
-
-                if (active) {
-                    // Full hero colour
-                    img.style.filter = heroImgFilter(hid);
-                    lbl.style.color  = heroHSL(hid, 80, 80);
-                } else {
-                    // Inactive (resting) — desaturated / white tint
-                    const rot = ((heroHueMap[hid] - BASE_HERO_HUE) + 360) % 360;
-                    img.style.filter = `hue-rotate(${rot}deg) saturate(0.1) brightness(1.6)`;
-                    lbl.style.color  = '#888';
+            // ── 2. Hero positions & active/inactive state ──
+            // Active: a journey covers currentTime, otherwise the hero rests at its last target
+            const heroDraws = [];
+            for (const hid of usedHeroIds) {
+                const active = state.heroMove[hid] >= 0;
+                const k = active ? state.heroMove[hid] : state.heroRest[hid];
+                if (k < 0) {
+                    // Not on the way yet (after scrubbing back)
+                    if (renderMode === 'dom') hideHeroElement(hid);
+                    continue;
                 }
 
-                lbl.style.left = hData.pos.x + 'px';
-                lbl.style.top  = (hData.pos.y - size / 2 - 4) + 'px';
+                const pos = active ? getHeroPosition(k, currentTime) : { x: nodes[J.to[k]].cx, y: nodes[J.to[k]].cy };
+                if (renderMode === 'canvas') heroDraws.push({ hid: hid, active: active, pos: pos });
+                else drawHeroElement(hid, active, k, pos);
             }
 
-            // ── 3. Animated trail on dynamic canvas ──
+            // ── 3. Animated trail on dynamic canvas (journeys between depart and arrive) ──
             dynCtx.clearRect(0, 0, W, H);
-            journeys.forEach(j => {
-                if (currentTime >= j.time_start && currentTime <= j.time_arrive) {
-                    const n1  = nodes[j.from];
-                    const pos = getHeroPosition(j, currentTime);
-                    // Glow shadow pass
-                    dynCtx.strokeStyle = heroHSLA(j.hero_id, 90, 70, 0.30);
-                    dynCtx.lineWidth = 9;
-                    dynCtx.lineCap = 'round';
-                    dynCtx.beginPath();
-                    dynCtx.moveTo(n1.cx, n1.cy);
-                    dynCtx.lineTo(pos.x, pos.y);
-                    dynCtx.stroke();
-                    // Bright core
-                    dynCtx.strokeStyle = heroHSLA(j.hero_id, 85, 65, 0.95);
-                    dynCtx.lineWidth = 3.5;
-                    dynCtx.beginPath();
-                    dynCtx.moveTo(n1.cx, n1.cy);
-                    dynCtx.lineTo(pos.x, pos.y);
-                    dynCtx.stroke();
-                }
-            });
+            for (const k of Array.from(state.trails).sort((a, b) => a - b)) {
+                const n1  = nodes[J.from[k]];
+                const pos = getHeroPosition(k, currentTime);
+                // Glow shadow pass
+                dynCtx.strokeStyle = heroHSLA(J.hero_id[k], 90, 70, 0.30);
+                dynCtx.lineWidth = 9;
+                dynCtx.lineCap = 'round';
+                dynCtx.beginPath();
+                dynCtx.moveTo(n1.cx, n1.cy);
+                dynCtx.lineTo(pos.x, pos.y);
+                dynCtx.stroke();
+                // Bright core
+                dynCtx.strokeStyle = heroHSLA(J.hero_id[k], 85, 65, 0.95);
+                dynCtx.lineWidth = 3.5;
+                dynCtx.beginPath();
+                dynCtx.moveTo(n1.cx, n1.cy);
+                dynCtx.lineTo(pos.x, pos.y);
+                dynCtx.stroke();
+            }
+
+            // ── 4. Canvas mode: sprites above the trails ──
+            if (renderMode === 'canvas') drawCanvasSprites(heroDraws);
         }
 
         // ─────────────────────────────────────────────
@@ -602,16 +1068,45 @@ def generate_visualization(solution_path='sample_submit.csv', output_path='heroe
 </body>
 </html>"""
 
-    html_template = html_template.replace("NODES_DATA",    json.dumps(nodes_data))
-    html_template = html_template.replace("JOURNEYS_DATA", json.dumps(journeys))
-    html_template = html_template.replace("USED_HERO_IDS", json.dumps(used_hero_ids))
-    html_template = html_template.replace("MAX_TIME",      str(max_time))
+    with stage(profiler, 'encode_page'):
+        html_template = html_template.replace("NODES_DATA",    encode_columns(nodes, payload))
+        html_template = html_template.replace("JOURNEYS_DATA", encode_columns(journeys, payload))
+        html_template = html_template.replace("EVENTS_DATA",   encode_columns(events, payload))
+        html_template = html_template.replace("RENDER_MODE",   renderer)
+        html_template = html_template.replace("DAY_LENGTH",    str(DAY_LENGTH))
+        html_template = html_template.replace("USED_HERO_IDS", json.dumps(used_hero_ids))
+        html_template = html_template.replace("MAX_TIME",      str(max_time))
 
-    with open(output_path, 'w') as f:
-        f.write(html_template)
+    with stage(profiler, 'write_html'):
+        with open(output_path, 'w') as f:
+            f.write(html_template)
+
+    if profiler is not None:
+        profiler.count('page_nodes', len(nodes))
+        profiler.count('page_journeys', len(journeys))
+        profiler.count('page_events', len(events))
+        profiler.count('page_bytes', len(html_template))
 
     print(f"Interactive visualization generated: {output_path}")
 
 
 if __name__ == '__main__':
-    generate_visualization()
+    parser = argparse.ArgumentParser(description = 'Generate interactive HTML visualization of a Heroes solution')
+    parser.add_argument('solution', nargs = '?', default = 'sample_submit.csv', help = 'submission file')
+    parser.add_argument('-o', '--output', default = 'heroes_solution_visualization.html')
+    parser.add_argument('--payload', choices = ['json', 'binary'], default = 'json',
+                        help = 'embedded data format, binary is base64 typed arrays (much smaller, faster page startup)')
+    parser.add_argument('--renderer', choices = ['dom', 'canvas'], default = 'dom',
+                        help = 'dom: an <img> per node and hero, canvas: sprite atlas on a canvas (for large instances)')
+    parser.add_argument('--profile', default = None, help = 'print stage timings and save them as JSON to this path')
+    parser.add_argument('--trace', default = None, help = 'save stage events as a Chrome trace (chrome://tracing, Perfetto)')
+    args = parser.parse_args()
+
+    profiler = Profiler(trace = args.trace is not None) if args.profile or args.trace else None
+    generate_visualization(args.solution, args.output, args.payload, args.renderer, profiler)
+    if profiler is not None:
+        print(profiler.format_report())
+        if args.profile:
+            profiler.write_json(args.profile)
+        if args.trace:
+            profiler.write_chrome_trace(args.trace)
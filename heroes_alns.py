@@ -0,0 +1,419 @@
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import polars as pl
+
+from heroes_batch import POOL_CONTEXT
+from heroes_distances import distance_lookup
+from heroes_utils import HeroesInstance
+from heroes_greedy import GreedyConstructor, greedy_solution
+from heroes_solver import routes_to_submit
+
+LOG_SCHEMA = {'round': pl.Int64, 'worker': pl.Int64, 'iteration': pl.Int64, 'elapsed': pl.Float64,
+              'temperature': pl.Float64, 'current_score': pl.Int64, 'best_score': pl.Int64, 'accept_rate': pl.Float64}
+
+# Operator scores of the classic adaptive scheme: new global best, improvement, accepted
+SCORE_BEST, SCORE_BETTER, SCORE_ACCEPTED = 33, 9, 13
+
+# Per-worker state, set up once by the pool initializer
+_worker_instance = None
+
+
+def routes_to_flat(routes: dict, num_heroes: int) -> tuple:
+    """
+    {hero_id: [object_id, ...]} into flat CSR-like encoding of HeroesInstance.evaluate_flat
+    """
+
+    counts = np.zeros(num_heroes + 1, dtype=np.int64)
+    object_ids = []
+    for hero_id in sorted(routes):
+        counts[hero_id] = len(routes[hero_id])
+        object_ids.extend(routes[hero_id])
+    return np.array(object_ids, dtype=np.int32), np.concatenate([[0], np.cumsum(counts[1:])])
+
+
+def assigned_objects(routes: dict) -> list:
+    return [object_id for route in routes.values() for object_id in route]
+
+
+def remove_objects(routes: dict, removed) -> dict:
+    removed = set(removed)
+    return {hero_id: [object_id for object_id in route if object_id not in removed] for hero_id, route in routes.items()}
+
+
+def pick_ranked(ranked: list, num_remove: int, rng: np.random.Generator, randomness: float = 3) -> list:
+    """
+    Randomized pick from a list ranked best-to-remove first, rand ** randomness skews picks to the front
+    """
+
+    ranked = list(ranked)
+    picked = []
+    while ranked and len(picked) < num_remove:
+        picked.append(ranked.pop(int(rng.random() ** randomness * len(ranked))))
+    return picked
+
+
+# Destroy operators: (search, routes, num_remove, rng) -> routes with some objects removed
+
+def destroy_random(search, routes: dict, num_remove: int, rng: np.random.Generator) -> dict:
+    objects = assigned_objects(routes)
+    num_remove = min(num_remove, len(objects))
+    return remove_objects(routes, rng.choice(objects, num_remove, replace=False).tolist() if num_remove else [])
+
+
+def destroy_worst(search, routes: dict, num_remove: int, rng: np.random.Generator) -> dict:
+    """
+    Remove objects with the largest detour per unit of reward
+    """
+
+    dist = search.dist
+    reward = search.instance.reward_arr
+    detours = []
+    for route in routes.values():
+        for k, object_id in enumerate(route):
+            previous_object = route[k - 1] if k > 0 else 0
+            if k + 1 < len(route):
+                detour = dist[previous_object, object_id] + dist[object_id, route[k + 1]] - dist[previous_object, route[k + 1]]
+            else:
+                detour = dist[previous_object, object_id]
+            detours.append((detour / max(reward[object_id], 1), object_id))
+
+    ranked = [object_id for _, object_id in sorted(detours, reverse=True)]
+    return remove_objects(routes, pick_ranked(ranked, num_remove, rng))
+
+
+def destroy_related(search, routes: dict, num_remove: int, rng: np.random.Generator) -> dict:
+    """
+    Remove a random seed object and its nearest assigned objects (Shaw removal by distance)
+    """
+
+    objects = np.array(assigned_objects(routes))
+    if len(objects) == 0:
+        return routes
+    seed_object = objects[rng.integers(len(objects))]
+    ranked = objects[np.argsort(search.dist[seed_object, objects], kind='stable')].tolist()
+    return remove_objects(routes, pick_ranked(ranked, num_remove, rng))
+
+
+def destroy_by_day(search, routes: dict, num_remove: int, rng: np.random.Generator) -> dict:
+    """
+    Remove random objects that open on the same (random) day
+    """
+
+    objects = np.array(assigned_objects(routes))
+    if len(objects) == 0:
+        return routes
+    days = search.instance.day_open_arr[objects]
+    same_day = objects[days == days[rng.integers(len(objects))]]
+    return remove_objects(routes, rng.choice(same_day, min(num_remove, len(same_day)), replace=False).tolist())
+
+
+def destroy_route(search, routes: dict, num_remove: int, rng: np.random.Generator) -> dict:
+    """
+    Empty one route, picks skew to the largest hero ids (dropping the last hero saves HERO_COST)
+    """
+
+    heroes = sorted((hero_id for hero_id, route in routes.items() if route), reverse=True)
+    if not heroes:
+        return routes
+    hero_id = pick_ranked(heroes, 1, rng)[0]
+    return {h: ([] if h == hero_id else route) for h, route in routes.items()}
+
+
+# Repair operators: (search, routes, rng) -> routes with unassigned objects inserted again
+
+def repair_regret(search, routes: dict, rng: np.random.Generator, regret_k: int = 2) -> dict:
+    constructor = search.repair_constructor(routes)
+    constructor.regret_k = regret_k
+    return constructor.build()
+
+
+DESTROY_OPERATORS = {'random': destroy_random, 'worst': destroy_worst, 'related': destroy_related, 'day': destroy_by_day,
+                     'route': destroy_route}
+REPAIR_OPERATORS = {'greedy': partial(repair_regret, regret_k=1), 'regret2': partial(repair_regret, regret_k=2),
+                    'regret3': partial(repair_regret, regret_k=3)}
+
+
+class ALNS:
+    """
+    Adaptive Large Neighbourhood Search on {hero_id: [object_id, ...]} routes
+    - destroy/repair operators are picked by roulette wheel, weights adapt every segment of iterations
+    - simulated annealing acceptance, temperature decays geometrically over the whole time budget
+    - every candidate is scored with HeroesInstance.evaluate_flat (exact Gold Score)
+    - one GreedyConstructor follows the current solution, repairs start from a copy of it where only the routes
+      changed by the destroy step get fresh insertion rows
+    Operators are plain functions, custom ones can be passed as {name: function} dicts
+    seed is anything np.random.default_rng accepts (an int or a sequence of ints)
+    """
+
+    def __init__(self, instance: HeroesInstance, seed = 0, destroy_operators: dict = None, repair_operators: dict = None,
+                 min_remove: int = 5, max_remove_fraction: float = 0.15, start_temperature: float = 1000,
+                 end_temperature: float = 10, reaction: float = 0.2, segment: int = 50):
+        self.instance = instance
+        self.dist = distance_lookup(instance.dist_full)
+        self.num_heroes = len(instance.hero_mp_arr) - 1
+        self.rng = np.random.default_rng(seed)
+
+        self.destroy_operators = destroy_operators or DESTROY_OPERATORS
+        self.repair_operators = repair_operators or REPAIR_OPERATORS
+        self.destroy_weights = np.ones(len(self.destroy_operators))
+        self.repair_weights = np.ones(len(self.repair_operators))
+
+        self.min_remove = min_remove
+        self.max_remove_fraction = max_remove_fraction
+        self.start_temperature = start_temperature
+        self.end_temperature = end_temperature
+        self.reaction = reaction
+        self.segment = segment
+
+        self.current, self.current_score = {}, 0
+        self.best, self.best_score = {}, 0
+        self.iteration, self.accepted = 0, 0
+        self._reset_segment()
+
+        # Construction state of the current solution and of the candidate being repaired
+        self.constructor = GreedyConstructor(instance, initial_heroes=0)
+        self._candidate_constructor = None
+
+    def _reset_segment(self):
+        # Operator score sums and usage counts of the current segment
+        self._segment_scores = [np.zeros(len(self.destroy_weights)), np.zeros(len(self.destroy_weights)),
+                                np.zeros(len(self.repair_weights)), np.zeros(len(self.repair_weights))]
+
+    def score(self, routes: dict) -> int:
+        return self.instance.evaluate_flat(*routes_to_flat(routes, self.num_heroes))
+
+    def _load_constructor(self, routes: dict):
+        self.constructor = GreedyConstructor(self.instance, initial_heroes=0)
+        self.constructor.load_routes(routes)
+
+    def set_solution(self, routes: dict):
+        """
+        Restart from given routes as they are, best solution is replaced only if improved
+        """
+
+        self.current = {hero_id: list(route) for hero_id, route in routes.items() if route}
+        self.current_score = self.score(self.current)
+        self._load_constructor(self.current)
+        if not self.best or self.current_score > self.best_score:
+            self.best, self.best_score = self.current, self.current_score
+
+    def repair_constructor(self, routes: dict) -> GreedyConstructor:
+        """
+        Constructor holding destroyed routes, ready to insert the removed objects again (for repair operators)
+        Copy of the current solution's constructor, kept as the current one if the candidate is accepted
+        """
+
+        self._candidate_constructor = self.constructor.copy()
+        self._candidate_constructor.update_routes(routes)
+        return self._candidate_constructor
+
+    def temperature(self, progress: float) -> float:
+        return self.start_temperature * (self.end_temperature / self.start_temperature) ** min(max(progress, 0), 1)
+
+    def _roulette(self, weights: np.ndarray) -> int:
+        return int(self.rng.choice(len(weights), p=weights / weights.sum()))
+
+    def iterate(self, temperature: float) -> bool:
+        """
+        One destroy/repair step, returns whether the candidate was accepted
+        """
+
+        num_assigned = sum(len(route) for route in self.current.values())
+        max_remove = max(self.min_remove, int(num_assigned * self.max_remove_fraction))
+        num_remove = int(self.rng.integers(self.min_remove, max_remove + 1))
+
+        destroy_idx = self._roulette(self.destroy_weights)
+        repair_idx = self._roulette(self.repair_weights)
+        destroy = list(self.destroy_operators.values())[destroy_idx]
+        repair = list(self.repair_operators.values())[repair_idx]
+
+        self._candidate_constructor = None
+        candidate = repair(self, destroy(self, self.current, num_remove, self.rng), self.rng)
+        candidate_score = self.score(candidate)
+
+        outcome = 0
+        accepted = candidate_score >= self.current_score or \
+            self.rng.random() < math.exp((candidate_score - self.current_score) / max(temperature, 1e-9))
+        if candidate_score > self.best_score:
+            outcome = SCORE_BEST
+            self.best, self.best_score = candidate, candidate_score
+        elif candidate_score > self.current_score:
+            outcome = SCORE_BETTER
+        elif accepted:
+            outcome = SCORE_ACCEPTED
+
+        if accepted:
+            self.current, self.current_score = candidate, candidate_score
+            if self._candidate_constructor is not None:
+                self.constructor = self._candidate_constructor
+
+        self._segment_scores[0][destroy_idx] += outcome
+        self._segment_scores[1][destroy_idx] += 1
+        self._segment_scores[2][repair_idx] += outcome
+        self._segment_scores[3][repair_idx] += 1
+        self.iteration += 1
+        self.accepted += accepted
+        return accepted
+
+    def _update_weights(self):
+        destroy_score, destroy_count, repair_score, repair_count = self._segment_scores
+        used = destroy_count > 0
+        self.destroy_weights[used] = (1 - self.reaction) * self.destroy_weights[used] + \
+            self.reaction * destroy_score[used] / destroy_count[used]
+        used = repair_count > 0
+        self.repair_weights[used] = (1 - self.reaction) * self.repair_weights[used] + \
+            self.reaction * repair_score[used] / repair_count[used]
+        # Keep every operator alive
+        self.destroy_weights = np.maximum(self.destroy_weights, 0.01)
+        self.repair_weights = np.maximum(self.repair_weights, 0.01)
+
+    def run(self, time_limit: float, progress_start: float = 0, progress_end: float = 1) -> list:
+        """
+        Search for time_limit seconds, progress_start..progress_end is the share of the total budget (for temperature)
+        Returns progress log rows, one per segment
+        """
+
+        logs = []
+        start = time.perf_counter()
+        accepted_in_segment, segment_start = 0, self.iteration
+        self._reset_segment()
+
+        while (elapsed := time.perf_counter() - start) < time_limit:
+            temperature = self.temperature(progress_start + (progress_end - progress_start) * elapsed / time_limit)
+            accepted_in_segment += self.iterate(temperature)
+
+            if self.iteration - segment_start == self.segment:
+                self._update_weights()
+                logs.append({'iteration': self.iteration, 'elapsed': time.perf_counter() - start, 'temperature': temperature,
+                             'current_score': self.current_score, 'best_score': self.best_score,
+                             'accept_rate': accepted_in_segment / self.segment})
+                accepted_in_segment, segment_start = 0, self.iteration
+                self._reset_segment()
+
+        return logs
+
+    def state(self) -> dict:
+        return {'current': self.current, 'best': self.best, 'iteration': self.iteration, 'accepted': self.accepted,
+                'destroy_weights': self.destroy_weights, 'repair_weights': self.repair_weights}
+
+    def restore(self, state: dict):
+        self.current, self.best = state['current'], state['best']
+        self.current_score, self.best_score = self.score(self.current), self.score(self.best)
+        self._load_constructor(self.current)
+        self.iteration, self.accepted = state['iteration'], state['accepted']
+        self.destroy_weights, self.repair_weights = state['destroy_weights'], state['repair_weights']
+
+
+def instance_routes(instance: HeroesInstance, submit: pl.DataFrame) -> dict:
+    """
+    Submission (cleaned up with basic_check) as {hero_id: [object_id, ...]}
+    """
+
+    object_ids, hero_offsets = instance.to_flat_routes(submit)
+    return {hero_id: object_ids[hero_offsets[hero_id - 1]:hero_offsets[hero_id]].tolist()
+            for hero_id in range(1, len(hero_offsets)) if hero_offsets[hero_id] > hero_offsets[hero_id - 1]}
+
+
+def _init_worker(data_path: str):
+    global _worker_instance
+    _worker_instance = HeroesInstance(data_path = data_path, use_cache = True)
+
+
+def _run_round(args: tuple) -> tuple:
+    """
+    One exchange round of one search worker, state travels with the task (pool processes are not pinned to workers)
+    """
+
+    worker, seed, round_idx, state, round_time, progress_start, progress_end, options = args
+    search = ALNS(_worker_instance, seed = (seed, worker, round_idx), **options)
+    search.restore(state)
+    logs = search.run(round_time, progress_start, progress_end)
+    for row in logs:
+        row.update({'round': round_idx, 'worker': worker})
+    return search.state(), search.best_score, logs
+
+
+def solve(submit: pl.DataFrame = None, data_path: str = '', time_limit: float = 60, workers: int = None,
+          exchange_interval: float = 10, seed: int = 0, log_path: str = None, verbose: bool = True, **options) -> tuple:
+    """
+    Parallel ALNS: independent search workers in a process pool, best solution is exchanged every exchange_interval seconds
+    (workers that fall behind restart from the global best), starts from submit or from the greedy baseline
+    Returns (submit DataFrame, Gold Score) of the best solution found
+    """
+
+    workers = workers or os.cpu_count() or 1
+    instance = HeroesInstance(data_path = data_path, use_cache = True)
+
+    search = ALNS(instance, seed = seed, **options)
+    search.set_solution(instance_routes(instance, submit) if submit is not None else
+                        instance_routes(instance, greedy_solution(instance)))
+    best_score, best_state = search.best_score, search.state()
+    if verbose:
+        print(f"Start Gold Score {best_score}")
+
+    num_rounds = max(1, math.ceil(time_limit / exchange_interval))
+    states = [search.state() for _ in range(workers)]
+    all_logs = []
+
+    pool = ProcessPoolExecutor(max_workers = workers, mp_context = POOL_CONTEXT, initializer = _init_worker,
+                               initargs = (data_path,)) if workers > 1 else None
+    if pool is None:
+        _init_worker(data_path)
+    try:
+        for round_idx in range(num_rounds):
+            tasks = [(worker, seed, round_idx, states[worker], time_limit / num_rounds,
+                      round_idx / num_rounds, (round_idx + 1) / num_rounds, options) for worker in range(workers)]
+            results = list(pool.map(_run_round, tasks)) if pool else list(map(_run_round, tasks))
+            round_iterations = sum(state['iteration'] - before['iteration'] for (state, _, _), before in zip(results, states))
+            round_accepted = sum(state['accepted'] - before['accepted'] for (state, _, _), before in zip(results, states))
+
+            for worker, (state, score, logs) in enumerate(results):
+                states[worker] = state
+                all_logs.extend(logs)
+                if score > best_score:
+                    best_score, best_state = score, state
+
+            # Exchange: workers behind the global best continue from it, keeping their own operator weights
+            for worker, (state, score, _) in enumerate(results):
+                if score < best_score:
+                    states[worker] = dict(state, current = best_state['best'], best = best_state['best'])
+
+            if verbose:
+                iterations = sum(state['iteration'] for state in states)
+                accept_rate = round_accepted / round_iterations if round_iterations else 0
+                print(f"Round {round_idx + 1}/{num_rounds}: {iterations} iterations, best score {best_score}, "
+                      f"accept rate {accept_rate:.2f}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if log_path:
+        pl.DataFrame(all_logs, schema = LOG_SCHEMA, orient = 'row').write_csv(log_path)
+
+    return routes_to_submit(best_state['best']), best_score
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Improve a Heroes submission with parallel ALNS')
+    parser.add_argument('-s', '--submit', default = None, help = 'starting submission (default: greedy baseline)')
+    parser.add_argument('-o', '--output', default = 'solution_alns.csv', help = 'submission file to write')
+    parser.add_argument('-t', '--time-limit', type = float, default = 60, help = 'total time budget, seconds')
+    parser.add_argument('-w', '--workers', type = int, default = None, help = 'parallel search workers (default: all cores)')
+    parser.add_argument('--exchange-interval', type = float, default = 10, help = 'seconds between best solution exchanges')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--log', default = None, help = 'progress log (CSV: round, worker, iteration, best score, accept rate)')
+    parser.add_argument('--data-path', default = '', help = 'directory prefix of instance CSVs')
+    args = parser.parse_args()
+
+    start_submit = pl.read_csv(args.submit) if args.submit else None
+    start = time.perf_counter()
+    submit, score = solve(start_submit, args.data_path, args.time_limit, args.workers, args.exchange_interval,
+                          args.seed, args.log)
+    submit.write_csv(args.output)
+    print(f"Best Gold Score {score} ({len(submit)} visits) in {time.perf_counter() - start:.1f}s, saved to {args.output}")
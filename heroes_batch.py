@@ -0,0 +1,161 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import polars as pl
+
+from heroes_utils import HeroesInstance
+
+RESULT_SCHEMA = {'file': pl.String, 'score': pl.Int64, 'reward': pl.Int64, 'heroes_used': pl.Int64,
+                 'max_hero_id': pl.Int64, 'late_count': pl.Int64, 'elapsed': pl.Float64, 'error': pl.String}
+
+# Workers are spawned, not forked: a forked child inherits the locks of the Polars thread pool and can deadlock
+# on its first query, and workers get the instance through shared memory anyway
+POOL_CONTEXT = multiprocessing.get_context('spawn')
+
+# Per-worker state, set up once by the pool initializer
+_worker_instance = None
+_worker_blocks = []
+
+
+def share_instance(instance: HeroesInstance) -> tuple:
+    """
+    Copy instance arrays into shared memory blocks once
+    Returns (blocks, spec) where spec is a small picklable {name: (block name, shape, dtype)} for workers
+    """
+
+    blocks, spec = [], {}
+    for name, values in instance.to_arrays().items():
+        values = np.ascontiguousarray(values)
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+        blocks.append(block)
+        spec[name] = (block.name, values.shape, values.dtype.str)
+    return blocks, spec
+
+
+def attach_instance(spec: dict) -> tuple:
+    """
+    Rebuild HeroesInstance on top of shared memory views (no copy of the distance matrix)
+    """
+
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in spec.items():
+        # Pool workers share the owner's resource tracker, the owner's unlink is the only unregister
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return blocks, HeroesInstance.from_arrays(arrays)
+
+
+def _init_worker(spec: dict):
+    global _worker_instance, _worker_blocks
+    _worker_blocks, _worker_instance = attach_instance(spec)
+
+
+def submission_stats(instance: HeroesInstance, submit: pl.DataFrame) -> dict:
+    """
+    Gold Score and summary of a submission: score, reward, heroes_used, max_hero_id, late_count
+    """
+
+    score, visits = instance.evaluate_solution_numpy(submit)
+    if not visits:
+        return {'score': score, 'reward': 0, 'heroes_used': 0, 'max_hero_id': 0, 'late_count': 0}
+    return {
+        'score': score,
+        'reward': int(visits['reward'].sum()),
+        'heroes_used': int(len(np.unique(visits['hero_id']))),
+        'max_hero_id': int(visits['hero_id'].max()),
+        'late_count': int(visits['is_late'].sum()),
+    }
+
+
+def score_file(instance: HeroesInstance, path: str) -> dict:
+    """
+    Score a single submission file, errors are reported in the result row instead of raised
+    """
+
+    start = time.perf_counter()
+    row = {'file': path, 'score': None, 'reward': None, 'heroes_used': None,
+           'max_hero_id': None, 'late_count': None, 'elapsed': None, 'error': None}
+    try:
+        row.update(submission_stats(instance, pl.read_csv(path)))
+    except Exception as e:
+        row['error'] = f'{type(e).__name__}: {e}'
+    row['elapsed'] = time.perf_counter() - start
+    return row
+
+
+def _score_in_worker(path: str) -> dict:
+    return score_file(_worker_instance, path)
+
+
+def expand_paths(submissions) -> list:
+    """
+    Expand a glob pattern or a list of paths/patterns into a sorted, de-duplicated list of files
+    """
+
+    if isinstance(submissions, str):
+        submissions = [submissions]
+    paths = []
+    for pattern in submissions:
+        matches = sorted(glob.glob(pattern))
+        paths.extend(matches if matches else [pattern])
+    return list(dict.fromkeys(paths))
+
+
+def score_submissions(submissions, workers: int = None, data_path: str = '',
+                      output_path: str = None, instance: HeroesInstance = None) -> pl.DataFrame:
+    """
+    Score many submission files in a process pool
+    Instance data is loaded once and shared with workers via multiprocessing.shared_memory
+    """
+
+    paths = expand_paths(submissions)
+    workers = workers or os.cpu_count() or 1
+    instance = instance or HeroesInstance(data_path = data_path, use_cache = True)
+
+    if workers == 1 or len(paths) <= 1:
+        rows = [score_file(instance, path) for path in paths]
+    else:
+        blocks, spec = share_instance(instance)
+        try:
+            with ProcessPoolExecutor(max_workers = workers, mp_context = POOL_CONTEXT, initializer = _init_worker,
+                                     initargs = (spec,)) as pool:
+                chunksize = max(1, len(paths) // (workers * 4))
+                rows = list(pool.map(_score_in_worker, paths, chunksize = chunksize))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    results = pl.DataFrame(rows, schema = RESULT_SCHEMA, orient = 'row')
+
+    if output_path:
+        if output_path.endswith('.parquet'):
+            results.write_parquet(output_path)
+        else:
+            results.write_csv(output_path)
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Score many Heroes submission files in parallel')
+    parser.add_argument('submissions', nargs = '+', help = 'submission files or glob patterns, e.g. "runs/solution_*.csv"')
+    parser.add_argument('-w', '--workers', type = int, default = None, help = 'number of worker processes (default: all cores)')
+    parser.add_argument('-o', '--output', default = 'scores.csv', help = 'results table (.csv or .parquet)')
+    parser.add_argument('--data-path', default = '', help = 'directory prefix of instance CSVs')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = score_submissions(args.submissions, workers = args.workers, data_path = args.data_path, output_path = args.output)
+    elapsed = time.perf_counter() - start
+
+    print(results.sort('score', descending = True, nulls_last = True).head(10))
+    print(f"Scored {len(results)} files in {elapsed:.2f}s, results saved to {args.output}")
@@ -0,0 +1,257 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import polars as pl
+
+from generate_instance import generate_arrays
+from heroes_cache import SOURCE_FILES, default_cache_path, load_cache
+from heroes_distances import SparseDistances
+from heroes_utils import HeroesInstance
+
+SUBMISSION_CASES = ['empty', 'one_hero_long', 'all_heroes', 'full_assignment']
+
+
+def synthetic_submission(instance: HeroesInstance, case: str) -> pl.DataFrame:
+    """
+    Synthetic submission of a given SUBMISSION_CASES shape, objects go in day_open order
+    - empty: no rows
+    - one_hero_long: hero 1 visits every object
+    - all_heroes: every hero visits a single object
+    - full_assignment: every object, dealt round-robin over all heroes
+    """
+
+    hero_ids = instance.heroes['hero_id'].to_numpy()
+    object_ids = instance.objects.sort(['day_open', 'object_id'])['object_id'].to_numpy()
+
+    if case == 'empty':
+        hero_col, object_col = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    elif case == 'one_hero_long':
+        hero_col, object_col = np.full(len(object_ids), hero_ids[0]), object_ids
+    elif case == 'all_heroes':
+        count = min(len(hero_ids), len(object_ids))
+        hero_col, object_col = hero_ids[:count], object_ids[:count]
+    elif case == 'full_assignment':
+        hero_col = hero_ids[np.arange(len(object_ids)) % len(hero_ids)]
+        order = np.argsort(hero_col, kind='stable')
+        hero_col, object_col = hero_col[order], object_ids[order]
+    else:
+        raise ValueError(f"Unknown submission case '{case}', expected one of {SUBMISSION_CASES}")
+
+    return pl.DataFrame({'hero_id': hero_col, 'object_id': object_col}, schema={'hero_id': pl.Int64, 'object_id': pl.Int64})
+
+
+def measure(func, repeats: int = 5, min_time: float = 0.5) -> dict:
+    """
+    Wall time over repeated calls (at least repeats and at least min_time seconds), plus peak traced memory of one call
+    Peak memory comes from tracemalloc, it covers Python and NumPy allocations but not Polars (Rust) buffers
+    With repeats=0 the traced call is the only one (for slow stages), its wall time includes tracing overhead
+    """
+
+    tracemalloc.start()
+    call_start = time.perf_counter()
+    func()
+    traced_time = time.perf_counter() - call_start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if repeats == 0:
+        return {'repeats': 1, 'wall_median': traced_time, 'wall_min': traced_time,
+                'evals_per_sec': 1 / traced_time if traced_time > 0 else None, 'peak_memory_mb': peak / 2**20}
+
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeats or time.perf_counter() - start < min_time:
+        call_start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - call_start)
+
+    return {
+        'repeats': len(times),
+        'wall_median': float(np.median(times)),
+        'wall_min': float(np.min(times)),
+        'evals_per_sec': len(times) / sum(times) if sum(times) > 0 else None,
+        'peak_memory_mb': peak / 2**20,
+    }
+
+
+def bench_instance(name: str, instance: HeroesInstance, load=None, repeats: int = 5, min_time: float = 0.5,
+                   verbose: bool = True) -> list:
+    """
+    Loader (if given) plus evaluator stages on every synthetic submission case of one instance
+    Every result also carries the size of the distance representation (dense matrix or SparseDistances)
+    """
+
+    results = []
+    distance_mb = instance.dist_full.nbytes / 2**20
+
+    def record(stage: str, case: str, func, stage_repeats: int = repeats):
+        result = {'instance': name, 'stage': stage, 'case': case, **measure(func, stage_repeats, min_time),
+                  'distance_memory_mb': distance_mb}
+        results.append(result)
+        if verbose:
+            print(f"{name:>16} {stage:<24} {case or '-':<16} {result['wall_median'] * 1000:10.2f} ms "
+                  f"{result['peak_memory_mb']:9.1f} MB")
+
+    if load is not None:
+        for stage, func in load.items():
+            record(stage, None, func)
+
+    for case in SUBMISSION_CASES:
+        submit = synthetic_submission(instance, case)
+        checked_submit = instance.basic_check(submit)
+        object_ids, hero_offsets = instance.to_flat_routes(submit)
+
+        record('basic_check', case, lambda: instance.basic_check(submit))
+        record('expand_solution', case, lambda: instance.expand_solution(checked_submit))
+        record('evaluate_solution', case, lambda: instance.evaluate_solution(submit))
+        record('evaluate_solution_numpy', case, lambda: instance.evaluate_solution_numpy(submit))
+        record('evaluate_flat', case, lambda: instance.evaluate_flat(object_ids, hero_offsets))
+
+    return results
+
+
+def bench_pipeline(data_path: str = '', verbose: bool = True) -> list:
+    """
+    Layout (generate_coords) and visualization (generate_visualization) stages, single run each
+    Both scripts work in the current directory, so they run in a scratch directory with links to the instance data
+    (coords.csv is copied, generate_coords overwrites it)
+    generate_coords skips its layout cache, otherwise the stage only times a cache hit
+    """
+
+    from generate_coords import generate_coords
+    from generate_visualization import generate_visualization
+
+    data_dir = os.path.abspath(data_path or '.')
+    load_cache(data_path)
+    instance = HeroesInstance(data_path = data_path, use_cache = True)
+
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        for name in SOURCE_FILES:
+            os.symlink(os.path.join(data_dir, name), os.path.join(scratch, name))
+        if os.path.exists(os.path.join(data_dir, 'coords.csv')):
+            shutil.copy(os.path.join(data_dir, 'coords.csv'), os.path.join(scratch, 'coords.csv'))
+        os.symlink(os.path.abspath(default_cache_path(data_path)), default_cache_path(scratch + '/').rstrip('/'))
+        synthetic_submission(instance, 'full_assignment').write_csv(os.path.join(scratch, 'submit.csv'))
+
+        os.chdir(scratch)
+        try:
+            for stage, func in [('generate_coords', lambda: generate_coords(use_cache = False)),
+                                ('generate_visualization', lambda: generate_visualization('submit.csv', 'visualization.html'))]:
+                result = {'instance': 'contest', 'stage': stage, 'case': None, **measure(func, repeats = 0)}
+                results.append(result)
+                if verbose:
+                    print(f"{'contest':>16} {stage:<24} {'-':<16} {result['wall_median'] * 1000:10.2f} ms "
+                          f"{result['peak_memory_mb']:9.1f} MB")
+        finally:
+            os.chdir(cwd)
+
+    return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'polars': pl.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results: list, baseline_path: str):
+    """
+    Print wall time ratios against an earlier benchmark JSON (> 1 means slower now)
+    """
+
+    with open(baseline_path) as f:
+        baseline = {(r['instance'], r['stage'], r['case']): r for r in json.load(f)['results']}
+
+    print(f"\nComparison against {baseline_path} (current / baseline median wall time)")
+    for result in results:
+        old = baseline.get((result['instance'], result['stage'], result['case']))
+        if old and old['wall_median'] > 0:
+            ratio = result['wall_median'] / old['wall_median']
+            flag = '  <-- slower' if ratio > 1.2 else ''
+            print(f"{result['instance']:>16} {result['stage']:<24} {result['case'] or '-':<16} {ratio:6.2f}x{flag}")
+
+
+def run_benchmarks(data_path: str = '', synthetic: list = (5000, 20000), pipeline: bool = False, repeats: int = 5,
+                   min_time: float = 0.5, seed: int = 0, output_path: str = None, verbose: bool = True,
+                   sparse_k: int = None) -> dict:
+    """
+    Run the whole suite: contest instance (loader + evaluator), synthetic instances (evaluator) and optionally the pipeline
+    With sparse_k every instance is benchmarked again right after, with k-nearest-neighbour SparseDistances (name_knn<k>)
+    """
+
+    results = []
+
+    instance = HeroesInstance(data_path = data_path, use_cache = True)
+    load = {
+        'load_csv': lambda: HeroesInstance(data_path = data_path),
+        'load_cache': lambda: HeroesInstance(data_path = data_path, use_cache = True),
+    }
+    results.extend(bench_instance('contest', instance, load, repeats, min_time, verbose))
+    if sparse_k:
+        # Fallback is the memory-mapped cache matrix
+        load = {'load_cache_sparse': lambda: HeroesInstance(data_path = data_path, use_cache = True, sparse_k = sparse_k)}
+        instance = load['load_cache_sparse']()
+        results.extend(bench_instance(f'contest_knn{sparse_k}', instance, load, repeats, min_time, verbose))
+
+    for num_objects in synthetic:
+        arrays = generate_arrays(num_objects, seed = seed)
+        instance = HeroesInstance.from_arrays(arrays)
+        load = {'from_arrays': lambda: HeroesInstance.from_arrays(arrays)}
+        results.extend(bench_instance(f'synth_{num_objects}', instance, load, repeats, min_time, verbose))
+        if sparse_k:
+            # Fallback is the in-memory dense matrix, the build and lookup cost is what gets compared here
+            load = {'build_sparse': lambda: SparseDistances.from_dense(arrays['dist_full'], sparse_k)}
+            instance = HeroesInstance.from_arrays({**arrays, 'dist_full': load['build_sparse']()})
+            results.extend(bench_instance(f'synth_{num_objects}_knn{sparse_k}', instance, load, repeats, min_time, verbose))
+        del arrays, instance
+
+    if pipeline:
+        results.extend(bench_pipeline(data_path, verbose))
+
+    report = {'environment': environment(), 'results': results}
+    if output_path:
+        with open(output_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Benchmark Heroes loader, evaluator, layout and visualization')
+    parser.add_argument('-o', '--output', default = 'benchmark.json', help = 'results JSON')
+    parser.add_argument('--synthetic', type = int, nargs = '*', default = [5000, 20000], help = 'synthetic instance sizes (objects)')
+    parser.add_argument('--pipeline', action = 'store_true', help = 'also run generate_coords and generate_visualization')
+    parser.add_argument('--repeats', type = int, default = 5, help = 'minimum timed calls per stage')
+    parser.add_argument('--min-time', type = float, default = 0.5, help = 'minimum timed seconds per stage')
+    parser.add_argument('--compare', default = None, help = 'earlier results JSON to compare against')
+    parser.add_argument('--sparse-k', type = int, default = None, help = 'also benchmark k-nearest-neighbour sparse distances')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--data-path', default = '', help = 'directory prefix of instance CSVs')
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.data_path, args.synthetic, args.pipeline, args.repeats, args.min_time, args.seed, args.output,
+                            sparse_k = args.sparse_k)
+    if args.compare:
+        compare(report['results'], args.compare)
+    print(f"Benchmark results saved to {args.output}")
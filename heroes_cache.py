@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import polars as pl
+
+# Binary cache of instance data, stored next to the CSVs
+CACHE_DIR = '.heroes_cache'
+CACHE_VERSION = 1
+SOURCE_FILES = ['data_heroes.csv', 'data_objects.csv', 'dist_start.csv', 'dist_objects.csv']
+CACHE_ARRAYS = ['hero_id', 'move_points', 'object_id', 'day_open', 'reward',
+                'dist_start_object_id', 'dist_start', 'dist_full']
+
+
+def file_hash(path: str) -> str:
+    """
+    SHA-256 of a file, read in chunks
+    """
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(data_path: str, with_hash: bool = True, names: list = SOURCE_FILES) -> dict:
+    """
+    Size, mtime and (optionally) content hash of every source CSV (or of names only)
+    """
+
+    fingerprint = {}
+    for name in names:
+        stat = os.stat(f'{data_path}{name}')
+        fingerprint[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        if with_hash:
+            fingerprint[name]['sha256'] = file_hash(f'{data_path}{name}')
+    return fingerprint
+
+
+def build_dist_full(dist_matrix: np.ndarray, dist_start: pl.DataFrame) -> np.ndarray:
+    """
+    Distance matrix with Castle/Depot prepended as row/column 0, so dist_full[from_id, to_id] just works
+    """
+
+    num_objects = dist_matrix.shape[0]
+    dist_full = np.zeros((num_objects + 1, num_objects + 1), dtype=np.int32)
+    dist_full[1:, 1:] = dist_matrix
+    dist_full[0, dist_start['object_id'].to_numpy()] = dist_start['dist_start'].to_numpy()
+    dist_full[1:, 0] = dist_full[0, 1:]
+    return dist_full
+
+
+def default_cache_path(data_path: str) -> str:
+    return f'{data_path}{CACHE_DIR}/'
+
+
+def save_cache(arrays: dict, cache_path: str, meta: dict):
+    """
+    Store arrays as .npy files and then meta.json, which is what marks the cache as valid
+    """
+
+    os.makedirs(cache_path, exist_ok=True)
+
+    # Write to temp files and atomically swap them in, so concurrent workers never see a half-written cache
+    suffix = f'.{os.getpid()}.tmp'
+    for name, values in arrays.items():
+        with open(f'{cache_path}{name}.npy{suffix}', 'wb') as f:
+            np.save(f, np.ascontiguousarray(values))
+        os.replace(f'{cache_path}{name}.npy{suffix}', f'{cache_path}{name}.npy')
+
+    with open(f'{cache_path}meta.json{suffix}', 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(f'{cache_path}meta.json{suffix}', f'{cache_path}meta.json')
+
+
+def generated_meta(cache_path: str) -> dict:
+    """
+    meta.json of a generated instance cache holding its distance matrix, or None
+    """
+
+    try:
+        with open(f'{cache_path}meta.json') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if 'generator' not in meta or not os.path.exists(f'{cache_path}dist_full.npy'):
+        return None
+    return meta
+
+
+def build_cache(data_path: str = '', cache_path: str = None) -> str:
+    """
+    Parse source CSVs once and store them as .npy arrays (distance matrix with Castle/Depot as row/column 0)
+    """
+
+    cache_path = cache_path or default_cache_path(data_path)
+    os.makedirs(cache_path, exist_ok=True)
+
+    heroes = pl.read_csv(f'{data_path}data_heroes.csv')
+    objects = pl.read_csv(f'{data_path}data_objects.csv')
+    dist_start = pl.read_csv(f'{data_path}dist_start.csv')
+
+    meta = {'version': CACHE_VERSION}
+    if os.path.exists(f'{data_path}dist_objects.csv'):
+        dist_matrix = pl.read_csv(f'{data_path}dist_objects.csv').select(pl.all().cast(pl.Int32)).to_numpy()
+        dist_full = build_dist_full(dist_matrix, dist_start)
+        sources = source_fingerprint(data_path)
+    else:
+        # Binary-only generated instance (see generate_instance), the cached matrix is the only copy of object distances
+        generated = generated_meta(cache_path)
+        if generated is None:
+            raise FileNotFoundError(f"No {data_path}dist_objects.csv and no generated distance matrix in {cache_path}")
+        dist_full = np.load(f'{cache_path}dist_full.npy')
+        dist_full[0] = 0
+        dist_full[0, dist_start['object_id'].to_numpy()] = dist_start['dist_start'].to_numpy()
+        dist_full[1:, 0] = dist_full[0, 1:]
+        names = [name for name in SOURCE_FILES if name != 'dist_objects.csv']
+        sources = {**generated['sources'], **source_fingerprint(data_path, names=names)}
+        meta['generator'] = generated['generator']
+
+    arrays = {
+        'hero_id': heroes['hero_id'].to_numpy(),
+        'move_points': heroes['move_points'].to_numpy(),
+        'object_id': objects['object_id'].to_numpy(),
+        'day_open': objects['day_open'].to_numpy(),
+        'reward': objects['reward'].to_numpy(),
+        'dist_start_object_id': dist_start['object_id'].to_numpy(),
+        'dist_start': dist_start['dist_start'].to_numpy(),
+        'dist_full': dist_full,
+    }
+
+    save_cache(arrays, cache_path, {**meta, 'sources': sources})
+    return cache_path
+
+
+def is_cache_valid(data_path: str = '', cache_path: str = None) -> bool:
+    """
+    Check cache against sources: size and mtime first (cheap), content hash if those changed
+    """
+
+    cache_path = cache_path or default_cache_path(data_path)
+    try:
+        with open(f'{cache_path}meta.json') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if meta.get('version') != CACHE_VERSION:
+        return False
+    if not all(os.path.exists(f'{cache_path}{name}.npy') for name in CACHE_ARRAYS):
+        return False
+
+    cached = meta.get('sources', {})
+    names = SOURCE_FILES
+    if 'generator' in meta:
+        # Generated instance (see generate_instance), sources recorded by content only have no file to check
+        # (binary distance matrix, the cache is its only copy) unless one shows up, which then takes over
+        names = [name for name in SOURCE_FILES if 'size' in cached.get(name, {})]
+        if any(os.path.exists(f'{data_path}{name}') for name in SOURCE_FILES if name not in names):
+            return False
+    if not all(os.path.exists(f'{data_path}{name}') for name in names):
+        return False
+
+    current = source_fingerprint(data_path, with_hash=False, names=names)
+    if all(name in cached and cached[name]['size'] == current[name]['size']
+           and cached[name]['mtime_ns'] == current[name]['mtime_ns'] for name in names):
+        return True
+
+    # Files were touched (e.g. fresh checkout), still valid if content is the same
+    for name in names:
+        if name not in cached or cached[name]['sha256'] != file_hash(f'{data_path}{name}'):
+            return False
+
+    # Refresh mtimes so next check takes the fast path again (best effort)
+    try:
+        meta['sources'] = {**cached, **source_fingerprint(data_path, names=names)}
+        suffix = f'.{os.getpid()}.tmp'
+        with open(f'{cache_path}meta.json{suffix}', 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(f'{cache_path}meta.json{suffix}', f'{cache_path}meta.json')
+    except OSError:
+        pass
+
+    return True
+
+
+def source_hashes(data_path: str = '', cache_path: str = None) -> dict:
+    """
+    SHA-256 of every source CSV as recorded in a valid cache (no re-hashing), {file name: hex digest}
+    """
+
+    cache_path = cache_path or default_cache_path(data_path)
+    if not is_cache_valid(data_path, cache_path):
+        build_cache(data_path, cache_path)
+    with open(f'{cache_path}meta.json') as f:
+        meta = json.load(f)
+    return {name: meta['sources'][name]['sha256'] for name in SOURCE_FILES}
+
+
+def load_cache(data_path: str = '', cache_path: str = None, rebuild: bool = True) -> dict:
+    """
+    Memory-map cached arrays (read-only, zero-copy, shared via page cache across processes)
+    Cache is (re)built from CSVs when missing or stale, unless rebuild is False
+    """
+
+    cache_path = cache_path or default_cache_path(data_path)
+    if not is_cache_valid(data_path, cache_path):
+        if not rebuild:
+            raise FileNotFoundError(f"No valid Heroes cache at {cache_path}")
+        build_cache(data_path, cache_path)
+
+    return {name: np.load(f'{cache_path}{name}.npy', mmap_mode='r') for name in CACHE_ARRAYS}
@@ -0,0 +1,321 @@
+import polars as pl
+
+from heroes_utils import HeroesInstance, HERO_COST, simulate_transition
+
+
+class HeroRouteState:
+    """
+    Simulated state of a single hero route, one entry per visited object
+    """
+
+    __slots__ = ('route', 'day_arrive', 'day_leave', 'move_points_arrive', 'move_points_leave', 'reward', 'reward_cum')
+
+    def __init__(self, route: list):
+        self.route = route
+        self.day_arrive = []
+        self.day_leave = []
+        self.move_points_arrive = []
+        self.move_points_leave = []
+        self.reward = []
+        # Prefix sums of rewards, reward_cum[k] is the total reward of the first k visits
+        self.reward_cum = [0]
+
+
+class RouteDeltaEvaluator:
+    """
+    Stateful evaluator for local search moves (insert / remove / relocate / swap / 2-opt) on top of HeroesInstance
+    Each move evaluation replays only the affected hero suffix and stops as soon as day and move points
+    match the old trajectory again, the move is then staged until commit() or rollback()
+    """
+
+    def __init__(self, instance: HeroesInstance, submit: pl.DataFrame = None):
+        self.instance = instance
+
+        # Plain Python lookups, indexing lists is much faster than NumPy scalar access in tight loops
+        self.hero_mp = instance.hero_mp_arr.tolist()
+        self.day_open = instance.day_open_arr.tolist()
+        self.reward = instance.reward_arr.tolist()
+        self.dist = instance.dist_full
+
+        self.states = {}
+        self.assigned = {}
+        self.total_reward = 0
+        self.max_hero = 0
+
+        # Staged move as (score delta, reward delta, new max hero_id, {hero_id: new route})
+        self.pending = None
+
+        if submit is not None:
+            self.load(submit)
+
+    def load(self, submit: pl.DataFrame):
+        """
+        (Re)load full state from a submit candidate, cleaned up with basic_check
+        """
+
+        self.states = {}
+        self.assigned = {}
+        self.pending = None
+
+        checked_submit = self.instance.basic_check(submit)
+        routes = {}
+        if len(checked_submit) > 0:
+            for hero_id, object_id in checked_submit.select(['hero_id', 'object_id']).iter_rows():
+                routes.setdefault(hero_id, []).append(object_id)
+
+        for hero_id, route in routes.items():
+            self._set_route(hero_id, route)
+
+        self.total_reward = sum(state.reward_cum[-1] for state in self.states.values())
+        self.max_hero = max(self.states, default=0)
+
+    @property
+    def score(self) -> int:
+        """
+        Current Gold Score, same as HeroesInstance.evaluate_solution on to_submit()
+        """
+
+        if not self.states:
+            return 0
+        return self.total_reward - self.max_hero * HERO_COST
+
+    def route(self, hero_id: int) -> list:
+        """
+        Current route of a hero (empty list for unused heroes)
+        """
+
+        state = self.states.get(hero_id)
+        return list(state.route) if state else []
+
+    def to_submit(self) -> pl.DataFrame:
+        """
+        Export current routes as a hero_id,object_id submission
+        """
+
+        hero_ids = []
+        object_ids = []
+        for hero_id in sorted(self.states):
+            route = self.states[hero_id].route
+            hero_ids.extend([hero_id] * len(route))
+            object_ids.extend(route)
+        return pl.DataFrame({'hero_id': hero_ids, 'object_id': object_ids})
+
+    def _simulate(self, hero_id: int, route: list) -> HeroRouteState:
+        """
+        Full simulation of a single hero route, used on load and on commit
+        """
+
+        state = HeroRouteState(route)
+        max_move_points = self.hero_mp[hero_id]
+        previous_object, day, move_points = 0, 1, max_move_points
+
+        for target_object in route:
+            day_open = self.day_open[target_object]
+            if previous_object == 0:
+                day, move_points = day_open, max_move_points
+
+            day_arrive, move_points_arrive, day, _, move_points, reward = simulate_transition(
+                max_move_points, day, move_points, self.dist.item(previous_object, target_object),
+                day_open, self.reward[target_object])
+
+            state.day_arrive.append(day_arrive)
+            state.day_leave.append(day)
+            state.move_points_arrive.append(move_points_arrive)
+            state.move_points_leave.append(move_points)
+            state.reward.append(reward)
+            state.reward_cum.append(state.reward_cum[-1] + reward)
+            previous_object = target_object
+
+        return state
+
+    def _set_route(self, hero_id: int, route: list):
+        """
+        Replace hero route and keep object assignment in sync
+        """
+
+        old_state = self.states.pop(hero_id, None)
+        if old_state:
+            for object_id in old_state.route:
+                if self.assigned.get(object_id) == hero_id:
+                    del self.assigned[object_id]
+
+        if route:
+            self.states[hero_id] = self._simulate(hero_id, route)
+            for object_id in route:
+                self.assigned[object_id] = hero_id
+
+    def _replay(self, hero_id: int, new_route: list, start: int, aligned_from: int, offset: int) -> int:
+        """
+        Reward delta of replacing hero route with new_route, replaying from position start only
+        new_route must share the first start objects with the old route, and from position aligned_from on
+        new_route[j] == old_route[j - offset], which is where the replay is allowed to stop early
+        """
+
+        state = self.states.get(hero_id)
+        if state is None:
+            old_route, reward_cum = [], [0]
+        else:
+            old_route, reward_cum = state.route, state.reward_cum
+
+        max_move_points = self.hero_mp[hero_id]
+        if start > 0:
+            previous_object = new_route[start - 1]
+            day, move_points = state.day_leave[start - 1], state.move_points_leave[start - 1]
+        else:
+            previous_object, day, move_points = 0, 1, max_move_points
+
+        new_reward = 0
+        for j in range(start, len(new_route)):
+            target_object = new_route[j]
+            day_open = self.day_open[target_object]
+            if previous_object == 0:
+                day, move_points = day_open, max_move_points
+
+            _, _, day, _, move_points, reward = simulate_transition(
+                max_move_points, day, move_points, self.dist.item(previous_object, target_object),
+                day_open, self.reward[target_object])
+            new_reward += reward
+            previous_object = target_object
+
+            # Same object, same day and same leftover move points - the rest of the old trajectory is unchanged
+            if j >= aligned_from:
+                k = j - offset
+                if state.day_leave[k] == day and state.move_points_leave[k] == move_points:
+                    return new_reward - (reward_cum[k + 1] - reward_cum[start])
+
+        return new_reward - (reward_cum[len(old_route)] - reward_cum[start])
+
+    def _stage(self, changes: dict, reward_delta: int) -> int:
+        """
+        Stage a move given new routes of changed heroes, returns Gold Score delta
+        """
+
+        # Hero cost only depends on the max used hero_id
+        max_hero = self.max_hero
+        if any(hero_id == max_hero and not route for hero_id, route in changes.items()):
+            max_hero = max((hero_id for hero_id in self.states if hero_id not in changes), default=0)
+        max_hero = max([max_hero] + [hero_id for hero_id, route in changes.items() if route])
+
+        old_score = self.score
+        new_total = self.total_reward + reward_delta
+        new_score = new_total - max_hero * HERO_COST if max_hero > 0 else 0
+        delta = new_score - old_score
+
+        self.pending = (delta, reward_delta, max_hero, changes)
+        return delta
+
+    def _check_unassigned(self, object_id: int):
+        if object_id in self.assigned:
+            raise ValueError(f"Object {object_id} is already visited by hero {self.assigned[object_id]}")
+        if not 0 < object_id < len(self.day_open) or self.day_open[object_id] == 0:
+            raise ValueError(f"Unknown object {object_id}")
+
+    def delta_insert(self, hero_id: int, position: int, object_id: int) -> int:
+        """
+        Score delta of inserting an unvisited object at given position of hero route
+        """
+
+        self._check_unassigned(object_id)
+        route = self.states[hero_id].route if hero_id in self.states else []
+        new_route = route[:position] + [object_id] + route[position:]
+
+        reward_delta = self._replay(hero_id, new_route, position, position + 1, 1)
+        return self._stage({hero_id: new_route}, reward_delta)
+
+    def delta_remove(self, hero_id: int, position: int) -> int:
+        """
+        Score delta of removing the object at given position of hero route
+        """
+
+        route = self.states[hero_id].route
+        new_route = route[:position] + route[position + 1:]
+
+        reward_delta = self._replay(hero_id, new_route, position, position, -1)
+        return self._stage({hero_id: new_route}, reward_delta)
+
+    def delta_relocate(self, hero_from: int, position_from: int, hero_to: int, position_to: int) -> int:
+        """
+        Score delta of moving an object to another position (position_to refers to the route after removal)
+        """
+
+        if hero_from == hero_to:
+            route = self.states[hero_from].route
+            new_route = route[:position_from] + route[position_from + 1:]
+            new_route.insert(position_to, route[position_from])
+
+            start = min(position_from, position_to)
+            end = max(position_from, position_to)
+            reward_delta = self._replay(hero_from, new_route, start, end + 1, 0)
+            return self._stage({hero_from: new_route}, reward_delta)
+
+        route_from = self.states[hero_from].route
+        route_to = self.states[hero_to].route if hero_to in self.states else []
+        object_id = route_from[position_from]
+        new_route_from = route_from[:position_from] + route_from[position_from + 1:]
+        new_route_to = route_to[:position_to] + [object_id] + route_to[position_to:]
+
+        reward_delta = self._replay(hero_from, new_route_from, position_from, position_from, -1)
+        reward_delta += self._replay(hero_to, new_route_to, position_to, position_to + 1, 1)
+        return self._stage({hero_from: new_route_from, hero_to: new_route_to}, reward_delta)
+
+    def delta_swap(self, hero_a: int, position_a: int, hero_b: int, position_b: int) -> int:
+        """
+        Score delta of exchanging two visited objects (within one route or between two heroes)
+        """
+
+        if hero_a == hero_b:
+            route = self.states[hero_a].route
+            new_route = list(route)
+            new_route[position_a], new_route[position_b] = route[position_b], route[position_a]
+
+            start = min(position_a, position_b)
+            end = max(position_a, position_b)
+            reward_delta = self._replay(hero_a, new_route, start, end + 1, 0)
+            return self._stage({hero_a: new_route}, reward_delta)
+
+        route_a = self.states[hero_a].route
+        route_b = self.states[hero_b].route
+        new_route_a = list(route_a)
+        new_route_b = list(route_b)
+        new_route_a[position_a], new_route_b[position_b] = route_b[position_b], route_a[position_a]
+
+        reward_delta = self._replay(hero_a, new_route_a, position_a, position_a + 1, 0)
+        reward_delta += self._replay(hero_b, new_route_b, position_b, position_b + 1, 0)
+        return self._stage({hero_a: new_route_a, hero_b: new_route_b}, reward_delta)
+
+    def delta_two_opt(self, hero_id: int, position_i: int, position_j: int) -> int:
+        """
+        Score delta of reversing route segment between positions i and j (inclusive)
+        """
+
+        route = self.states[hero_id].route
+        i, j = min(position_i, position_j), max(position_i, position_j)
+        new_route = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+
+        reward_delta = self._replay(hero_id, new_route, i, j + 1, 0)
+        return self._stage({hero_id: new_route}, reward_delta)
+
+    def commit(self) -> int:
+        """
+        Apply staged move, only changed heroes are re-simulated, returns new Gold Score
+        """
+
+        if self.pending is None:
+            raise ValueError("No staged move to commit")
+
+        _, reward_delta, max_hero, changes = self.pending
+        for hero_id, route in changes.items():
+            self._set_route(hero_id, route)
+
+        self.total_reward += reward_delta
+        self.max_hero = max_hero
+        self.pending = None
+
+        return self.score
+
+    def rollback(self):
+        """
+        Discard staged move, state is left untouched
+        """
+
+        self.pending = None
@@ -0,0 +1,170 @@
+import numpy as np
+from scipy import sparse
+
+# Dense cells scanned per chunk while picking nearest neighbours or materializing a provider
+CHUNK_CELLS = 1 << 24
+
+
+def distance_lookup(dist_full):
+    """
+    Distance provider as solvers index it: dense matrices become int64 arrays (no overflow in time sums),
+    other providers (SparseDistances) are used as they are
+    """
+
+    if isinstance(dist_full, np.ndarray):
+        return np.asarray(dist_full, dtype=np.int64)
+    return dist_full
+
+
+class DenseFallback:
+    """
+    Missing entries read from a dense matrix, typically the read-only memory map of the binary cache (dist_full.npy)
+    Only the pages holding requested pairs are touched
+    """
+
+    def __init__(self, dist_full: np.ndarray):
+        self.dist_full = dist_full
+
+    @classmethod
+    def from_file(cls, path: str):
+        return cls(np.load(path, mmap_mode='r'))
+
+    def __call__(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        return np.asarray(self.dist_full[rows, cols], dtype=np.int64)
+
+
+class SparseDistances:
+    """
+    Distance provider keeping the k nearest neighbours of every node as a scipy CSR matrix (Castle/Depot row 0 is whole)
+    Entries outside the stored neighbourhoods come from fallback(rows, cols), e.g. DenseFallback on a memory map
+    or generate_instance.CoordinateFallback, without a fallback they raise KeyError
+    Indexed like the dense dist_full (node 0 is Castle/Depot, object_id is its own index):
+    - d.item(i, j) and d[i, j] for scalars
+    - d[rows, cols] for index arrays, broadcast like NumPy (np.ix_ blocks included)
+    - d[rows] and slices for full rows
+    np.asarray(d) materializes the dense matrix, only for dense-only consumers (OR-Tools solver)
+    """
+
+    def __init__(self, matrix: sparse.csr_array, fallback=None):
+        self.matrix = sparse.csr_array(matrix)
+        self.matrix.sort_indices()
+        self.fallback = fallback
+        self.shape = self.matrix.shape
+        self.dtype = self.matrix.dtype
+        # Entries missing from the neighbourhoods so far (looked up through the fallback)
+        self.misses = 0
+
+        # Stored entries as sorted row * num_cols + col keys, one searchsorted resolves any batch of pairs
+        rows = np.repeat(np.arange(self.shape[0], dtype=np.int64), np.diff(self.matrix.indptr))
+        self.keys = rows * self.shape[1] + self.matrix.indices
+
+    @classmethod
+    def from_blocks(cls, blocks, shape: tuple, k: int, fallback=None):
+        """
+        Build from dense row blocks [(first row, block), ...] in row order, one block in memory at a time
+        Object rows keep their k nearest other nodes, Castle/Depot row 0 is stored whole
+        """
+
+        k = min(k, shape[1] - 1)
+        indptr, indices, data = [0], [], []
+        for start, block in blocks:
+            block = np.asarray(block)
+            rows = np.arange(start, start + len(block))
+            if start == 0:
+                indices.append(np.arange(shape[1]))
+                data.append(block[0])
+                indptr.append(shape[1])
+                block, rows = block[1:], rows[1:]
+            if len(rows) == 0:
+                continue
+
+            # A node is not its own neighbour
+            ranked = block.astype(np.int64)
+            ranked[np.arange(len(rows)), rows] = np.iinfo(np.int64).max
+            nearest = np.argpartition(ranked, k - 1, axis=1)[:, :k] if k < shape[1] else np.argsort(ranked, axis=1)
+            nearest.sort(axis=1)
+
+            indices.append(nearest.ravel())
+            data.append(np.take_along_axis(block, nearest, axis=1).ravel())
+            indptr.extend(indptr[-1] + k * np.arange(1, len(rows) + 1))
+
+        matrix = sparse.csr_array((np.concatenate(data), np.concatenate(indices).astype(np.int32), np.array(indptr)),
+                                  shape=shape)
+        return cls(matrix, fallback)
+
+    @classmethod
+    def from_dense(cls, dist_full: np.ndarray, k: int, fallback=None, chunk_rows: int = None):
+        """
+        Build from a dense matrix (or memory map) read in row chunks, missing entries fall back to the same matrix
+        by default, so with a memory map the dense matrix stays on disk and only its needed pages are read
+        """
+
+        chunk_rows = chunk_rows or max(1, CHUNK_CELLS // dist_full.shape[1])
+        blocks = ((start, dist_full[start:start + chunk_rows]) for start in range(0, dist_full.shape[0], chunk_rows))
+        return cls.from_blocks(blocks, dist_full.shape, k, fallback if fallback is not None else DenseFallback(dist_full))
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes + self.keys.nbytes
+
+    def neighbours(self, node: int) -> tuple:
+        """
+        Stored neighbours of a node and their distances, sorted by neighbour id
+        """
+
+        start, end = self.matrix.indptr[node], self.matrix.indptr[node + 1]
+        return self.matrix.indices[start:end], self.matrix.data[start:end]
+
+    def pairs(self, rows, cols) -> np.ndarray:
+        """
+        Distances of (row, col) pairs, rows and cols broadcast against each other, int64 result of the broadcast shape
+        """
+
+        rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))
+        query = (rows * self.shape[1] + cols).ravel()
+
+        position = np.minimum(np.searchsorted(self.keys, query), len(self.keys) - 1)
+        found = self.keys[position] == query
+        distances = self.matrix.data[position].astype(np.int64)
+
+        if not found.all():
+            missing = ~found
+            if self.fallback is None:
+                raise KeyError(f"{missing.sum()} distances outside the stored neighbourhoods and no fallback")
+            self.misses += int(missing.sum())
+            distances[missing] = self.fallback(rows.ravel()[missing], cols.ravel()[missing])
+        return distances.reshape(rows.shape)
+
+    def item(self, i: int, j: int) -> int:
+        start, end = self.matrix.indptr[i], self.matrix.indptr[i + 1]
+        position = start + np.searchsorted(self.matrix.indices[start:end], j)
+        if position < end and self.matrix.indices[position] == j:
+            return int(self.matrix.data[position])
+        if self.fallback is None:
+            raise KeyError(f"Distance ({i}, {j}) outside the stored neighbourhoods and no fallback")
+        self.misses += 1
+        return int(self.fallback(np.array([i]), np.array([j]))[0])
+
+    def _axis(self, key, size: int) -> np.ndarray:
+        return np.arange(*key.indices(size)) if isinstance(key, slice) else np.asarray(key, dtype=np.int64)
+
+    def __getitem__(self, key):
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(rows, (int, np.integer)) and isinstance(cols, (int, np.integer)):
+            return self.item(rows, cols)
+
+        row_ids, col_ids = self._axis(rows, self.shape[0]), self._axis(cols, self.shape[1])
+        # A slice spans its own axis, like NumPy mixing an index array with a slice
+        if isinstance(cols, slice):
+            row_ids = row_ids[..., None]
+        elif isinstance(rows, slice):
+            col_ids = col_ids[..., None, :] if col_ids.ndim else col_ids
+            row_ids = row_ids[:, None] if col_ids.ndim else row_ids
+        return self.pairs(row_ids, col_ids)
+
+    def __array__(self, dtype=None, copy=None):
+        dense = np.empty(self.shape, dtype=dtype or self.dtype)
+        chunk_rows = max(1, CHUNK_CELLS // self.shape[1])
+        for start in range(0, self.shape[0], chunk_rows):
+            dense[start:start + chunk_rows] = self[start:start + chunk_rows]
+        return dense
@@ -0,0 +1,137 @@
+import numpy as np
+
+from heroes_utils import HeroesInstance
+
+
+class FeasibilityIndex:
+    """
+    Precomputed feasibility lookups for route construction, built once per HeroesInstance
+
+    - depot_reachable[capacity_idx, object_id]: object can be reached from Castle/Depot on its day_open
+      by a hero with move point capacity capacities[capacity_idx]
+    - per object, nearest neighbours (sorted by distance) restricted to compatible day_open >= own day_open,
+      additionally bucketed by day_open so that "feasible successors" queries only touch relevant entries
+    """
+
+    def __init__(self, instance: HeroesInstance, max_neighbours: int = None, chunk_size: int = 1024):
+        self.instance = instance
+        self.max_neighbours = max_neighbours
+
+        day_open = instance.day_open_arr
+        self.num_nodes = len(day_open)
+        self.max_day = int(day_open.max())
+
+        # 1. Depot reachability per distinct move point capacity (hero starts on day_open with full move points)
+        self.capacities = np.unique(instance.hero_mp_arr[instance.heroes['hero_id'].to_numpy()])
+        self.hero_capacity_idx = np.searchsorted(self.capacities, instance.hero_mp_arr)
+        self.depot_reachable = (instance.dist_full[0][None, :] <= self.capacities[:, None]) & (day_open[None, :] > 0)
+
+        # 2. Nearest neighbours sorted by distance, CSR-style (row 0 is Castle/Depot)
+        self._build_neighbours(chunk_size)
+
+        # 3. Same neighbours regrouped by (object, day_open) buckets, each still sorted by distance
+        self._build_day_buckets()
+
+    def _build_neighbours(self, chunk_size: int):
+        """
+        Sort every distance row once, keeping only compatible successors
+        Processed in row chunks to keep memory bounded on large instances
+        """
+
+        day_open = self.instance.day_open_arr
+        dist_full = self.instance.dist_full
+        num_nodes = self.num_nodes
+        no_edge = np.iinfo(np.int64).max
+
+        ids_chunks, dist_chunks, counts = [], [], []
+        for start in range(0, num_nodes, chunk_size):
+            rows = np.arange(start, min(start + chunk_size, num_nodes))
+            dist = dist_full[rows].astype(np.int64)
+
+            # Successor must open no earlier than current object, never itself nor the Castle/Depot
+            compatible = (day_open[None, :] >= day_open[rows, None]) & (day_open[None, :] > 0)
+            compatible[np.arange(len(rows)), rows] = False
+
+            order = np.argsort(np.where(compatible, dist, no_edge), axis=1, kind='stable')
+            row_counts = compatible.sum(axis=1)
+            if self.max_neighbours is not None:
+                row_counts = np.minimum(row_counts, self.max_neighbours)
+
+            keep = np.arange(num_nodes)[None, :] < row_counts[:, None]
+            ids_chunks.append(order[keep])
+            dist_chunks.append(np.take_along_axis(dist, order, axis=1)[keep])
+            counts.append(row_counts)
+
+        counts = np.concatenate(counts)
+        self.neighbour_offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.neighbour_ids = np.concatenate(ids_chunks).astype(np.int32)
+        self.neighbour_dist = np.concatenate(dist_chunks).astype(np.int32)
+
+    def _build_day_buckets(self):
+        """
+        Stable regroup of neighbour lists by day_open, bucket_offsets[object_id, day] points to bucket start
+        """
+
+        num_days = self.max_day + 2
+        counts = np.diff(self.neighbour_offsets)
+        rows = np.repeat(np.arange(self.num_nodes), counts)
+        days = self.instance.day_open_arr[self.neighbour_ids]
+
+        # Rows stay in place, within each row sort by day keeping distance order
+        order = np.lexsort((np.arange(len(rows)), days, rows))
+        self.bucket_ids = self.neighbour_ids[order]
+        self.bucket_dist = self.neighbour_dist[order]
+
+        bucket_counts = np.bincount(rows * num_days + days, minlength=self.num_nodes * num_days)
+        # Last day column is always empty, so its offset doubles as the row end
+        self.bucket_offsets = np.concatenate([[0], np.cumsum(bucket_counts)])[:-1].reshape(self.num_nodes, num_days)
+
+    def reachable_from_depot(self, hero_id: int, object_id: int) -> bool:
+        """
+        Whether hero can reach object straight from Castle/Depot on its day_open
+        """
+
+        return bool(self.depot_reachable[self.hero_capacity_idx[hero_id], object_id])
+
+    def neighbours(self, object_id: int) -> np.ndarray:
+        """
+        Day-compatible neighbours of an object (0 for Castle/Depot), nearest first
+        """
+
+        return self.neighbour_ids[self.neighbour_offsets[object_id]:self.neighbour_offsets[object_id + 1]]
+
+    def feasible_successors(self, object_id: int, hero_id: int, move_points_left: int, day: int) -> np.ndarray:
+        """
+        Objects a hero can still visit on their day_open right after object_id, nearest first
+        Hero is assumed to leave object_id on a given day with move_points_left (ignored for Castle/Depot start)
+        Same-day objects need enough move points, later-day ones are always fine (hero waits for them)
+        """
+
+        offsets = self.bucket_offsets[object_id]
+
+        if object_id == 0:
+            # From Castle/Depot every object is a "same day" one, reached with full move points
+            cut_days = range(1, self.max_day + 1)
+            move_points_left = self.capacities[self.hero_capacity_idx[hero_id]]
+            full_days = range(0)
+        else:
+            cut_days = [day] if day <= self.max_day else []
+            full_days = range(day + 1, self.max_day + 1)
+
+        id_parts, dist_parts = [], []
+        for d in cut_days:
+            start, end = offsets[d], offsets[d + 1]
+            end = start + np.searchsorted(self.bucket_dist[start:end], move_points_left, side='right')
+            id_parts.append(self.bucket_ids[start:end])
+            dist_parts.append(self.bucket_dist[start:end])
+
+        if len(full_days) > 0:
+            start, end = offsets[full_days.start], offsets[full_days.stop]
+            id_parts.append(self.bucket_ids[start:end])
+            dist_parts.append(self.bucket_dist[start:end])
+
+        if not id_parts:
+            return np.empty(0, dtype=np.int32)
+
+        successor_ids = np.concatenate(id_parts)
+        return successor_ids[np.argsort(np.concatenate(dist_parts), kind='stable')]
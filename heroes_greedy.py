@@ -0,0 +1,443 @@
+import argparse
+import time
+
+import numpy as np
+import polars as pl
+
+from heroes_distances import distance_lookup
+from heroes_utils import HeroesInstance, HERO_COST, VISIT_COST
+from heroes_solver import routes_to_submit
+
+# Cost of an impossible insertion
+NO_INSERTION = np.iinfo(np.int64).max // 4
+
+# Share of the regret added to an insertion's marginal value when ranking candidates
+REGRET_WEIGHT = 0.5
+
+
+class GreedyRoute:
+    """
+    Route under construction, kept in continuous move point time t = (day - 1) * capacity + move points used
+    In that clock travel is plain addition and a visit leaves at min(max(t, day start) + VISIT_COST, day end)
+    """
+
+    __slots__ = ('hero_id', 'capacity', 'nodes', 'leave', 'latest')
+
+    def __init__(self, hero_id: int, capacity: int):
+        self.hero_id = hero_id
+        self.capacity = capacity
+        self.nodes = []
+        # Leave time of each visit and latest arrival that keeps it and every later visit on time
+        self.leave = []
+        self.latest = []
+
+
+class GreedyConstructor:
+    """
+    Deterministic greedy / regret-k insertion constructor on top of HeroesInstance
+    Only on-time insertions are made, heroes are opened in hero_id order (Gold Score charges max(hero_id))
+    Candidates are ranked by marginal value in gold: reward minus insertion time priced at HERO_COST per hero's
+    capacity * num_days move points, plus regret_weight * regret-k over the open routes and the next unopened hero
+    Best insertion per (route, object) is cached and only the route that changed is recomputed after a step
+    """
+
+    def __init__(self, instance: HeroesInstance, regret_k: int = 2, initial_heroes: int = 1,
+                 regret_weight: float = REGRET_WEIGHT):
+        self.instance = instance
+        self.regret_k = regret_k
+        self.initial_heroes = initial_heroes
+        self.regret_weight = regret_weight
+
+        self.dist = distance_lookup(instance.dist_full)
+        self.day_open = instance.day_open_arr
+        self.reward = instance.reward_arr
+        self.num_days = int(self.day_open.max())
+        self.hero_ids = sorted(instance.heroes['hero_id'].to_list())
+
+        self.routes = []
+        self.unassigned = np.zeros(len(self.day_open), dtype=bool)
+        self.unassigned[instance.objects['object_id'].to_numpy()] = True
+
+        # Cached best insertion of every object into every open route (rows follow self.routes):
+        # cost and slot on the route clock, busy is the same insertion without waiting for a later day
+        self.best_cost = np.empty((0, len(self.day_open)), dtype=np.int64)
+        self.best_slot = np.empty((0, len(self.day_open)), dtype=np.int64)
+        self.best_busy = np.empty((0, len(self.day_open)), dtype=np.int64)
+        # Busy time of every object as the first visit of the next unopened hero
+        self.next_busy = np.full(len(self.day_open), NO_INSERTION, dtype=np.int64)
+
+    def _update_schedule(self, route: GreedyRoute):
+        """
+        Recompute leave times forward and latest arrival times backward, O(route length)
+        """
+
+        capacity = route.capacity
+        nodes = route.nodes
+        day_open = self.day_open
+        dist = self.dist
+
+        route.leave = []
+        previous_object, leave = 0, 0
+        for object_id in nodes:
+            day_start = (day_open[object_id] - 1) * capacity
+            if previous_object == 0:
+                arrive = day_start + dist[0, object_id]
+            else:
+                arrive = leave + dist[previous_object, object_id]
+            leave = min(max(arrive, day_start) + VISIT_COST, day_open[object_id] * capacity)
+            route.leave.append(int(leave))
+            previous_object = object_id
+
+        route.latest = [0] * len(nodes)
+        latest = None
+        for k in range(len(nodes) - 1, -1, -1):
+            day_start = (day_open[nodes[k]] - 1) * capacity
+            day_end = day_open[nodes[k]] * capacity
+            if latest is None:
+                latest = day_end
+            else:
+                allowed_leave = latest - dist[nodes[k], nodes[k + 1]]
+                if allowed_leave >= day_end:
+                    latest = day_end
+                elif allowed_leave >= day_start + VISIT_COST:
+                    latest = allowed_leave - VISIT_COST
+                else:
+                    latest = -NO_INSERTION
+            route.latest[k] = int(latest)
+
+    def _insertion_rows(self, routes: list, candidates: np.ndarray = None) -> tuple:
+        """
+        Best insertion cost, slot and busy time of unassigned objects (or only candidates) into each of routes,
+        vectorized over the slots of all routes x objects, entries of other objects are NO_INSERTION
+        Cost is the time a route loses: push of next visit leave time, or leave time growth when appending
+        Busy time does not count waiting for a later day when appending, that time is still free for other visits
+        (cost keeps it: charging idle days packs each route day by day, busy compares routes for regret)
+        """
+
+        num_nodes = len(self.day_open)
+        rows_cost = np.full((len(routes), num_nodes), NO_INSERTION, dtype=np.int64)
+        rows_slot = np.zeros((len(routes), num_nodes), dtype=np.int64)
+        rows_busy = np.full((len(routes), num_nodes), NO_INSERTION, dtype=np.int64)
+
+        if candidates is None:
+            candidates = np.flatnonzero(self.unassigned)
+        if len(routes) == 0 or len(candidates) == 0:
+            return rows_cost, rows_slot, rows_busy
+
+        # Slots of all routes stacked, slot p of a route goes right after nodes[p - 1] (slot 0 starts from Castle/Depot)
+        num_slots = np.array([len(route.nodes) + 1 for route in routes])
+        first = np.concatenate([[0], np.cumsum(num_slots)[:-1]])
+        last = first + num_slots - 1
+
+        capacity = np.repeat([route.capacity for route in routes], num_slots)[:, None]
+        previous = np.concatenate([[0] + route.nodes for route in routes])
+        previous_leave = np.concatenate([[0] + route.leave for route in routes])[:, None]
+        # Visit pushed by each slot, appending slots get a dummy Castle/Depot visit that never limits
+        following = np.concatenate([route.nodes + [0] for route in routes])
+        following_leave = np.concatenate([route.leave + [0] for route in routes])[:, None]
+        following_latest = np.concatenate([route.latest + [NO_INSERTION] for route in routes])[:, None]
+
+        start_o = (self.day_open[candidates] - 1) * capacity
+        end_o = self.day_open[candidates] * capacity
+        arrive_o = previous_leave + self.dist[np.ix_(previous, candidates)]
+        arrive_o[first] = start_o[first] + self.dist[0, candidates]
+
+        feasible = arrive_o <= end_o
+        leave_o = np.minimum(np.maximum(arrive_o, start_o) + VISIT_COST, end_o)
+
+        # Next visit must still be reached before its latest arrival
+        start_next = (self.day_open[following] - 1)[:, None] * capacity
+        end_next = self.day_open[following][:, None] * capacity
+        arrive_next = leave_o + self.dist[np.ix_(candidates, following)].T
+        feasible &= arrive_next <= following_latest
+
+        cost = np.minimum(np.maximum(arrive_next, start_next) + VISIT_COST, end_next) - following_leave
+        cost[last] = leave_o[last] - previous_leave[last]
+        cost[~feasible] = NO_INSERTION
+        busy = cost.copy()
+        busy[last] = np.where(feasible[last], leave_o[last] - np.maximum(previous_leave[last], start_o[last]), NO_INSERTION)
+
+        rows_cost[:, candidates] = np.minimum.reduceat(cost, first, axis=0)
+        rows_busy[:, candidates] = np.minimum.reduceat(busy, first, axis=0)
+        for route_idx, (begin, end) in enumerate(zip(first, last + 1)):
+            rows_slot[route_idx, candidates] = np.argmin(cost[begin:end], axis=0)
+        return rows_cost, rows_slot, rows_busy
+
+    def _insertion_row(self, route: GreedyRoute, candidates: np.ndarray = None) -> tuple:
+        return tuple(rows[0] for rows in self._insertion_rows([route], candidates))
+
+    def _next_hero(self) -> GreedyRoute:
+        if len(self.routes) == len(self.hero_ids):
+            return None
+        hero_id = self.hero_ids[len(self.routes)]
+        return GreedyRoute(hero_id, int(self.instance.hero_mp_arr[hero_id]))
+
+    def _update_next_hero(self):
+        route = self._next_hero()
+        if route is None:
+            self.next_busy = np.full(len(self.day_open), NO_INSERTION, dtype=np.int64)
+        else:
+            self.next_busy = self._insertion_row(route)[2]
+
+    def _open_hero(self) -> bool:
+        """
+        Open next hero in hero_id order, False if all heroes are in use
+        """
+
+        route = self._next_hero()
+        if route is None:
+            return False
+        self.routes.append(route)
+
+        row_cost, row_slot, row_busy = self._insertion_row(route)
+        self.best_cost = np.vstack([self.best_cost, row_cost])
+        self.best_slot = np.vstack([self.best_slot, row_slot])
+        self.best_busy = np.vstack([self.best_busy, row_busy])
+        self._update_next_hero()
+        return True
+
+    def _gold_per_move_point(self, capacities) -> np.ndarray:
+        # A hero costs HERO_COST for capacity move points on each of num_days days
+        return HERO_COST / (np.asarray(capacities, dtype=np.float64) * self.num_days)
+
+    def _select(self) -> tuple:
+        """
+        Pick (route index, object) with the largest marginal value plus regret_weight * regret-k
+        Marginal value is reward minus insertion time in gold, the object goes to the route where it is largest
+        Regret-k sums the value lost by falling back to the 2nd..k-th best option, options are the open routes and
+        the next unopened hero (charged HERO_COST shared by the visits a route holds on average), measured on busy time
+        Options an object does not have count as leaving it unserved (value 0)
+        """
+
+        feasible = self.best_cost < NO_INSERTION
+        insertable = feasible.any(axis=0)
+        if not insertable.any():
+            return None
+
+        objects = np.flatnonzero(insertable)
+        reward = self.reward[objects]
+        price = self._gold_per_move_point([route.capacity for route in self.routes])[:, None]
+
+        value = np.where(feasible[:, objects], reward - self.best_cost[:, objects] * price, -np.inf)
+        route_idx = np.argmax(value, axis=0)
+        score = value[route_idx, np.arange(len(objects))]
+
+        if self.regret_k > 1:
+            busy = self.best_busy[:, objects]
+            options = np.where(busy < NO_INSERTION, reward - busy * price, 0.0)
+
+            next_route = self._next_hero()
+            if next_route is not None:
+                next_busy = self.next_busy[objects]
+                visits_per_route = max(1.0, sum(len(route.nodes) for route in self.routes) / len(self.routes))
+                next_value = reward - next_busy * self._gold_per_move_point(next_route.capacity) - \
+                    HERO_COST / visits_per_route
+                options = np.vstack([options, np.where(next_busy < NO_INSERTION, next_value, 0.0)])
+
+            options = -np.sort(-options, axis=0)
+            if len(options) < self.regret_k:
+                options = np.vstack([options, np.zeros((self.regret_k - len(options), len(objects)))])
+            regret = (options[0] - options[1:self.regret_k]).sum(axis=0)
+            score = score + self.regret_weight * regret
+
+        best = int(np.argmax(score))
+        return int(route_idx[best]), int(objects[best])
+
+    def _insert(self, route_idx: int, object_id: int):
+        route = self.routes[route_idx]
+        route.nodes.insert(int(self.best_slot[route_idx, object_id]), object_id)
+        self._update_schedule(route)
+
+        self.unassigned[object_id] = False
+        self.best_cost[:, object_id] = NO_INSERTION
+        self.best_busy[:, object_id] = NO_INSERTION
+        self.next_busy[object_id] = NO_INSERTION
+
+        # Only the changed route needs fresh insertion costs
+        self.best_cost[route_idx], self.best_slot[route_idx], self.best_busy[route_idx] = self._insertion_row(route)
+
+    def _release(self, object_ids: np.ndarray, skip_routes: set = frozenset()):
+        """
+        Make objects unassigned again and add their insertion entries to the rows of routes not in skip_routes
+        (those get whole fresh rows from the caller), the next hero row is refreshed as well
+        """
+
+        self.unassigned[object_ids] = True
+        route_ids = [route_idx for route_idx in range(len(self.routes)) if route_idx not in skip_routes]
+        rows = self._insertion_rows([self.routes[route_idx] for route_idx in route_ids], object_ids)
+        for matrix, row in zip((self.best_cost, self.best_slot, self.best_busy), rows):
+            matrix[np.ix_(route_ids, object_ids)] = row[:, object_ids]
+        self._update_next_hero()
+
+    def _drop_last_heroes(self, count: int):
+        dropped = self.routes[len(self.routes) - count:]
+        del self.routes[len(self.routes) - count:]
+        self.best_cost, self.best_slot, self.best_busy = (rows[:len(self.routes)] for rows in
+                                                          (self.best_cost, self.best_slot, self.best_busy))
+        self._release(np.array([object_id for route in dropped for object_id in route.nodes], dtype=np.int64))
+
+    def update_routes(self, routes: dict):
+        """
+        Replace the routes of open heroes with {hero_id: [object_id, ...]} (e.g. after an ALNS destroy step)
+        Only changed routes get fresh insertion rows, other routes only gain entries of the objects set free
+        Late visits are dropped, heroes up to the largest used hero_id are opened (like load_routes)
+        """
+
+        unknown = [hero_id for hero_id, nodes in routes.items() if nodes and hero_id not in self.hero_ids]
+        if unknown:
+            raise ValueError(f"Routes of unknown heroes: {sorted(unknown)}")
+        max_hero = max((hero_id for hero_id, nodes in routes.items() if nodes), default=0)
+        while (not self.routes or self.routes[-1].hero_id < max_hero) and self._open_hero():
+            pass
+
+        was_assigned = np.zeros_like(self.unassigned)
+        touched = set()
+        for route_idx, route in enumerate(self.routes):
+            was_assigned[route.nodes] = True
+            nodes = list(routes.get(route.hero_id, []))
+            if nodes != route.nodes:
+                route.nodes = self._on_time_nodes(nodes, route.capacity)
+                self._update_schedule(route)
+                touched.add(route_idx)
+
+        assigned = np.zeros_like(self.unassigned)
+        for route in self.routes:
+            assigned[route.nodes] = True
+
+        # Objects moved into routes are not candidates any more
+        taken = np.flatnonzero(assigned & ~was_assigned)
+        self.unassigned[taken] = False
+        self.best_cost[:, taken] = NO_INSERTION
+        self.best_busy[:, taken] = NO_INSERTION
+
+        freed = np.flatnonzero(was_assigned & ~assigned)
+        self.unassigned[freed] = True
+        touched_ids = sorted(touched)
+        rows = self._insertion_rows([self.routes[route_idx] for route_idx in touched_ids])
+        for matrix, row in zip((self.best_cost, self.best_slot, self.best_busy), rows):
+            matrix[touched_ids] = row
+        self._release(freed, touched)
+
+    def copy(self) -> 'GreedyConstructor':
+        """
+        Independent copy of the construction state (routes and cached insertion rows), instance data is shared
+        """
+
+        other = object.__new__(GreedyConstructor)
+        other.__dict__.update(self.__dict__)
+        other.routes = []
+        for route in self.routes:
+            copied = GreedyRoute(route.hero_id, route.capacity)
+            copied.nodes, copied.leave, copied.latest = list(route.nodes), list(route.leave), list(route.latest)
+            other.routes.append(copied)
+        for name in ('unassigned', 'best_cost', 'best_slot', 'best_busy', 'next_busy'):
+            setattr(other, name, getattr(self, name).copy())
+        return other
+
+    def solution(self) -> dict:
+        return {route.hero_id: list(route.nodes) for route in self.routes if route.nodes}
+
+    def route_reward(self, route: GreedyRoute) -> int:
+        return int(self.reward[route.nodes].sum()) if route.nodes else 0
+
+    def _on_time_nodes(self, nodes: list, capacity: int) -> list:
+        """
+        Drop visits that would arrive late (e.g. after a removal, distances break triangle inequality), single forward pass
+        """
+
+        day_open = self.day_open
+        dist = self.dist
+
+        kept, previous_object, leave = [], 0, 0
+        for object_id in nodes:
+            day_start = (day_open[object_id] - 1) * capacity
+            day_end = day_open[object_id] * capacity
+            if previous_object == 0:
+                arrive = day_start + dist[0, object_id]
+            else:
+                arrive = leave + dist[previous_object, object_id]
+            if arrive > day_end:
+                continue
+            leave = min(max(arrive, day_start) + VISIT_COST, day_end)
+            kept.append(object_id)
+            previous_object = object_id
+        return kept
+
+    def load_routes(self, routes: dict):
+        """
+        Start from existing routes {hero_id: [object_id, ...]}, heroes up to the largest used hero_id are opened
+        Late visits are dropped and become candidates for insertion again
+        """
+
+        max_hero = max((hero_id for hero_id, route in routes.items() if route), default=0)
+        for hero_id in self.hero_ids[len(self.routes):]:
+            if hero_id > max_hero:
+                break
+            route = GreedyRoute(hero_id, int(self.instance.hero_mp_arr[hero_id]))
+            route.nodes = self._on_time_nodes(routes.get(hero_id, []), route.capacity)
+            self.unassigned[route.nodes] = False
+            self._update_schedule(route)
+            self.routes.append(route)
+
+        # Insertion rows only after every loaded object is marked as assigned
+        self.best_cost, self.best_slot, self.best_busy = self._insertion_rows(self.routes)
+        self._update_next_hero()
+
+    def build(self, routes: dict = None) -> dict:
+        """
+        Run construction (or repair of partial routes), returns {hero_id: [object_id, ...]}
+        """
+
+        if routes:
+            self.load_routes(routes)
+
+        while len(self.routes) < min(self.initial_heroes, len(self.hero_ids)):
+            self._open_hero()
+
+        while self.unassigned.any():
+            choice = self._select()
+            if choice is None:
+                # Nothing fits even into a fresh empty hero, later heroes would only add cost
+                if self.routes and not self.routes[-1].nodes:
+                    break
+                # Nothing fits into current heroes, next hero is only worth it if it pays for itself (checked below)
+                if not self._open_hero():
+                    break
+                continue
+            self._insert(*choice)
+
+        # Drop trailing heroes that collect less than they cost
+        kept = len(self.routes)
+        while kept and self.route_reward(self.routes[kept - 1]) <= HERO_COST:
+            kept -= 1
+        if kept < len(self.routes):
+            self._drop_last_heroes(len(self.routes) - kept)
+
+        return self.solution()
+
+
+def greedy_solution(instance: HeroesInstance, regret_k: int = 2, initial_heroes: int = 1,
+                    regret_weight: float = REGRET_WEIGHT) -> pl.DataFrame:
+    """
+    Baseline submission from greedy / regret-k insertion
+    """
+
+    return routes_to_submit(GreedyConstructor(instance, regret_k, initial_heroes, regret_weight).build())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Build a greedy / regret-k insertion baseline submission')
+    parser.add_argument('-o', '--output', default = 'solution_greedy.csv', help = 'submission file to write')
+    parser.add_argument('-k', '--regret-k', type = int, default = 2, help = 'regret order (1 = plain greedy)')
+    parser.add_argument('--initial-heroes', type = int, default = 1, help = 'heroes opened up front')
+    parser.add_argument('--regret-weight', type = float, default = REGRET_WEIGHT, help = 'share of regret added to marginal value')
+    parser.add_argument('--data-path', default = '', help = 'directory prefix of instance CSVs')
+    args = parser.parse_args()
+
+    instance = HeroesInstance(data_path = args.data_path, use_cache = True)
+    start = time.perf_counter()
+    submit = greedy_solution(instance, args.regret_k, args.initial_heroes, args.regret_weight)
+    elapsed = time.perf_counter() - start
+
+    submit.write_csv(args.output)
+    print(f"Gold Score {instance.evaluate_solution(submit)} ({len(submit)} visits) built in {elapsed:.2f}s, saved to {args.output}")
@@ -0,0 +1,96 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+# Shared no-op context for disabled profiling, entering it costs a couple of attribute lookups
+_NO_STAGE = contextlib.nullcontext()
+
+
+def stage(profiler, name: str):
+    """
+    Stage timer of a profiler, or a no-op context when profiler is None (profiling off)
+    """
+
+    return _NO_STAGE if profiler is None else profiler.stage(name)
+
+
+class Profiler:
+    """
+    Opt-in instrumentation: named stage timers (wall time, nestable) and named counters
+    Attach to HeroesInstance(profiler = ...) or pass to generate_visualization, code paths skip all of it when None
+    With trace=True every stage call is also kept as an event for write_chrome_trace (chrome://tracing, Perfetto)
+    """
+
+    def __init__(self, trace: bool = False):
+        self.trace = trace
+        self.reset()
+
+    def reset(self):
+        self.stages = {}
+        self.counters = {}
+        self.events = []
+        self.origin = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            calls, total, worst = self.stages.get(name, (0, 0.0, 0.0))
+            self.stages[name] = (calls + 1, total + elapsed, max(worst, elapsed))
+            if self.trace:
+                self.events.append((name, start - self.origin, elapsed, threading.get_ident()))
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def count_visits(self, is_earlier, is_late, move_points_burned):
+        """
+        Simulation counters from per-visit columns: transitions, early / late arrivals and move points burned
+        """
+
+        self.count('transitions', len(is_late))
+        self.count('early_arrivals', is_earlier.sum())
+        self.count('late_arrivals', is_late.sum())
+        self.count('move_points_burned', move_points_burned.sum())
+
+    def report(self) -> dict:
+        """
+        Stats as a plain dict: {'stages': {name: {calls, total_s, mean_ms, max_ms}}, 'counters': {name: value}}
+        Stages are sorted by total time, nested stages are also part of their parent's time
+        """
+
+        stages = {name: {'calls': calls, 'total_s': total, 'mean_ms': total / calls * 1000, 'max_ms': worst * 1000}
+                  for name, (calls, total, worst) in sorted(self.stages.items(), key=lambda item: -item[1][1])}
+        return {'stages': stages, 'counters': dict(self.counters)}
+
+    def format_report(self) -> str:
+        report = self.report()
+        lines = [f"{'stage':<32} {'calls':>8} {'total s':>10} {'mean ms':>10} {'max ms':>10}"]
+        for name, row in report['stages'].items():
+            lines.append(f"{name:<32} {row['calls']:>8} {row['total_s']:10.4f} {row['mean_ms']:10.3f} {row['max_ms']:10.3f}")
+        for name, value in report['counters'].items():
+            lines.append(f"{name:<32} {value:>8}")
+        return '\n'.join(lines)
+
+    def write_json(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_chrome_trace(self, path: str):
+        """
+        Stage events in Chrome trace event format (complete 'X' events, microseconds), counters as metadata
+        """
+
+        if not self.trace:
+            raise ValueError("Profiler was created with trace=False, no events were recorded")
+
+        pid = os.getpid()
+        events = [{'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': elapsed * 1e6, 'pid': pid, 'tid': tid}
+                  for name, start, elapsed, tid in self.events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': self.counters}, f)
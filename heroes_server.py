@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+import polars as pl
+
+from heroes_batch import POOL_CONTEXT, attach_instance, share_instance, submission_stats
+from heroes_utils import HeroesInstance
+
+DEFAULT_SOCKET = '/tmp/heroes_scoring.sock'
+
+# Longest request line (a JSON document), large CSV submissions included
+MAX_REQUEST_BYTES = 1 << 28
+
+# Per-worker state, set up once by the pool initializer
+_worker_instance = None
+_worker_blocks = []
+
+
+def score_request(instance: HeroesInstance, request: dict) -> dict:
+    """
+    Score one request, errors are reported in the response instead of raised
+    - {'csv': 'hero_id,object_id\n...'}: submission as CSV text
+    - {'object_ids': [...], 'hero_offsets': [...]}: flat CSR-like encoding (see HeroesInstance.to_flat_routes)
+    Response has id (echoed), score, reward, heroes_used, max_hero_id, late_count, elapsed and error
+    """
+
+    start = time.perf_counter()
+    response = {'id': request.get('id'), 'score': None, 'reward': None, 'heroes_used': None,
+                'max_hero_id': None, 'late_count': None, 'elapsed': None, 'error': None}
+    try:
+        if 'csv' in request:
+            submit = pl.read_csv(io.StringIO(request['csv']))
+        elif 'object_ids' in request and 'hero_offsets' in request:
+            submit = instance.from_flat_routes(np.asarray(request['object_ids'], dtype=np.int64),
+                                               np.asarray(request['hero_offsets'], dtype=np.int64))
+        else:
+            raise ValueError("Request must have 'csv' text or 'object_ids' and 'hero_offsets'")
+        response.update(submission_stats(instance, submit))
+    except Exception as e:
+        response['error'] = f'{type(e).__name__}: {e}'
+    response['elapsed'] = time.perf_counter() - start
+    return response
+
+
+def _init_worker(spec: dict):
+    global _worker_instance, _worker_blocks
+    _worker_blocks, _worker_instance = attach_instance(spec)
+
+
+def _score_in_worker(request: dict) -> dict:
+    return score_request(_worker_instance, request)
+
+
+class ScoringServer:
+    """
+    Long-running local scoring service, the instance is loaded once and kept warm
+    Protocol is one JSON document per line both ways (see score_request), over a Unix socket or localhost TCP
+    Requests run concurrently in a process pool sharing the instance through shared memory (heroes_batch),
+    workers=0 scores in a thread of the server process instead
+    Requests of one connection may be pipelined, responses carry the request id and can come back out of order
+    """
+
+    def __init__(self, instance: HeroesInstance, workers: int = 1, max_request_bytes: int = MAX_REQUEST_BYTES):
+        self.instance = instance
+        self.workers = workers
+        self.max_request_bytes = max_request_bytes
+        self.blocks = []
+        if workers > 0:
+            self.blocks, spec = share_instance(instance)
+            self.pool = ProcessPoolExecutor(max_workers = workers, mp_context = POOL_CONTEXT, initializer = _init_worker,
+                                            initargs = (spec,))
+            self.score = _score_in_worker
+        else:
+            self.pool = ThreadPoolExecutor(max_workers = 1)
+            self.score = partial(score_request, instance)
+        self.requests = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        write_lock = asyncio.Lock()
+        pending = set()
+
+        async def send(response: dict):
+            async with write_lock:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+
+        async def respond(request: dict):
+            if request.get('op') == 'ping':
+                response = {'id': request.get('id'), 'ok': True, 'requests': self.requests, 'workers': self.workers}
+            else:
+                response = await loop.run_in_executor(self.pool, self.score, request)
+                self.requests += 1
+            await send(response)
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line longer than the stream limit, the rest of the stream cannot be framed any more
+                    await send({'id': None, 'error': f'ValueError: request longer than {self.max_request_bytes} bytes'})
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await send({'id': None, 'error': f'JSONDecodeError: {e}'})
+                    continue
+                if not isinstance(request, dict):
+                    await send({'id': None, 'error': f'ValueError: request must be a JSON object, got {type(request).__name__}'})
+                    continue
+                task = asyncio.create_task(respond(request))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        except ConnectionError:
+            pass
+        finally:
+            # A client gone mid-stream leaves nobody to answer, queued requests are dropped
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def serve(self, socket_path: str = DEFAULT_SOCKET, host: str = '127.0.0.1', port: int = None):
+        if port is not None:
+            server = await asyncio.start_server(self.handle, host, port, limit = self.max_request_bytes)
+        else:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            server = await asyncio.start_unix_server(self.handle, socket_path, limit = self.max_request_bytes)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures = True)
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def serve(data_path: str = '', socket_path: str = DEFAULT_SOCKET, host: str = '127.0.0.1', port: int = None,
+          workers: int = 1):
+    """
+    Load the instance and serve until interrupted, on a Unix socket unless a TCP port is given
+    """
+
+    server = ScoringServer(HeroesInstance(data_path = data_path, use_cache = True), workers)
+    address = f'{host}:{port}' if port is not None else socket_path
+    print(f"Scoring server on {address} with {workers} worker(s), Ctrl+C to stop", flush = True)
+
+    async def run():
+        # Stop on Ctrl+C or kill, also when started in the background where SIGINT is ignored
+        loop = asyncio.get_running_loop()
+        serving = asyncio.current_task()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, serving.cancel)
+        with contextlib.suppress(asyncio.CancelledError):
+            await server.serve(socket_path, host, port)
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.close()
+        if port is None and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+class ScoringClient:
+    """
+    Blocking client of a running ScoringServer over one persistent connection, for scripts and notebooks
+    Every call returns the response dict (see score_request), failures come back in its 'error' field
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, host: str = '127.0.0.1', port: int = None, timeout: float = 60):
+        if port is not None:
+            self.sock = socket.create_connection((host, port), timeout = timeout)
+        else:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(socket_path)
+        self.stream = self.sock.makefile('rwb')
+        self.ids = itertools.count(1)
+
+    def request(self, request: dict) -> dict:
+        request = {**request, 'id': next(self.ids)}
+        self.stream.write(json.dumps(request).encode() + b'\n')
+        self.stream.flush()
+        while True:
+            line = self.stream.readline()
+            if not line:
+                raise ConnectionError("Scoring server closed the connection")
+            response = json.loads(line)
+            # Requests the server could not parse are answered without an id
+            if response.get('id') in (request['id'], None):
+                return response
+
+    def ping(self) -> dict:
+        return self.request({'op': 'ping'})
+
+    def score_csv(self, text: str) -> dict:
+        return self.request({'csv': text})
+
+    def score_file(self, path: str) -> dict:
+        with open(path) as f:
+            return self.score_csv(f.read())
+
+    def score_submit(self, submit: pl.DataFrame) -> dict:
+        return self.score_csv(submit.write_csv())
+
+    def score_flat(self, object_ids, hero_offsets) -> dict:
+        return self.request({'object_ids': np.asarray(object_ids).tolist(), 'hero_offsets': np.asarray(hero_offsets).tolist()})
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Local scoring server keeping the Heroes instance loaded')
+    parser.add_argument('--socket', default = DEFAULT_SOCKET, help = 'Unix socket path')
+    parser.add_argument('--port', type = int, default = None, help = 'serve on localhost TCP instead of a Unix socket')
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('-w', '--workers', type = int, default = 1, help = 'worker processes (0 = score in the server process)')
+    parser.add_argument('--data-path', default = '', help = 'directory prefix of instance CSVs')
+    args = parser.parse_args()
+
+    serve(args.data_path, args.socket, args.host, args.port, args.workers)
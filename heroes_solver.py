@@ -0,0 +1,233 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import polars as pl
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+from heroes_batch import POOL_CONTEXT
+from heroes_utils import HeroesInstance, HERO_COST, VISIT_COST
+
+# Model clock: every day is DAY_UNITS long for every hero, move points are scaled by hero capacity
+DAY_UNITS = 100_000
+# Objective weights: gold is worth much more than distance (distance is only a tie-breaker)
+GOLD_WEIGHT = 10_000
+
+# Best first on the contest data (insertion strategies handle the optional visits best)
+FIRST_SOLUTION_STRATEGIES = ['PARALLEL_CHEAPEST_INSERTION', 'LOCAL_CHEAPEST_INSERTION', 'CHRISTOFIDES', 'SAVINGS',
+                             'PATH_CHEAPEST_ARC', 'BEST_INSERTION']
+METAHEURISTICS = ['GUIDED_LOCAL_SEARCH', 'SIMULATED_ANNEALING', 'TABU_SEARCH']
+
+
+def routes_to_submit(routes: dict) -> pl.DataFrame:
+    """
+    Convert {hero_id: [object_id, ...]} into a hero_id,object_id submission (heroes in id order)
+    """
+
+    hero_ids, object_ids = [], []
+    for hero_id in sorted(routes):
+        hero_ids.extend([hero_id] * len(routes[hero_id]))
+        object_ids.extend(routes[hero_id])
+    return pl.DataFrame({'hero_id': hero_ids, 'object_id': object_ids}, schema={'hero_id': pl.Int64, 'object_id': pl.Int64})
+
+
+def route_reward(instance: HeroesInstance, hero_id: int, route: list) -> int:
+    """
+    Total reward a single hero collects along a route (no hero cost)
+    """
+
+    hero_offsets = np.zeros(hero_id + 1, dtype=np.int64)
+    hero_offsets[hero_id] = len(route)
+    return instance.evaluate_flat(route, hero_offsets) + hero_id * HERO_COST
+
+
+def compact_heroes(instance: HeroesInstance, routes: dict) -> dict:
+    """
+    Move routes to smaller unused hero ids that collect at least the same reward, other routes keep their hero id
+    Gold Score charges max(hero_id) * HERO_COST, so gaps in used hero ids are pure loss
+    """
+
+    compacted = {hero_id: route for hero_id, route in routes.items() if route}
+    hero_ids = sorted(int(h) for h in instance.heroes['hero_id'].to_list())
+
+    # Largest hero ids move first, every move can only lower max(hero_id)
+    for hero_id in sorted(compacted, reverse=True):
+        route = compacted[hero_id]
+        reward = route_reward(instance, hero_id, route)
+        for candidate in hero_ids:
+            if candidate >= hero_id:
+                break
+            if candidate not in compacted and route_reward(instance, candidate, route) >= reward:
+                compacted[candidate] = compacted.pop(hero_id)
+                break
+    return compacted
+
+
+def build_routing_model(instance: HeroesInstance, num_heroes: int):
+    """
+    OR-Tools routing model of the Heroes problem for the hero fleet 1..num_heroes
+    - time dimension is the move point / day clock, each hero's move points are scaled to DAY_UNITS per day
+      (travel carrying over to next day is then plain time addition), service time is VISIT_COST
+    - hero leaves Castle/Depot at the start of first object's day_open, so depot transit includes that offset
+    - day_open gives a [day_open - 1, day_open] day time window, late visits are dropped via disjunctions
+    - unvisited objects cost their reward, heroes are free: Gold Score charges max(hero_id) * HERO_COST, so the
+      whole fleet is paid up front and fleet size is searched over by the starts (see multi_start_configs)
+    Rounding is conservative, so any model-feasible route is on-time in the real simulation
+    """
+
+    num_nodes = instance.dist_full.shape[0]
+    max_day = int(instance.day_open_arr.max())
+    horizon = max_day * DAY_UNITS
+
+    manager = pywrapcp.RoutingIndexManager(num_nodes, num_heroes, 0)
+    routing = pywrapcp.RoutingModel(manager)
+
+    # Distance as arc cost (tie-breaker only), returning to Castle/Depot is free
+    dist = np.asarray(instance.dist_full, dtype=np.int64).copy()
+    dist[:, 0] = 0
+    arc_callback = routing.RegisterTransitMatrix(dist.tolist())
+    routing.SetArcCostEvaluatorOfAllVehicles(arc_callback)
+
+    # Per-capacity scaled transit (service at origin + travel), rounded up
+    service = np.full(num_nodes, VISIT_COST, dtype=np.int64)
+    service[0] = 0
+    day_start = (instance.day_open_arr - 1) * DAY_UNITS
+    transit_callbacks = {}
+    vehicle_callbacks = []
+    for hero_id in range(1, num_heroes + 1):
+        capacity = int(instance.hero_mp_arr[hero_id])
+        if capacity not in transit_callbacks:
+            transit = -(-(service[:, None] + dist) * DAY_UNITS // capacity)
+            transit[0, 1:] += day_start[1:]
+            transit[:, 0] = 0
+            transit_callbacks[capacity] = routing.RegisterTransitMatrix(transit.tolist())
+        vehicle_callbacks.append(transit_callbacks[capacity])
+
+    # Waiting (early arrival) is slack, all heroes start at model time 0
+    routing.AddDimensionWithVehicleTransits(vehicle_callbacks, horizon, horizon, True, 'Time')
+    time_dimension = routing.GetDimensionOrDie('Time')
+
+    # Time windows of the opening day
+    for object_id in range(1, num_nodes):
+        day_open = int(instance.day_open_arr[object_id])
+        index = manager.NodeToIndex(object_id)
+        time_dimension.CumulVar(index).SetRange((day_open - 1) * DAY_UNITS, day_open * DAY_UNITS)
+        routing.AddDisjunction([index], int(instance.reward_arr[object_id]) * GOLD_WEIGHT)
+
+    return manager, routing
+
+
+def solve_routing(instance: HeroesInstance, num_heroes: int = None, time_limit: float = 30,
+                  first_solution: str = 'PATH_CHEAPEST_ARC', metaheuristic: str = 'GUIDED_LOCAL_SEARCH') -> dict:
+    """
+    Single OR-Tools run, returns {hero_id: [object_id, ...]} after hero id compaction
+    """
+
+    num_heroes = num_heroes or len(instance.heroes)
+    manager, routing = build_routing_model(instance, num_heroes)
+
+    params = pywrapcp.DefaultRoutingSearchParameters()
+    params.first_solution_strategy = getattr(routing_enums_pb2.FirstSolutionStrategy, first_solution)
+    params.local_search_metaheuristic = getattr(routing_enums_pb2.LocalSearchMetaheuristic, metaheuristic)
+    params.time_limit.FromMilliseconds(int(time_limit * 1000))
+
+    solution = routing.SolveWithParameters(params)
+    if solution is None:
+        return {}
+
+    routes = {}
+    for vehicle in range(num_heroes):
+        index = solution.Value(routing.NextVar(routing.Start(vehicle)))
+        route = []
+        while not routing.IsEnd(index):
+            route.append(manager.IndexToNode(index))
+            index = solution.Value(routing.NextVar(index))
+        if route:
+            routes[vehicle + 1] = route
+
+    return compact_heroes(instance, routes)
+
+
+def _solve_start(args: tuple) -> tuple:
+    data_path, num_heroes, time_limit, first_solution, metaheuristic = args
+    instance = HeroesInstance(data_path = data_path, use_cache = True)
+    routes = solve_routing(instance, num_heroes, time_limit, first_solution, metaheuristic)
+    submit = routes_to_submit(routes)
+    return instance.evaluate_solution(submit), (num_heroes, first_solution, metaheuristic), routes
+
+
+def multi_start_configs(num_starts: int, max_heroes: int, fleet_size: int, seed: int = 0) -> list:
+    """
+    Diversified start configurations: fleet size, first solution strategy and metaheuristic
+    Fleet sizes are searched just above fleet_size (hero count of the greedy baseline), the model pays a few more
+    heroes than the greedy as its rounding is conservative (routing search itself has no seed, hence seeded sizes)
+    """
+
+    rng = np.random.default_rng(seed)
+    low, high = min(fleet_size, max_heroes), min(fleet_size + fleet_size // 2, max_heroes)
+    configs = []
+    for start in range(num_starts):
+        # First start takes the middle of the window, the rest spread over it
+        num_heroes = (low + high) // 2 if start == 0 else int(rng.integers(low, high + 1))
+        first_solution = FIRST_SOLUTION_STRATEGIES[start % len(FIRST_SOLUTION_STRATEGIES)]
+        metaheuristic = METAHEURISTICS[start % len(METAHEURISTICS)]
+        configs.append((num_heroes, first_solution, metaheuristic))
+    return configs
+
+
+def solve(data_path: str = '', time_limit: float = 60, workers: int = None, num_starts: int = None,
+          max_heroes: int = None, seed: int = 0, verbose: bool = True) -> tuple:
+    """
+    Parallel multi-start OR-Tools solve, one independent routing run per start spread over CPU cores
+    Starts search over fleet sizes up to max_heroes around the hero count of the greedy baseline
+    Returns (submit DataFrame, Gold Score) of the best start
+    """
+
+    # heroes_greedy imports this module
+    from heroes_greedy import GreedyConstructor
+
+    workers = workers or os.cpu_count() or 1
+    num_starts = num_starts or workers
+    instance = HeroesInstance(data_path = data_path, use_cache = True)
+    max_heroes = max_heroes or len(instance.heroes)
+    fleet_size = max(GreedyConstructor(instance).build(), default = 1)
+
+    tasks = [(data_path, num_heroes, time_limit, first_solution, metaheuristic)
+             for num_heroes, first_solution, metaheuristic in multi_start_configs(num_starts, max_heroes, fleet_size, seed)]
+
+    best_score, best_routes = None, {}
+
+    def collect(results):
+        nonlocal best_score, best_routes
+        for score, config, routes in results:
+            if verbose:
+                print(f"Start {config}: score {score}")
+            if best_score is None or score > best_score:
+                best_score, best_routes = score, routes
+
+    if workers == 1:
+        collect(map(_solve_start, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers = workers, mp_context = POOL_CONTEXT) as pool:
+            collect(pool.map(_solve_start, tasks))
+
+    return routes_to_submit(best_routes), best_score or 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Solve Heroes instance with OR-Tools (parallel multi-start)')
+    parser.add_argument('-o', '--output', default = 'solution_ortools.csv', help = 'submission file to write')
+    parser.add_argument('-t', '--time-limit', type = float, default = 60, help = 'time limit per start, seconds')
+    parser.add_argument('-w', '--workers', type = int, default = None, help = 'parallel starts at a time (default: all cores)')
+    parser.add_argument('-n', '--num-starts', type = int, default = None, help = 'number of starts (default: one per worker)')
+    parser.add_argument('--max-heroes', type = int, default = None, help = 'largest fleet (heroes 1..max_heroes) a start may use')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--data-path', default = '', help = 'directory prefix of instance CSVs')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    submit, score = solve(args.data_path, args.time_limit, args.workers, args.num_starts, args.max_heroes, args.seed)
+    submit.write_csv(args.output)
+    print(f"Best Gold Score {score} ({len(submit)} visits) in {time.perf_counter() - start:.1f}s, saved to {args.output}")
@@ -1,16 +1,254 @@
+import warnings
+from collections import OrderedDict
+
 import polars as pl
 import numpy as np
+from polars.io.plugins import register_io_source
+
+from heroes_cache import build_dist_full, load_cache
+from heroes_distances import SparseDistances
+from heroes_profiling import stage
 
 # Global parameters, as in our Heroes legend
 VISIT_COST = 100
 HERO_COST = 2500
 
+def simulate_transition(max_move_points: int, day_start: int, move_points_start: int, 
+                        travel_dist: int, day_open: int, reward: int) -> tuple:
+    """
+    Plain-int version of simulate_hero_movement rules for hot loops (no dicts, no lookups)
+    Caller resolves Castle/Depot starts itself (day_start = day_open, move_points_start = max_move_points)
+    Returns (day_arrive, move_points_arrive, day_leave, move_points_burned, move_points_leave, received_reward)
+    """
+
+    # Arrival with possible carry-over of move points to next day
+    diff_move_points = move_points_start - travel_dist
+    if diff_move_points >= 0:
+        day_arrive = day_start
+        move_points_arrive = diff_move_points
+    else:
+        day_arrive = day_start + 1
+        move_points_arrive = max_move_points + diff_move_points
+
+    if day_arrive < day_open:
+        # Early arrival, burn move points while waiting, replenish and pay visit cost
+        move_points_burned = move_points_arrive + max_move_points * (day_open - day_arrive - 1)
+        return day_arrive, move_points_arrive, day_open, move_points_burned, max_move_points - VISIT_COST, reward
+
+    # On-time or late arrival, Last-Move Rule if not enough move points for a visit
+    move_points_leave = move_points_arrive - VISIT_COST if move_points_arrive >= VISIT_COST else 0
+    received_reward = reward if day_arrive == day_open else 0
+    
+    return day_arrive, move_points_arrive, day_arrive, 0, move_points_leave, received_reward
+
+def score_flat_routes(object_ids, hero_offsets, hero_mp, day_open, reward, dist_full: np.ndarray) -> int:
+    """
+    Score a flat CSR-like route encoding directly, no DataFrames and no dicts involved
+    Route of hero_id h is object_ids[hero_offsets[h - 1]:hero_offsets[h]], ids are assumed valid (see check_flat_routes)
+    Lookups are id-indexed arrays, dist_full has Castle/Depot as row/column 0
+    Applies the same rules as simulate_hero_movement, including carry-over, burning and Last-Move Rule
+    """
+
+    # Plain Python lists index much faster than NumPy scalars in a tight loop
+    object_ids = np.asarray(object_ids).tolist()
+    hero_offsets = np.asarray(hero_offsets).tolist()
+    hero_mp = np.asarray(hero_mp).tolist()
+    day_open = np.asarray(day_open).tolist()
+    reward = np.asarray(reward).tolist()
+    distance = dist_full.item
+
+    total_reward = 0
+    max_hero = 0
+
+    for hero_id in range(1, len(hero_offsets)):
+        start, end = hero_offsets[hero_id - 1], hero_offsets[hero_id]
+        if start == end:
+            continue
+        max_hero = hero_id
+        max_move_points = hero_mp[hero_id]
+
+        previous_object = 0
+        for k in range(start, end):
+            target_object = object_ids[k]
+            target_day_open = day_open[target_object]
+
+            # Castle/Depot start: hero appears on day_open with full move points
+            if previous_object == 0:
+                day = target_day_open
+                move_points = max_move_points
+
+            # Travel with carry-over of move points to next day
+            move_points -= distance(previous_object, target_object)
+            if move_points < 0:
+                day += 1
+                move_points += max_move_points
+
+            if day < target_day_open:
+                # Early arrival: leftover (and waiting days) move points are burned, hero replenishes and pays visit cost
+                day = target_day_open
+                move_points = max_move_points - VISIT_COST
+                total_reward += reward[target_object]
+            else:
+                # On-time or late arrival, Last-Move Rule if not enough move points for a visit
+                if day == target_day_open:
+                    total_reward += reward[target_object]
+                move_points = move_points - VISIT_COST if move_points >= VISIT_COST else 0
+
+            previous_object = target_object
+
+    return total_reward - max_hero * HERO_COST
+
+def check_flat_routes(object_ids, hero_offsets, day_open, hero_mp):
+    """
+    Fast vectorized validity pre-check for flat route encoding, raises ValueError on out-of-range or duplicate ids
+    """
+
+    object_ids = np.asarray(object_ids)
+    hero_offsets = np.asarray(hero_offsets)
+
+    if len(hero_offsets) == 0 or hero_offsets[0] != 0 or hero_offsets[-1] != len(object_ids) or np.any(np.diff(hero_offsets) < 0):
+        raise ValueError("hero_offsets must be non-decreasing, start at 0 and end at len(object_ids)")
+    if len(hero_offsets) > len(hero_mp):
+        raise ValueError(f"hero_offsets covers {len(hero_offsets) - 1} heroes, instance only has {len(hero_mp) - 1}")
+
+    out_of_range = (object_ids < 1) | (object_ids >= len(day_open))
+    if np.any(out_of_range):
+        raise ValueError(f"Out-of-range object ids: {np.unique(object_ids[out_of_range]).tolist()}")
+    if np.any(day_open[object_ids] == 0):
+        raise ValueError(f"Unknown object ids: {np.unique(object_ids[day_open[object_ids] == 0]).tolist()}")
+
+    counts = np.bincount(object_ids, minlength=len(day_open))
+    if np.any(counts > 1):
+        raise ValueError(f"Duplicate object ids: {np.flatnonzero(counts > 1).tolist()}")
+
+# Per-visit columns of an expanded (simulated) solution
+JOURNEY_COLUMNS = ['hero_id', 'object_id_from', 'object_id_to', 'day_start', 'day_arrive', 
+                   'day_leave', 'move_points_start', 'move_points_arrive', 'move_points_burned', 
+                   'move_points_leave', 'is_earlier', 'is_late', 'reward']
+JOURNEY_SCHEMA = {col: pl.Boolean if col.startswith('is_') else pl.Int64 for col in JOURNEY_COLUMNS}
+
+# Visits per record batch of streamed expansions
+STREAM_BATCH_ROWS = 65536
+
+# Row statuses of HeroesInstance.check_plan, only 'ok' rows are kept
+CHECK_STATUSES = ['ok', 'unknown_hero', 'out_of_range_object', 'duplicate_object']
+
+# Offending ids listed per status in validation reports
+REPORT_IDS = 20
+
+def scan_submission(source) -> pl.LazyFrame:
+    """
+    Lazy submission from a DataFrame, a LazyFrame or a file path (.parquet, .arrow / .ipc / .feather, otherwise CSV)
+    """
+
+    if isinstance(source, pl.LazyFrame):
+        return source
+    if isinstance(source, pl.DataFrame):
+        return source.lazy()
+    if source.endswith('.parquet'):
+        return pl.scan_parquet(source)
+    if source.endswith(('.arrow', '.ipc', '.feather')):
+        return pl.scan_ipc(source)
+    return pl.scan_csv(source)
+
+class HeroJourney:
+    """
+    Structure-of-arrays journey result, one preallocated typed NumPy column per field of JOURNEY_COLUMNS
+    Rows are written in place (one tuple per visit), columns are contiguous so Polars can wrap them without a copy
+    """
+
+    __slots__ = ('data', 'size')
+
+    def __init__(self, capacity: int):
+        # Column-major block, so data[:, j] is a contiguous column while data[i] = row stays a single write
+        self.data = np.zeros((capacity, len(JOURNEY_COLUMNS)), dtype=np.int64, order='F')
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, name: str) -> np.ndarray:
+        values = self.data[:self.size, JOURNEY_COLUMNS.index(name)]
+        return values.astype(bool) if name.startswith('is_') else values
+
+    def to_polars(self) -> pl.DataFrame:
+        return pl.DataFrame({col: self.column(col) for col in JOURNEY_COLUMNS})
+
+    def row(self, i: int) -> dict:
+        """
+        Dict view of a single visit, as returned by simulate_hero_movement
+        """
+
+        values = self.data[i].tolist()
+        row = dict(zip(JOURNEY_COLUMNS, values))
+        row['is_earlier'] = bool(row['is_earlier'])
+        row['is_late'] = bool(row['is_late'])
+        return row
+
+    def to_dicts(self) -> list:
+        return [self.row(i) for i in range(self.size)]
+
+class RouteCache:
+    """
+    Bounded LRU cache of simulated hero journeys keyed by (hero_id, route tuple), see HeroesInstance.enable_route_cache
+    Hero routes are independent (each starts at Castle/Depot with its own move points), so a journey only depends on its key
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: tuple):
+        rows = self.entries.get(key)
+        if rows is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return rows
+
+    def put(self, key: tuple, rows: np.ndarray):
+        self.entries[key] = rows
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last = False)
+            self.evictions += 1
+
+    def invalidate(self, hero_id: int = None):
+        """
+        Drop cached journeys of one hero, or all of them (hero_id=None), counters are kept
+        """
+
+        if hero_id is None:
+            self.entries.clear()
+        else:
+            for key in [key for key in self.entries if key[0] == hero_id]:
+                del self.entries[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {'size': len(self.entries), 'max_size': self.max_size, 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'hit_rate': self.hits / lookups if lookups else None}
+
 class HeroesInstance:
-    def __init__(self, data_path = 'data/'):
+    def __init__(self, data_path = 'data/', use_cache = False, sparse_k = None, profiler = None):
         """
         Init Heroes-themed VRPTW-like instance, load data from expected (data) path
+        With use_cache=True data is memory-mapped from a binary cache next to the CSVs (built on first use)
+        With sparse_k, dist_full keeps only the sparse_k nearest neighbours per object, see use_sparse_distances
+        With a heroes_profiling.Profiler, loading and evaluation stages are timed and simulation counters kept
+        (profiler can also be attached or dropped later through the attribute, None costs nothing)
         """
 
+        self.profiler = profiler
+        self.route_cache = None
+
         self.heroes = None
         self.objects = None
         self.dist_matrix = None
@@ -20,11 +258,30 @@ class HeroesInstance:
         self.hero_mp_map = {}
         self.obj_info_map = {}
         self.dist_start_map = {}
+
+        # Array lookups indexed directly by hero_id / object_id (index 0 is Castle/Depot or unused)
+        self.hero_mp_arr = None
+        self.day_open_arr = None
+        self.reward_arr = None
+        self.dist_full = None
         
-        # Main init
-        self.load_data(data_path)
+        # Main init (data_path=None leaves instance empty, see from_arrays)
+        if data_path is not None:
+            self.load_data(data_path, use_cache)
+            if sparse_k:
+                self.use_sparse_distances(sparse_k)
+
+    @classmethod
+    def from_arrays(cls, arrays: dict):
+        """
+        Build instance straight from cache-style arrays (e.g. views into shared memory), no file I/O
+        """
+
+        instance = cls(data_path = None)
+        instance.load_arrays(arrays)
+        return instance
 
-    def load_data(self, data_path):
+    def load_data(self, data_path, use_cache = False):
         """
         Load data, prepare lookup dicts
         """
@@ -34,29 +291,142 @@ class HeroesInstance:
         # Also OG time/distance matrix is 700x700, could require extra validation
 
         try:
-            # 1. Load Heroes and Waterwheel (gold) Objects info
-            self.heroes = pl.read_csv(f'{data_path}data_heroes.csv')
-            self.objects = pl.read_csv(f'{data_path}data_objects.csv')
-            
-            # 2.1. Load Castle/Depot distance info
-            self.dist_start = pl.read_csv(f'{data_path}dist_start.csv')
-            
-            # 2.2. Load Time/Distance matrix
-            # NB it is expected to have a header ('object_i', ...) hence don't touch (default) option has_header=True
-            dist_objects = pl.read_csv(f'{data_path}dist_objects.csv')
-                        
-            # Ensure int matrix and convert it to NumPy
-            dist_objects = dist_objects.select(pl.all().cast(pl.Int32))
-            self.dist_matrix = dist_objects.to_numpy()
+            if use_cache:
+                with stage(self.profiler, 'load_cache'):
+                    self.load_cached_data(data_path)
+                return
+
+            with stage(self.profiler, 'load_csv'):
+                # 1. Load Heroes and Waterwheel (gold) Objects info
+                self.heroes = pl.read_csv(f'{data_path}data_heroes.csv')
+                self.objects = pl.read_csv(f'{data_path}data_objects.csv')
+                
+                # 2.1. Load Castle/Depot distance info
+                self.dist_start = pl.read_csv(f'{data_path}dist_start.csv')
+                
+                # 2.2. Load Time/Distance matrix
+                # NB it is expected to have a header ('object_i', ...) hence don't touch (default) option has_header=True
+                dist_objects = pl.read_csv(f'{data_path}dist_objects.csv')
+                            
+                # Ensure int matrix and convert it to NumPy
+                dist_objects = dist_objects.select(pl.all().cast(pl.Int32))
+                self.dist_matrix = dist_objects.to_numpy()
 
             # 3. Prepare lookups
-            self.hero_mp_map = {row['hero_id']: row['move_points'] for row in self.heroes.iter_rows(named = True)}
-            self.obj_info_map = {row['object_id']: row for row in self.objects.iter_rows(named = True)}
-            self.dist_start_map = {row['object_id']: row['dist_start'] for row in self.dist_start.iter_rows(named = True)}
+            self.prepare_lookups()
+
+            # 4. Prepare array lookups for NumPy-based evaluation
+            self.prepare_arrays()
             
         except Exception as e:
             print(f"Error loading data: {e}")
+
+    def load_cached_data(self, data_path):
+        """
+        Load data from binary cache, the distance matrix stays a read-only memory map (zero-copy)
+        """
+
+        self.load_arrays(load_cache(data_path))
+
+    def load_arrays(self, cache: dict):
+        """
+        Load data from cache-style arrays, see heroes_cache.CACHE_ARRAYS (no copy of the distance matrix)
+        """
+
+        self.heroes = pl.DataFrame({'hero_id': cache['hero_id'], 'move_points': cache['move_points']})
+        self.objects = pl.DataFrame({'object_id': cache['object_id'], 'day_open': cache['day_open'], 'reward': cache['reward']})
+        self.dist_start = pl.DataFrame({'object_id': cache['dist_start_object_id'], 'dist_start': cache['dist_start']})
+
+        # Cached matrix already has Castle/Depot as row/column 0, objects-only matrix is just a view
+        # (none for a distance provider such as SparseDistances, get_distance then goes through dist_full)
+        self.dist_matrix = cache['dist_full'][1:, 1:] if isinstance(cache['dist_full'], np.ndarray) else None
+
+        self.prepare_lookups()
+        self.prepare_arrays(dist_full = cache['dist_full'])
+
+    def to_arrays(self) -> dict:
+        """
+        Export instance data as cache-style arrays, inverse of load_arrays
+        """
+
+        return {
+            'hero_id': self.heroes['hero_id'].to_numpy(),
+            'move_points': self.heroes['move_points'].to_numpy(),
+            'object_id': self.objects['object_id'].to_numpy(),
+            'day_open': self.objects['day_open'].to_numpy(),
+            'reward': self.objects['reward'].to_numpy(),
+            'dist_start_object_id': self.dist_start['object_id'].to_numpy(),
+            'dist_start': self.dist_start['dist_start'].to_numpy(),
+            'dist_full': self.dist_full,
+        }
+
+    def prepare_lookups(self):
+        """
+        Build dict lookups by hero_id / object_id
+        """
+
+        with stage(self.profiler, 'prepare_lookups'):
+            self.hero_mp_map = {row['hero_id']: row['move_points'] for row in self.heroes.iter_rows(named = True)}
+            self.obj_info_map = {row['object_id']: row for row in self.objects.iter_rows(named = True)}
+            self.dist_start_map = {row['object_id']: row['dist_start'] for row in self.dist_start.iter_rows(named = True)}
     
+    def prepare_arrays(self, dist_full = None):
+        """
+        Build id-indexed NumPy lookups mirroring the dict lookups above
+        """
+
+        num_objects = dist_full.shape[0] - 1 if dist_full is not None else self.dist_matrix.shape[0]
+
+        # Missing heroes/objects keep zeros, same as dict .get(..., 0) defaults
+        self.hero_mp_arr = np.zeros(self.heroes['hero_id'].max() + 1, dtype=np.int64)
+        self.hero_mp_arr[self.heroes['hero_id'].to_numpy()] = self.heroes['move_points'].to_numpy()
+
+        self.day_open_arr = np.zeros(num_objects + 1, dtype=np.int64)
+        self.day_open_arr[self.objects['object_id'].to_numpy()] = self.objects['day_open'].to_numpy()
+
+        self.reward_arr = np.zeros(num_objects + 1, dtype=np.int64)
+        self.reward_arr[self.objects['object_id'].to_numpy()] = self.objects['reward'].to_numpy()
+
+        # Distance matrix with Castle/Depot as row/column 0 (already there when loaded from cache)
+        with stage(self.profiler, 'build_dist_full'):
+            self.dist_full = dist_full if dist_full is not None else build_dist_full(self.dist_matrix, self.dist_start)
+
+        # Cached journeys were simulated on the previous data
+        self.invalidate_route_cache()
+
+    def enable_route_cache(self, max_size: int = 4096) -> RouteCache:
+        """
+        Memoize hero journeys across evaluations (LRU, at most max_size routes), unchanged heroes are then copied
+        instead of re-simulated in hero_journey_arrays (expand_solution, evaluate_solution, iter_expanded)
+        Set route_cache back to None to switch it off
+        """
+
+        self.route_cache = RouteCache(max_size)
+        return self.route_cache
+
+    def invalidate_route_cache(self, hero_id: int = None):
+        """
+        Forget cached journeys of a hero (or of all heroes), needed after changing instance data in place
+        """
+
+        if self.route_cache is not None:
+            self.route_cache.invalidate(hero_id)
+
+    def use_sparse_distances(self, k: int, fallback = None):
+        """
+        Swap the dense dist_full for a SparseDistances provider of the k nearest neighbours per object
+        Missing entries go to fallback, by default the dense matrix itself: with use_cache=True that is a memory map,
+        so the matrix stays on disk and only pages of looked up pairs are read
+        An in-memory dense matrix would stay in RAM for the fallback, so that case warns (no memory is saved)
+        Evaluators, greedy and ALNS index the provider like the dense matrix, np.asarray(dist_full) densifies it again
+        """
+
+        if fallback is None and not isinstance(self.dist_full, np.memmap):
+            warnings.warn('Sparse distances fall back to the in-memory dense matrix, which stays in RAM: '
+                          'load with use_cache=True (memory map) or pass a fallback', stacklevel = 2)
+        self.dist_full = SparseDistances.from_dense(self.dist_full, k, fallback)
+        self.dist_matrix = None
+
     def get_distance(self, from_id: int, to_id: int) -> int:
         """
         Helper function to get distance between two objects (0 reserved for Castle/Depot)
@@ -64,6 +434,8 @@ class HeroesInstance:
 
         if from_id == 0:
             return self.dist_start_map.get(to_id, 0)
+        if self.dist_matrix is None:
+            return self.dist_full.item(from_id, to_id)
         return self.dist_matrix[from_id - 1, to_id - 1]
 
     def simulate_hero_movement(self, hero_id: int, current_state: dict, target_object: int) -> dict:
@@ -172,28 +544,64 @@ class HeroesInstance:
         """
         Iteratively simulate full journey of a hero across each object transition
         Note that object_ids input is a list, almost CVRPlib-style notation
+        Kept for backward compatibility, it is a list-of-dicts view over hero_journey_arrays
+        """
+
+        return self.hero_journey_arrays(hero_id, object_ids).to_dicts()
+
+    def hero_journey_arrays(self, hero_id: int, object_ids: list, out: HeroJourney = None) -> HeroJourney:
         """
+        Simulate full journey of a hero, writing visits in place into a HeroJourney
+        When out is given, visits are appended after its current size (capacity must suffice)
+        With route_cache enabled, a route simulated before is copied from the cache
+        """
+
+        if out is None:
+            out = HeroJourney(len(object_ids))
+
+        data = out.data
+        i = out.size
+
+        cache = self.route_cache
+        if cache is not None:
+            key = (hero_id, tuple(object_ids))
+            rows = cache.get(key)
+            if rows is not None:
+                data[i:i + len(rows)] = rows
+                out.size = i + len(rows)
+                return out
+        max_move_points = self.hero_mp_map.get(hero_id, 0)
 
         # Init state of play which will be iterated upon
-        current_state = {'current_object': 0, 
-                         'current_day': 1, 
-                         'current_move_points': self.hero_mp_map.get(hero_id, 0)}
-        
-        journey_rows = []
-        
+        previous_object, current_day, current_move_points = 0, 1, max_move_points
+
         for target_object in object_ids:
-            # Process current transition 
-            current_transit = self.simulate_hero_movement(hero_id, current_state, target_object)
-            
-            if current_transit:
-                journey_rows.append(current_transit)
-                                
-                # Update state for next hero iteration step
-                current_state = {'current_object': current_transit['object_id_to'], 
-                                 'current_day': current_transit['day_leave'], 
-                                 'current_move_points': current_transit['move_points_leave']}
-                
-        return journey_rows
+            target_object_data = self.obj_info_map.get(target_object)
+
+            # Sanity check, improper objects are skipped just like in simulate_hero_movement
+            if not target_object_data:
+                continue
+
+            target_day_open = target_object_data['day_open']
+            if previous_object == 0:
+                current_day, current_move_points = target_day_open, max_move_points
+
+            day_arrive, move_points_arrive, day_leave, move_points_burned, move_points_leave, received_reward = simulate_transition(
+                max_move_points, current_day, current_move_points, self.dist_full.item(previous_object, target_object),
+                target_day_open, target_object_data['reward'])
+
+            data[i] = (hero_id, previous_object, target_object, current_day, day_arrive, day_leave, 
+                       current_move_points, move_points_arrive, move_points_burned, move_points_leave, 
+                       day_arrive < target_day_open, day_arrive > target_day_open, received_reward)
+            i += 1
+
+            # Update state for next hero iteration step
+            previous_object, current_day, current_move_points = target_object, day_leave, move_points_leave
+
+        if cache is not None:
+            cache.put(key, data[out.size:i].copy())
+        out.size = i
+        return out
 
     def expand_solution(self, submit: pl.DataFrame, remove_out_of_time = False) -> pl.DataFrame:
         """
@@ -205,32 +613,29 @@ class HeroesInstance:
         if len(submit) == 0:
             return pl.DataFrame()
 
+        profiler = self.profiler
+
         # Group by hero_id to get each heroe's routes in CVRPlib-style format with lists of object locations
         # Collapse hero's object_id rows into a list and sort by hero_id (for convenience as of our legend)
-        hero_list_routes = submit.group_by('hero_id').agg(pl.col('object_id').alias('route')).sort('hero_id')
+        with stage(profiler, 'expand_solution.group_by'):
+            hero_list_routes = submit.group_by('hero_id').agg(pl.col('object_id').alias('route')).sort('hero_id')
         
-        expanded_routes = []
+        # All visits go into one preallocated structure-of-arrays block (at most one visit per submit row)
+        expanded_routes = HeroJourney(len(submit))
         
         # Iterate over each hero's route
-        for row in hero_list_routes.iter_rows(named=True):
-            # Get our hero and his object route (as list of object_id)
-            current_hero = row['hero_id']
-            current_route = row['route']
-            
-            # Play heroes, simulate this hero route with all our Heroes-themed VRPTW logic
-            current_journey = self.hero_journey(current_hero, current_route)
-
-            # Collect expanded route with all resulting info
-            expanded_routes.extend(current_journey)
+        with stage(profiler, 'expand_solution.simulate'):
+            for current_hero, current_route in hero_list_routes.iter_rows():
+                # Play heroes, simulate this hero route with all our Heroes-themed VRPTW logic
+                # Expanded route with all resulting info is appended in place
+                self.hero_journey_arrays(current_hero, current_route, out = expanded_routes)
+        if profiler is not None:
+            profiler.count_visits(expanded_routes.column('is_earlier'), expanded_routes.column('is_late'),
+                                  expanded_routes.column('move_points_burned'))
             
-        # Collect expanded results and arrange them in a readable manner
-        expanded_submit = pl.DataFrame(expanded_routes)
-        
-        if len(expanded_submit) > 0:
-            cols = ['hero_id', 'object_id_from', 'object_id_to', 'day_start', 'day_arrive', 
-                    'day_leave', 'move_points_start', 'move_points_arrive', 'move_points_burned', 
-                    'move_points_leave', 'is_earlier', 'is_late', 'reward']
-            expanded_submit = expanded_submit.select(cols)
+        # Collect expanded results, columns are already arranged in a readable manner
+        with stage(profiler, 'expand_solution.to_polars'):
+            expanded_submit = expanded_routes.to_polars()
 
         # Special option to remove objects outside our gameplay week
         if remove_out_of_time:
@@ -238,47 +643,232 @@ class HeroesInstance:
             
         return expanded_submit
 
-    def basic_check(self, submit: pl.DataFrame) -> pl.DataFrame:
+    def iter_expanded(self, submit: pl.DataFrame, batch_rows: int = STREAM_BATCH_ROWS, remove_out_of_time = False):
         """
-        Validate schedule (submit candidate) DataFrame with basic sanity checks 
+        Streaming counterpart of expand_solution, yields record batches (DataFrames of JOURNEY_SCHEMA) in hero_id order
+        A batch holds whole heroes, they are added until it reaches batch_rows visits, so peak memory is one batch
         """
 
-        # Basic sanity checks for erroneous or empty solutions
         if submit is None or len(submit) == 0:
-            return pl.DataFrame()
-        if 'hero_id' not in submit.columns or 'object_id' not in submit.columns:
+            return
+
+        with stage(self.profiler, 'iter_expanded.group_by'):
+            hero_list_routes = submit.group_by('hero_id').agg(pl.col('object_id').alias('route')).sort('hero_id')
+
+        pending, pending_rows = [], 0
+        for current_hero, current_route in hero_list_routes.iter_rows():
+            pending.append((current_hero, current_route))
+            pending_rows += len(current_route)
+            if pending_rows < batch_rows:
+                continue
+
+            batch = self.expand_batch(pending, pending_rows, remove_out_of_time)
+            pending, pending_rows = [], 0
+            if len(batch) > 0:
+                yield batch
+
+        if pending:
+            batch = self.expand_batch(pending, pending_rows, remove_out_of_time)
+            if len(batch) > 0:
+                yield batch
+
+    def expand_batch(self, routes: list, num_rows: int, remove_out_of_time = False) -> pl.DataFrame:
+        """
+        Expanded visits of a few [(hero_id, route), ...] as one DataFrame
+        """
+
+        expanded_routes = HeroJourney(num_rows)
+        with stage(self.profiler, 'expand_batch.simulate'):
+            for current_hero, current_route in routes:
+                self.hero_journey_arrays(current_hero, current_route, out = expanded_routes)
+        if self.profiler is not None:
+            self.profiler.count_visits(expanded_routes.column('is_earlier'), expanded_routes.column('is_late'),
+                                       expanded_routes.column('move_points_burned'))
+
+        batch = expanded_routes.to_polars()
+        if remove_out_of_time:
+            batch = batch.filter(pl.col('day_arrive') <= 7)
+        return batch
+
+    def scan_expanded(self, submit: pl.DataFrame, batch_rows: int = STREAM_BATCH_ROWS, remove_out_of_time = False) -> pl.LazyFrame:
+        """
+        Lazy expanded solution on top of iter_expanded, batches are simulated only as the query engine pulls them
+        Sinks (sink_parquet / sink_ipc) and streaming aggregations then never hold the whole table
+        """
+
+        def source(with_columns, predicate, n_rows, batch_size):
+            remaining = n_rows
+            for batch in self.iter_expanded(submit, batch_size or batch_rows, remove_out_of_time):
+                if predicate is not None:
+                    batch = batch.filter(predicate)
+                if with_columns is not None:
+                    batch = batch.select(with_columns)
+                if remaining is not None:
+                    batch = batch.head(remaining)
+                    remaining -= len(batch)
+                yield batch
+                if remaining is not None and remaining <= 0:
+                    break
+
+        return register_io_source(source, schema = JOURNEY_SCHEMA)
+
+    def write_expanded(self, submit: pl.DataFrame, path: str, file_format: str = None,
+                       batch_rows: int = STREAM_BATCH_ROWS, remove_out_of_time = False):
+        """
+        Stream the expanded solution straight to a Parquet or Arrow IPC file with bounded memory
+        Format is taken from the file extension (.parquet, .arrow / .ipc / .feather) unless given
+        """
+
+        if file_format is None:
+            file_format = 'parquet' if path.endswith('.parquet') else 'ipc'
+        if file_format not in ('parquet', 'ipc'):
+            raise ValueError(f"Unknown file format '{file_format}', expected 'parquet' or 'ipc'")
+
+        lazy_submit = self.scan_expanded(submit, batch_rows, remove_out_of_time)
+        if file_format == 'parquet':
+            lazy_submit.sink_parquet(path)
+        else:
+            lazy_submit.sink_ipc(path)
+
+    def check_plan(self, source, with_status = True) -> pl.LazyFrame:
+        """
+        Lazy validation of a submission (DataFrame, LazyFrame or file path, see scan_submission), nothing is read yet
+        Rows get hero_id / object_id cast to Int32 and a status code (index into CHECK_STATUSES), in original row order:
+        - unknown_hero: hero_id outside 1..max hero_id (or null)
+        - out_of_range_object: object_id outside 1..max object_id (or null)
+        - duplicate_object: object_id already visited by an earlier valid row (first one is kept)
+        With with_status=False only 'ok' rows are kept and no status column is built (basic_check)
+        """
+
+        submit = scan_submission(source)
+        columns = submit.collect_schema().names()
+        if 'hero_id' not in columns or 'object_id' not in columns:
             raise ValueError("Schedule solution must include both 'hero_id' and 'object_id' columns")
 
-        # Polars has a mind of its own so we should explicitly conserve original row order
-        submit = submit.with_row_index("og_order")
-        
-        # Explicit type checks and filtering 
-        # No out-of-bounds ids are allowed and therefore must be cleaned off
-        clean_submit = submit.select(['og_order', 'hero_id', 'object_id']).with_columns([
+        # Bounds follow instance size (100 heroes and 700 objects for the contest data)
+        max_hero_id = len(self.hero_mp_arr) - 1
+        max_object_id = len(self.day_open_arr) - 1
+        hero_ok = pl.col('hero_id').is_between(1, max_hero_id).fill_null(False)
+        object_ok = pl.col('object_id').is_between(1, max_object_id).fill_null(False)
+
+        # As promised, duplicates are dropped keeping only the first valid entry (in case one chooses to cheat)
+        first_visit = pl.when(hero_ok & object_ok).then(pl.col('object_id')).is_first_distinct()
+
+        plan = submit.select(
             pl.col('hero_id').cast(pl.Int32),
             pl.col('object_id').cast(pl.Int32)
-        ]).filter(
-            (pl.col('hero_id') >= 1) & (pl.col('hero_id') <= 100) &
-            (pl.col('object_id') >= 1) & (pl.col('object_id') <= 700)
         )
-        
-        # As promised, sanity check to remove duplicates (keep only first entry in case one chooses to cheat)
-        clean_submit = clean_submit.unique(subset=['object_id'], keep='first').sort('og_order')
+        if not with_status:
+            return plan.filter(hero_ok & object_ok & first_visit)
 
-        # After restoring original order, clean up after ourselves
-        clean_submit = clean_submit.drop('og_order')
-        
-        return clean_submit
+        # Small integer codes, a string column would dominate the cost on large files
+        return plan.with_columns(
+            pl.when(~hero_ok).then(CHECK_STATUSES.index('unknown_hero'))
+            .when(~object_ok).then(CHECK_STATUSES.index('out_of_range_object'))
+            .when(~first_visit).then(CHECK_STATUSES.index('duplicate_object'))
+            .otherwise(0).cast(pl.UInt8).alias('status')
+        )
+
+    def report_plan(self, plan: pl.LazyFrame) -> pl.LazyFrame:
+        """
+        Single-row summary of a check_plan: row count per status and the first REPORT_IDS distinct offending ids
+        of every dropped status (hero ids for unknown_hero, object ids otherwise)
+        """
+
+        status = pl.col('status')
+        offending_id = pl.when(status == CHECK_STATUSES.index('unknown_hero')).then(pl.col('hero_id')).otherwise(pl.col('object_id'))
+        return plan.select(
+            *[(status == code).sum().alias(f'{name}_rows') for code, name in enumerate(CHECK_STATUSES)],
+            *[offending_id.filter(status == code).unique(maintain_order = True).head(REPORT_IDS).implode().alias(f'{name}_ids')
+              for code, name in enumerate(CHECK_STATUSES) if code > 0]
+        )
+
+    def validation_report(self, report: pl.DataFrame) -> dict:
+        """
+        Report dict from a collected report_plan: {'rows', 'kept', status: {'rows', 'ids'} for every dropped status}
+        """
+
+        summary = report.row(0, named = True)
+        result = {'rows': sum(summary[f'{name}_rows'] for name in CHECK_STATUSES), 'kept': summary['ok_rows']}
+        for name in CHECK_STATUSES[1:]:
+            result[name] = {'rows': summary[f'{name}_rows'], 'ids': summary[f'{name}_ids']}
+        return result
+
+    def basic_check(self, submit: pl.DataFrame) -> pl.DataFrame:
+        """
+        Validate schedule (submit candidate) DataFrame with basic sanity checks 
+        Runs check_plan, keeps valid rows in original order (hero_id, object_id as Int32)
+        """
+
+        # Basic sanity checks for erroneous or empty solutions
+        if submit is None or len(submit) == 0:
+            return pl.DataFrame()
+
+        # Small in-memory frames are fastest on the in-memory engine
+        with stage(self.profiler, 'basic_check'):
+            return self.check_plan(submit, with_status = False).collect(engine = 'in-memory')
+
+    def validate_submission(self, source, engine: str = 'auto') -> tuple:
+        """
+        basic_check plus validation report from one query, source may be a file path scanned lazily
+        Returns (clean submit, report), see validation_report
+        """
+
+        clean_plan = self.check_plan(source, with_status = False)
+        with stage(self.profiler, 'validate_submission'):
+            clean_submit, report = pl.collect_all([clean_plan, self.report_plan(self.check_plan(source))], engine = engine)
+        return clean_submit, self.validation_report(report)
+
+    def check_routes(self, source, engine: str = 'auto') -> tuple:
+        """
+        Validation and grouping front end of expand_solution as one lazy query: file scan, casts, checks, duplicates
+        and group_by('hero_id') run together and only routes and the report are materialized
+        Returns (hero_id / route list DataFrame sorted by hero_id, report)
+        """
 
-    def evaluate_solution(self, submit: pl.DataFrame) -> int:
+        routes = self.check_plan(source, with_status = False).group_by('hero_id').agg(pl.col('object_id').alias('route')).sort('hero_id')
+        with stage(self.profiler, 'check_routes'):
+            hero_list_routes, report = pl.collect_all([routes, self.report_plan(self.check_plan(source))], engine = engine)
+        return hero_list_routes, self.validation_report(report)
+
+    def evaluate_submission(self, source, engine: str = 'auto') -> tuple:
+        """
+        Gold Score straight from a submission file (or frame) via check_routes, returns (score, validation report)
+        The submission is never loaded eagerly as a whole, only its grouped routes
+        """
+
+        if self.profiler is not None:
+            self.profiler.count('evaluations')
+
+        hero_list_routes, report = self.check_routes(source, engine)
+        if report['kept'] == 0:
+            return 0, report
+
+        detailed_submit = self.expand_batch(hero_list_routes.iter_rows(), report['kept'])
+        total_reward = detailed_submit['reward'].sum()
+        max_id = detailed_submit['hero_id'].max()
+        return int(total_reward - (max_id * HERO_COST)), report
+
+    def evaluate_solution(self, submit: pl.DataFrame, batch_rows: int = None) -> int:
         """
         Run the full evaluation pipeline to produce a Gold Score
+        With batch_rows the score is accumulated over iter_expanded batches, the expanded table is never materialized
         """
 
+        if self.profiler is not None:
+            self.profiler.count('evaluations')
+
         # Check proposed solution, clean up bad entries
         checked_submit = self.basic_check(submit)
         if len(checked_submit) == 0:
             return 0
+
+        if batch_rows is not None:
+            total_reward, max_id = 0, None
+            for batch in self.iter_expanded(checked_submit, batch_rows):
+                total_reward += batch['reward'].sum()
+                max_id = max(batch['hero_id'].max(), max_id or 0)
+            return int(total_reward - (max_id * HERO_COST)) if max_id is not None else 0
         
         # Create a thorough simulated schedule overview across days and move points
         detailed_submit = self.expand_solution(checked_submit)
@@ -289,4 +879,311 @@ class HeroesInstance:
         total_reward = detailed_submit['reward'].sum()
         max_id = detailed_submit['hero_id'].max()
         
-        return int(total_reward - (max_id * HERO_COST))
\ No newline at end of file
+        return int(total_reward - (max_id * HERO_COST))
+
+    def group_routes_numpy(self, hero_ids: np.ndarray, object_ids: np.ndarray) -> tuple:
+        """
+        NumPy counterpart of group_by('hero_id') in expand_solution
+        Returns sorted hero ids (one lane per hero), zero-padded routes (lanes x max route length) and route lengths
+        """
+
+        # Stable sort keeps each hero's objects in submission order, just like group_by().agg()
+        order = np.argsort(hero_ids, kind='stable')
+        sorted_heroes = hero_ids[order]
+        sorted_objects = object_ids[order]
+
+        lane_heroes, starts, lengths = np.unique(sorted_heroes, return_index=True, return_counts=True)
+
+        # Position of each visit within its hero's route
+        lanes = np.repeat(np.arange(len(lane_heroes)), lengths)
+        positions = np.arange(len(sorted_heroes)) - np.repeat(starts, lengths)
+
+        routes = np.zeros((len(lane_heroes), lengths.max()), dtype=np.int64)
+        routes[lanes, positions] = sorted_objects
+
+        return lane_heroes.astype(np.int64), routes, lengths
+
+    def simulate_routes_numpy(self, lane_heroes: np.ndarray, routes: np.ndarray, lengths: np.ndarray) -> dict:
+        """
+        Simulate many hero routes in lockstep, one vectorized step per route position
+        Applies exactly the same rules as simulate_hero_movement, returns (lanes x max route length) arrays
+        """
+
+        num_lanes, max_length = routes.shape
+        max_move_points = self.hero_mp_arr[lane_heroes]
+
+        columns = JOURNEY_COLUMNS[1:]
+        result = {col: np.zeros((num_lanes, max_length), dtype=bool if col.startswith('is_') else np.int64) for col in columns}
+
+        # State of play for every lane, all heroes start at Castle/Depot
+        previous_object = np.zeros(num_lanes, dtype=np.int64)
+        current_day = np.ones(num_lanes, dtype=np.int64)
+        current_move_points = max_move_points.copy()
+
+        for k in range(max_length):
+            target_object = routes[:, k]
+            target_day_open = self.day_open_arr[target_object]
+
+            # 1. Starting state of a transition (first move from Castle/Depot starts on day_open with full move points)
+            from_depot = previous_object == 0
+            day_start = np.where(from_depot, target_day_open, current_day)
+            move_points_start = np.where(from_depot, max_move_points, current_move_points)
+
+            # 2. Arrival day and move points, with carry-over to next day
+            diff_move_points = move_points_start - self.dist_full[previous_object, target_object]
+            carry_over = diff_move_points < 0
+            day_arrive = day_start + carry_over
+            move_points_arrive = np.where(carry_over, max_move_points + diff_move_points, diff_move_points)
+
+            # 3. Early / on-time / late arrival w.r.t. day_open
+            days_diff = day_arrive - target_day_open
+            is_earlier = days_diff < 0
+            is_late = days_diff > 0
+
+            day_leave = np.where(is_earlier, target_day_open, day_arrive)
+            move_points_burned = np.where(is_earlier, move_points_arrive + max_move_points * (-days_diff - 1), 0)
+            
+            # Last-Move Rule for on-time and late arrivals, hero waits and replenishes move points on early ones
+            move_points_leave = np.where(move_points_arrive >= VISIT_COST, move_points_arrive - VISIT_COST, 0)
+            move_points_leave = np.where(is_earlier, max_move_points - VISIT_COST, move_points_leave)
+
+            received_reward = np.where(is_late, 0, self.reward_arr[target_object])
+
+            step = {'object_id_from': previous_object, 'object_id_to': target_object, 'day_start': day_start, 
+                    'day_arrive': day_arrive, 'day_leave': day_leave, 'move_points_start': move_points_start, 
+                    'move_points_arrive': move_points_arrive, 'move_points_burned': move_points_burned, 
+                    'move_points_leave': move_points_leave, 'is_earlier': is_earlier, 'is_late': is_late, 
+                    'reward': received_reward}
+            for col in columns:
+                result[col][:, k] = step[col]
+
+            # Update state for next step (padded lanes keep running harmlessly, they are masked out afterwards)
+            previous_object = target_object
+            current_day = day_leave
+            current_move_points = move_points_leave
+
+        return result
+
+    def expand_solution_numpy(self, submit: pl.DataFrame, remove_out_of_time = False) -> dict:
+        """
+        NumPy counterpart of expand_solution, returns per-visit columns as flat arrays (same order and values)
+        """
+
+        # Sanity check
+        if len(submit) == 0:
+            return {}
+
+        hero_ids = submit['hero_id'].to_numpy().astype(np.int64)
+        object_ids = submit['object_id'].to_numpy().astype(np.int64)
+
+        with stage(self.profiler, 'expand_solution_numpy.group'):
+            lane_heroes, routes, lengths = self.group_routes_numpy(hero_ids, object_ids)
+        with stage(self.profiler, 'expand_solution_numpy.simulate'):
+            simulated = self.simulate_routes_numpy(lane_heroes, routes, lengths)
+
+        # Flatten lanes in hero_id order, dropping padding
+        mask = np.arange(routes.shape[1]) < lengths[:, None]
+        expanded_submit = {'hero_id': np.repeat(lane_heroes, lengths)}
+        expanded_submit.update({col: values[mask] for col, values in simulated.items()})
+        if self.profiler is not None:
+            self.profiler.count_visits(expanded_submit['is_earlier'], expanded_submit['is_late'],
+                                       expanded_submit['move_points_burned'])
+
+        # Special option to remove objects outside our gameplay week
+        if remove_out_of_time:
+            in_time = expanded_submit['day_arrive'] <= 7
+            expanded_submit = {col: values[in_time] for col, values in expanded_submit.items()}
+
+        return expanded_submit
+
+    def evaluate_solution_numpy(self, submit: pl.DataFrame) -> tuple:
+        """
+        NumPy evaluation engine, returns the same Gold Score as evaluate_solution along with per-visit column arrays
+        """
+
+        if self.profiler is not None:
+            self.profiler.count('evaluations')
+
+        # Check proposed solution, clean up bad entries
+        checked_submit = self.basic_check(submit)
+        if len(checked_submit) == 0:
+            return 0, {}
+
+        detailed_submit = self.expand_solution_numpy(checked_submit)
+
+        # Calculate Gold Score: total reward - total hero costs
+        total_reward = detailed_submit['reward'].sum()
+        max_id = detailed_submit['hero_id'].max()
+
+        return int(total_reward - (max_id * HERO_COST)), detailed_submit
+
+    def to_flat_routes(self, submit: pl.DataFrame) -> tuple:
+        """
+        Convert a submit candidate (cleaned up with basic_check) into flat CSR-like encoding
+        Returns (object_ids, hero_offsets), route of hero_id h is object_ids[hero_offsets[h - 1]:hero_offsets[h]]
+        """
+
+        checked_submit = self.basic_check(submit)
+        num_heroes = len(self.hero_mp_arr) - 1
+        if len(checked_submit) == 0:
+            return np.zeros(0, dtype=np.int32), np.zeros(num_heroes + 1, dtype=np.int32)
+
+        hero_ids = checked_submit['hero_id'].to_numpy()
+        order = np.argsort(hero_ids, kind='stable')
+        object_ids = checked_submit['object_id'].to_numpy()[order].astype(np.int32)
+
+        counts = np.bincount(hero_ids, minlength=num_heroes + 1)
+        hero_offsets = np.concatenate([[0], np.cumsum(counts[1:])]).astype(np.int32)
+
+        return object_ids, hero_offsets
+
+    def from_flat_routes(self, object_ids, hero_offsets) -> pl.DataFrame:
+        """
+        Convert flat CSR-like encoding back into a hero_id,object_id submission
+        """
+
+        hero_ids = np.repeat(np.arange(1, len(hero_offsets)), np.diff(hero_offsets))
+        return pl.DataFrame({'hero_id': hero_ids, 'object_id': np.asarray(object_ids)})
+
+    def evaluate_flat(self, object_ids, hero_offsets, check = False) -> int:
+        """
+        Gold Score of a flat CSR-like encoding, skips basic_check and DataFrame construction altogether
+        Set check=True for a (vectorized) validity pre-check of ids, otherwise they are assumed clean
+        """
+
+        if check:
+            check_flat_routes(object_ids, hero_offsets, self.day_open_arr, self.hero_mp_arr)
+
+        with stage(self.profiler, 'evaluate_flat'):
+            return score_flat_routes(object_ids, hero_offsets, self.hero_mp_arr, self.day_open_arr, self.reward_arr, self.dist_full)
+
+    def batch_lanes(self, solutions) -> tuple:
+        """
+        One lane per non-empty hero route over a whole population of solutions
+        solutions is either a list of flat encodings [(object_ids, hero_offsets), ...] or a padded route array of shape
+        (solutions x heroes x max route length), route of hero_id h in row h - 1, routes packed left and padded with 0
+        Returns (lane solution index, lane hero ids, lane-major object ids, lane route lengths, number of solutions)
+        """
+
+        if isinstance(solutions, np.ndarray):
+            if solutions.ndim != 3:
+                raise ValueError(f"Padded routes must be (solutions x heroes x max route length), got shape {solutions.shape}")
+            lengths = np.count_nonzero(solutions, axis=2)
+            lane_solutions, lane_rows = np.nonzero(lengths)
+            # Row-major order of non-zero ids is lane order already
+            object_ids = solutions[solutions != 0].astype(np.int64)
+            return lane_solutions, lane_rows + 1, object_ids, lengths[lane_solutions, lane_rows], len(solutions)
+
+        # Flat encodings: per-hero counts of every solution stacked, empty routes dropped
+        counts = [np.diff(np.asarray(hero_offsets)) for _, hero_offsets in solutions]
+        solution_index = np.repeat(np.arange(len(counts)), [len(c) for c in counts])
+        hero_ids = np.concatenate([np.arange(1, len(c) + 1) for c in counts] or [np.zeros(0, dtype=np.int64)])
+        counts = np.concatenate(counts or [np.zeros(0, dtype=np.int64)])
+        nonempty = counts > 0
+
+        object_ids = np.concatenate([np.asarray(object_ids, dtype=np.int64) for object_ids, _ in solutions]
+                                    or [np.zeros(0, dtype=np.int64)])
+        return solution_index[nonempty], hero_ids[nonempty], object_ids, counts[nonempty], len(solutions)
+
+    def score_lanes_numpy(self, lane_heroes: np.ndarray, object_ids: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """
+        Collected reward of every lane (lane-major object_ids, see batch_lanes), simulated in lockstep with the rules
+        of simulate_routes_numpy
+        Visits are laid out step-major with lanes ordered by route length, so step k is one contiguous slice of the lanes
+        still running, and distances, day_open and rewards are gathered for all visits at once (no padding)
+        With a profiler, the same visit counters as expand_solution are kept (early / late arrivals, move points burned)
+        """
+
+        num_lanes = len(lengths)
+        if num_lanes == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        # Rank of every lane in descending length order, active lanes at step k are ranks below active_counts[k]
+        order = np.argsort(-lengths, kind='stable')
+        rank = np.empty(num_lanes, dtype=np.int64)
+        rank[order] = np.arange(num_lanes)
+        active_counts = np.searchsorted(-lengths[order], -np.arange(lengths.max()), side='left')
+        step_start = np.concatenate([[0], np.cumsum(active_counts)])
+
+        lane_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        position = np.arange(len(object_ids)) - np.repeat(lane_starts, lengths)
+        # Previous object of every visit, Castle/Depot (0) for the first one of a route
+        lane_previous = np.concatenate([[0], object_ids[:-1]])
+        lane_previous[position == 0] = 0
+
+        step_major = step_start[position] + np.repeat(rank, lengths)
+        targets, previous = np.empty_like(object_ids), np.empty_like(object_ids)
+        targets[step_major] = object_ids
+        previous[step_major] = lane_previous
+
+        travel = np.asarray(self.dist_full[previous, targets], dtype=np.int64)
+        day_open = self.day_open_arr[targets]
+        reward = self.reward_arr[targets]
+        max_move_points = self.hero_mp_arr[lane_heroes[order]]
+
+        # Every hero appears on day_open of its first object with full move points
+        current_day = day_open[:num_lanes].copy()
+        current_move_points = max_move_points.copy()
+        lane_reward = np.zeros(num_lanes, dtype=np.int64)
+        profiler = self.profiler
+        early_arrivals, late_arrivals, move_points_burned = 0, 0, 0
+
+        for k in range(len(active_counts)):
+            n = active_counts[k]
+            step = slice(step_start[k], step_start[k] + n)
+            move_points = max_move_points[:n]
+            target_day_open = day_open[step]
+
+            # Arrival with carry-over of move points to next day
+            diff_move_points = current_move_points[:n] - travel[step]
+            carry_over = diff_move_points < 0
+            day_arrive = current_day[:n] + carry_over
+            move_points_arrive = diff_move_points + carry_over * move_points
+
+            lane_reward[:n] += reward[step] * (day_arrive <= target_day_open)
+            if profiler is not None:
+                is_earlier = day_arrive < target_day_open
+                early_arrivals += int(is_earlier.sum())
+                late_arrivals += int((day_arrive > target_day_open).sum())
+                move_points_burned += int((move_points_arrive + move_points * (target_day_open - day_arrive - 1))[is_earlier].sum())
+
+            # Early arrival waits until day_open and replenishes, Last-Move Rule otherwise
+            current_day[:n] = np.maximum(day_arrive, target_day_open)
+            current_move_points[:n] = np.where(day_arrive < target_day_open, move_points - VISIT_COST,
+                                               np.maximum(move_points_arrive - VISIT_COST, 0))
+
+        if profiler is not None:
+            profiler.count('transitions', len(object_ids))
+            profiler.count('early_arrivals', early_arrivals)
+            profiler.count('late_arrivals', late_arrivals)
+            profiler.count('move_points_burned', move_points_burned)
+        return lane_reward[rank]
+
+    def evaluate_batch(self, solutions, check = False) -> np.ndarray:
+        """
+        Gold Scores of a whole population in one call, same values as evaluate_flat for every solution
+        solutions is a list of flat encodings or a padded route array (see batch_lanes), all solutions advance together
+        in vectorized lockstep steps, so cost grows with total visits rather than with the number of Python calls
+        Set check=True for the check_flat_routes validity pre-check of every solution, otherwise ids are assumed clean
+        """
+
+        if check:
+            if isinstance(solutions, np.ndarray):
+                flat = [(routes[routes != 0], np.concatenate([[0], np.cumsum(np.count_nonzero(routes, axis=1))]))
+                        for routes in solutions]
+            else:
+                flat = solutions
+            for object_ids, hero_offsets in flat:
+                check_flat_routes(object_ids, hero_offsets, self.day_open_arr, self.hero_mp_arr)
+
+        with stage(self.profiler, 'evaluate_batch'):
+            lane_solutions, lane_heroes, object_ids, lengths, num_solutions = self.batch_lanes(solutions)
+            rewards = self.score_lanes_numpy(lane_heroes, object_ids, lengths)
+
+            # Gold Score: total reward minus max(hero_id) * HERO_COST of every solution (0 for empty ones)
+            total_reward = np.bincount(lane_solutions, weights=rewards, minlength=num_solutions).astype(np.int64)
+            max_hero = np.zeros(num_solutions, dtype=np.int64)
+            np.maximum.at(max_hero, lane_solutions, lane_heroes)
+        if self.profiler is not None:
+            self.profiler.count('evaluations', num_solutions)
+        return total_reward - max_hero * HERO_COST
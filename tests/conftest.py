@@ -0,0 +1,44 @@
+import pytest
+
+from generate_instance import generate_arrays
+from heroes_utils import HeroesInstance
+from tests.helpers import DATA_PATH, random_submission
+
+
+@pytest.fixture(scope='session')
+def contest():
+    """
+    Contest instance loaded from the repository CSVs
+    """
+
+    return HeroesInstance(data_path = DATA_PATH)
+
+
+@pytest.fixture(scope='session')
+def synthetic():
+    """
+    Small seeded synthetic instance, 300 objects and 30 heroes
+    """
+
+    return HeroesInstance.from_arrays(generate_arrays(300, num_heroes = 30, seed = 7))
+
+
+@pytest.fixture(scope='session')
+def greedy_submit(contest):
+    """
+    Deterministic baseline submission of the contest instance
+    """
+
+    from heroes_greedy import greedy_solution
+    return greedy_solution(contest, regret_k = 1)
+
+
+@pytest.fixture(scope='session')
+def contest_submissions(contest, greedy_submit):
+    """
+    Greedy baseline, random submissions with late visits and one with rows basic_check drops
+    """
+
+    return [greedy_submit, random_submission(contest, 0, num_heroes = 1, visits = 60),
+            random_submission(contest, 1), random_submission(contest, 2, num_heroes = 100, visits = 700),
+            random_submission(contest, 3, messy = True)]
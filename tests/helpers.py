@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import polars as pl
+
+from heroes_utils import HERO_COST, JOURNEY_SCHEMA, HeroesInstance
+
+# Repository root holds the contest CSVs
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '')
+
+
+def random_submission(instance: HeroesInstance, seed: int, num_heroes: int = 20, visits: int = 300,
+                      messy: bool = False) -> pl.DataFrame:
+    """
+    Seeded random submission, objects roughly in day_open order so that routes mix on-time, early and late visits
+    messy adds rows basic_check has to drop: unknown heroes, out-of-range objects and duplicate visits
+    """
+
+    rng = np.random.default_rng(seed)
+    hero_ids = instance.heroes['hero_id'].to_numpy()
+    object_ids = instance.objects['object_id'].to_numpy()
+
+    objects = rng.choice(object_ids, min(visits, len(object_ids)), replace=False)
+    heroes = rng.choice(hero_ids, min(num_heroes, len(hero_ids)), replace=False)[rng.integers(num_heroes, size=len(objects))]
+    order = np.argsort(instance.day_open_arr[objects] + rng.normal(0, 0.7, len(objects)), kind='stable')
+    hero_col, object_col = heroes[order], objects[order]
+
+    if messy:
+        bad_heroes = np.array([0, hero_ids.max() + 1, hero_col[0]])
+        bad_objects = np.array([object_col[1], 0, object_ids.max() + 1])
+        hero_col = np.concatenate([hero_col, bad_heroes, hero_col[:5]])
+        object_col = np.concatenate([object_col, bad_objects, object_col[:5]])
+
+    return pl.DataFrame({'hero_id': hero_col, 'object_id': object_col}, schema={'hero_id': pl.Int64, 'object_id': pl.Int64})
+
+
+def reference_expanded(instance: HeroesInstance, submit: pl.DataFrame) -> pl.DataFrame:
+    """
+    Expanded solution replayed visit by visit with simulate_hero_movement (dict rules of the original evaluator)
+    """
+
+    checked = instance.basic_check(submit)
+    rows = []
+    if len(checked) > 0:
+        routes = checked.group_by('hero_id').agg(pl.col('object_id').alias('route')).sort('hero_id')
+        for hero_id, route in routes.iter_rows():
+            state = {'current_object': 0, 'current_day': 1, 'current_move_points': instance.hero_mp_map.get(hero_id, 0)}
+            for object_id in route:
+                visit = instance.simulate_hero_movement(hero_id, state, object_id)
+                rows.append(visit)
+                state = {'current_object': object_id, 'current_day': visit['day_leave'],
+                         'current_move_points': visit['move_points_leave']}
+    return pl.DataFrame(rows, schema=JOURNEY_SCHEMA)
+
+
+def reference_score(instance: HeroesInstance, submit: pl.DataFrame) -> int:
+    expanded = reference_expanded(instance, submit)
+    if len(expanded) == 0:
+        return 0
+    return int(expanded['reward'].sum() - expanded['hero_id'].max() * HERO_COST)
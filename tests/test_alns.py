@@ -0,0 +1,47 @@
+import numpy as np
+
+from heroes_alns import ALNS, DESTROY_OPERATORS, instance_routes, solve
+from heroes_greedy import GreedyConstructor
+from heroes_solver import routes_to_submit
+from tests.helpers import DATA_PATH
+
+
+def test_set_solution_keeps_routes_as_given(contest, greedy_submit):
+    routes = instance_routes(contest, greedy_submit)
+    # Reversed routes are valid but not what greedy construction would produce
+    routes = {hero_id: route[::-1] for hero_id, route in routes.items()}
+
+    search = ALNS(contest, seed = 0)
+    search.set_solution(routes)
+    assert search.current == routes
+    assert search.current_score == contest.evaluate_solution(routes_to_submit(routes))
+
+
+def test_kept_constructor_repairs_like_a_fresh_one(contest, greedy_submit):
+    search = ALNS(contest, seed = 0)
+    search.set_solution(instance_routes(contest, greedy_submit))
+    rng = np.random.default_rng(1)
+
+    for destroy in DESTROY_OPERATORS.values():
+        for num_remove in (5, 40):
+            destroyed = destroy(search, search.current, num_remove, rng)
+            fresh = GreedyConstructor(contest, initial_heroes = 0).build(destroyed)
+            assert search.repair_constructor(destroyed).build() == fresh
+
+
+def test_constructor_follows_current_solution(contest, greedy_submit):
+    search = ALNS(contest, seed = 3)
+    search.set_solution(instance_routes(contest, greedy_submit))
+    for _ in range(30):
+        search.iterate(temperature = 1000)
+        assert search.constructor.solution() == search.current
+        assert search.current_score == contest.evaluate_solution(routes_to_submit(search.current))
+
+
+def test_solve_reports_round_accept_rate(capsys, contest, greedy_submit):
+    # Segments longer than a round: no segment log rows, the accept rate still comes from the round's iterations
+    submit, score = solve(greedy_submit, DATA_PATH, time_limit = 2, workers = 2, exchange_interval = 1, segment = 10 ** 6)
+
+    assert score == contest.evaluate_solution(submit) >= contest.evaluate_solution(greedy_submit)
+    rates = [float(line.rsplit(' ', 1)[1]) for line in capsys.readouterr().out.splitlines() if 'accept rate' in line]
+    assert len(rates) == 2 and all(0 < rate <= 1 for rate in rates)
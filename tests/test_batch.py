@@ -0,0 +1,21 @@
+from heroes_batch import score_submissions, submission_stats
+
+
+def test_pool_scores_match_in_process(tmp_path, contest, contest_submissions):
+    # The contest fixture is loaded from CSV, so the Polars thread pool is already running when workers start
+    paths = []
+    for i, submit in enumerate(contest_submissions):
+        paths.append(f'{tmp_path}/submit_{i}.csv')
+        submit.write_csv(paths[-1])
+    with open(f'{tmp_path}/submit_bad.csv', 'w') as f:
+        f.write('hero,object\n1,2\n')
+
+    pooled = score_submissions(f'{tmp_path}/submit_*.csv', workers = 2, instance = contest)
+    assert pooled.drop('elapsed').equals(score_submissions(f'{tmp_path}/submit_*.csv', workers = 1, instance = contest).drop('elapsed'))
+
+    rows = {row['file']: row for row in pooled.iter_rows(named = True)}
+    for path, submit in zip(paths, contest_submissions):
+        expected = submission_stats(contest, submit)
+        assert {key: rows[path][key] for key in expected} == expected
+        assert expected['score'] == contest.evaluate_solution(submit)
+    assert rows[f'{tmp_path}/submit_bad.csv']['error'] is not None
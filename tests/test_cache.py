@@ -0,0 +1,72 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import polars as pl
+
+from heroes_cache import CACHE_ARRAYS, SOURCE_FILES, default_cache_path, is_cache_valid, load_cache
+from heroes_utils import HeroesInstance
+from tests.helpers import DATA_PATH
+
+
+def copy_sources(tmp_path) -> str:
+    data_path = f'{tmp_path}/'
+    for name in SOURCE_FILES:
+        shutil.copy(f'{DATA_PATH}{name}', f'{data_path}{name}')
+    return data_path
+
+
+def test_cached_instance_matches_csv(tmp_path, contest, greedy_submit):
+    data_path = copy_sources(tmp_path)
+    cached = HeroesInstance(data_path = data_path, use_cache = True)
+
+    assert is_cache_valid(data_path)
+    for name, values in load_cache(data_path).items():
+        assert isinstance(values, np.memmap), name
+    np.testing.assert_array_equal(cached.dist_full, contest.dist_full)
+    np.testing.assert_array_equal(cached.day_open_arr, contest.day_open_arr)
+    assert cached.evaluate_solution(greedy_submit) == contest.evaluate_solution(greedy_submit)
+
+
+def test_cache_rebuilds_after_source_change(tmp_path, greedy_submit):
+    data_path = copy_sources(tmp_path)
+    before = HeroesInstance(data_path = data_path, use_cache = True).evaluate_solution(greedy_submit)
+
+    objects = pl.read_csv(f'{data_path}data_objects.csv')
+    objects.with_columns(pl.col('reward') * 2).write_csv(f'{data_path}data_objects.csv')
+    assert not is_cache_valid(data_path)
+
+    cached = HeroesInstance(data_path = data_path, use_cache = True)
+    assert is_cache_valid(data_path)
+    assert cached.evaluate_solution(greedy_submit) == HeroesInstance(data_path = data_path).evaluate_solution(greedy_submit)
+    assert cached.evaluate_solution(greedy_submit) > before
+
+
+def test_touched_sources_keep_the_cache(tmp_path):
+    data_path = copy_sources(tmp_path)
+    cache_path = default_cache_path(data_path)
+    load_cache(data_path)
+    built = {name: os.stat(f'{cache_path}{name}.npy').st_mtime_ns for name in CACHE_ARRAYS}
+
+    # Same content, new mtime (e.g. a fresh checkout): content hashes match, arrays are not rewritten
+    os.utime(f'{data_path}dist_objects.csv', ns = (0, 0))
+    assert is_cache_valid(data_path)
+    load_cache(data_path)
+    assert built == {name: os.stat(f'{cache_path}{name}.npy').st_mtime_ns for name in CACHE_ARRAYS}
+
+    with open(f'{cache_path}meta.json') as f:
+        assert json.load(f)['sources']['dist_objects.csv']['mtime_ns'] == 0
+
+
+def test_cache_version_change_invalidates(tmp_path):
+    data_path = copy_sources(tmp_path)
+    cache_path = default_cache_path(data_path)
+    load_cache(data_path)
+
+    with open(f'{cache_path}meta.json') as f:
+        meta = json.load(f)
+    meta['version'] = -1
+    with open(f'{cache_path}meta.json', 'w') as f:
+        json.dump(meta, f)
+    assert not is_cache_valid(data_path)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from scipy.spatial.distance import cdist
+
+from generate_coords import (block_hash, classical_mds, compute_layout, find_warm_start, landmark_mds, layout_params,
+                             layout_stress, smacof, symmetric_distances)
+from generate_instance import generate_arrays
+
+
+def save_layout(layout_path: str, index: dict, key: str, dist_full: np.ndarray, params: dict, created: float,
+                with_block_hash: bool = True) -> np.ndarray:
+    coords = np.random.default_rng(created).random((dist_full.shape[0], 2))
+    np.save(f'{layout_path}{key}.npy', coords)
+    index['layouts'][key] = {'params': params, 'num_nodes': dist_full.shape[0], 'created': created}
+    if with_block_hash:
+        index['layouts'][key]['block_hash'] = block_hash(dist_full, dist_full.shape[0])
+    return coords
+
+
+def test_warm_start_requires_same_leading_distances(tmp_path):
+    layout_path = f'{tmp_path}/'
+    params = layout_params()
+    rng = np.random.default_rng(0)
+    dist_full = rng.integers(1, 100, (8, 8)).astype(np.int32)
+    index = {'layouts': {}, 'outputs': {}}
+
+    small = save_layout(layout_path, index, 'small', dist_full[:4, :4], params, created = 1)
+    changed = dist_full[:6, :6].copy()
+    changed[1, 2] += 1
+    save_layout(layout_path, index, 'changed', changed, params, created = 2)
+    save_layout(layout_path, index, 'unhashed', dist_full[:5, :5], params, created = 3, with_block_hash = False)
+    save_layout(layout_path, index, 'other_params', dist_full[:7, :7], layout_params(max_iter = 10), created = 4)
+
+    # Larger layouts built from other distances (or of unknown origin) are skipped, same distances are reused
+    np.testing.assert_array_equal(find_warm_start(layout_path, index, params, dist_full), small)
+
+    # Objects added after the layout do not matter, changed distances between its nodes do
+    assert find_warm_start(layout_path, index, params, dist_full[:4, :4] + 1) is None
+    np.testing.assert_array_equal(find_warm_start(layout_path, index, params, dist_full.astype(np.int64)), small)
+
+
+@pytest.fixture(scope = 'module')
+def small_dist():
+    return generate_arrays(120, num_heroes = 5, seed = 3)['dist_full']
+
+
+def test_classical_mds_recovers_planar_points():
+    points = np.random.default_rng(0).random((40, 2)) * 100
+    coords = classical_mds(cdist(points, points))
+
+    assert coords.shape == (40, 2)
+    assert layout_stress(cdist(points, points), coords) < 1e-9
+
+
+def test_layouts_shape_and_determinism(small_dist):
+    num_nodes = small_dist.shape[0]
+    dist = symmetric_distances(small_dist)
+    start = classical_mds(dist)
+    refined = smacof(dist, start)
+
+    assert start.shape == refined.shape == (num_nodes, 2)
+    np.testing.assert_array_equal(compute_layout(small_dist), refined)
+    np.testing.assert_array_equal(compute_layout(small_dist, method = 'mds'), start)
+
+    landmarks = landmark_mds(small_dist, 20, seed = 1)
+    assert landmarks.shape == (num_nodes, 2)
+    np.testing.assert_array_equal(landmark_mds(small_dist, 20, seed = 1), landmarks)
+    assert not np.array_equal(landmark_mds(small_dist, 20, seed = 2), landmarks)
+
+    sampled = layout_stress(small_dist, refined, sample_rows = 30, seed = 2)
+    assert sampled == layout_stress(small_dist, refined, sample_rows = 30, seed = 2)
+
+
+def test_smacof_does_not_worsen_classical_mds(small_dist):
+    dist = symmetric_distances(small_dist)
+    start = classical_mds(dist)
+    mds_stress = layout_stress(small_dist, start)
+    smacof_stress = layout_stress(small_dist, smacof(dist, start))
+
+    # Detoured synthetic distances are nearly planar, so every layout fits them well
+    assert smacof_stress <= mds_stress < 0.1
+    assert layout_stress(small_dist, landmark_mds(small_dist, 20, seed = 1)) < 0.1
+    # Stress is scale-free
+    assert layout_stress(small_dist, start * 3) == pytest.approx(mds_stress)
@@ -0,0 +1,76 @@
+import numpy as np
+
+from heroes_delta import RouteDeltaEvaluator
+from heroes_solver import routes_to_submit
+from tests.helpers import random_submission
+
+
+def current_routes(evaluator: RouteDeltaEvaluator) -> dict:
+    return {hero_id: evaluator.route(hero_id) for hero_id in evaluator.states}
+
+
+def random_move(evaluator: RouteDeltaEvaluator, routes: dict, rng: np.random.Generator, num_heroes: int) -> tuple:
+    """
+    Random move as (delta method name, args, expected routes after the move)
+    """
+
+    heroes = sorted(routes)
+    kind = rng.choice(['insert', 'remove', 'relocate', 'swap', 'two_opt'])
+    hero_a, hero_b = (int(h) for h in rng.choice(heroes, 2))
+    route_a, route_b = routes[hero_a], routes[hero_b]
+    expected = {hero_id: list(route) for hero_id, route in routes.items()}
+
+    if kind == 'insert':
+        unassigned = sorted(set(range(1, len(evaluator.day_open))) - set(evaluator.assigned))
+        hero_id = int(rng.integers(1, num_heroes + 1))
+        route = expected.setdefault(hero_id, [])
+        position, object_id = int(rng.integers(len(route) + 1)), int(rng.choice(unassigned))
+        route.insert(position, object_id)
+        return 'delta_insert', (hero_id, position, object_id), expected
+    if kind == 'remove':
+        position = int(rng.integers(len(route_a)))
+        del expected[hero_a][position]
+        return 'delta_remove', (hero_a, position), expected
+    if kind == 'relocate':
+        position_from = int(rng.integers(len(route_a)))
+        object_id = expected[hero_a].pop(position_from)
+        position_to = int(rng.integers(len(expected[hero_b]) + 1))
+        expected[hero_b].insert(position_to, object_id)
+        return 'delta_relocate', (hero_a, position_from, hero_b, position_to), expected
+    if kind == 'swap':
+        position_a, position_b = int(rng.integers(len(route_a))), int(rng.integers(len(route_b)))
+        expected[hero_a][position_a], expected[hero_b][position_b] = route_b[position_b], route_a[position_a]
+        return 'delta_swap', (hero_a, position_a, hero_b, position_b), expected
+    i, j = sorted(int(p) for p in rng.integers(len(route_a), size=2))
+    expected[hero_a][i:j + 1] = route_a[i:j + 1][::-1]
+    return 'delta_two_opt', (hero_a, i, j), expected
+
+
+def test_delta_moves_match_evaluate_solution(contest):
+    evaluator = RouteDeltaEvaluator(contest, random_submission(contest, 1, num_heroes = 8, visits = 120))
+    num_heroes = len(contest.heroes)
+    rng = np.random.default_rng(0)
+    assert evaluator.score == contest.evaluate_solution(evaluator.to_submit())
+
+    for step in range(300):
+        routes = current_routes(evaluator)
+        method, args, expected = random_move(evaluator, routes, rng, num_heroes)
+        expected_score = contest.evaluate_solution(routes_to_submit(expected))
+
+        delta = getattr(evaluator, method)(*args)
+        assert evaluator.score + delta == expected_score, (method, args)
+        if step % 2:
+            assert evaluator.commit() == expected_score
+            assert current_routes(evaluator) == {hero_id: route for hero_id, route in expected.items() if route}
+        else:
+            evaluator.rollback()
+            assert current_routes(evaluator) == routes
+
+    assert evaluator.score == contest.evaluate_solution(evaluator.to_submit())
+
+
+def test_emptying_largest_hero_lowers_hero_cost(contest):
+    evaluator = RouteDeltaEvaluator(contest, routes_to_submit({1: [5, 9], 40: [17]}))
+    expected = contest.evaluate_solution(routes_to_submit({1: [5, 9]}))
+    assert evaluator.score + evaluator.delta_remove(40, 0) == expected
+    assert evaluator.commit() == expected
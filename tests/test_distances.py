@@ -0,0 +1,86 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from generate_instance import CoordinateFallback, generate_arrays
+from heroes_distances import SparseDistances
+from heroes_greedy import GreedyConstructor
+from heroes_utils import HeroesInstance
+from tests.helpers import random_submission
+
+
+def evaluations(instance: HeroesInstance, submit) -> list:
+    """
+    Gold Score of every evaluation engine
+    """
+
+    object_ids, hero_offsets = instance.to_flat_routes(submit)
+    return [instance.evaluate_solution(submit), instance.evaluate_solution_numpy(submit)[0],
+            instance.evaluate_solution(submit, batch_rows = 64), instance.evaluate_flat(object_ids, hero_offsets),
+            int(instance.evaluate_batch([(object_ids, hero_offsets)])[0])]
+
+
+def test_sparse_lookups_match_dense(contest):
+    dense = np.asarray(contest.dist_full)
+    sparse = SparseDistances.from_dense(dense, 8, chunk_rows = 50)
+    rng = np.random.default_rng(0)
+    rows, cols = rng.integers(len(dense), size = 500), rng.integers(len(dense), size = 500)
+
+    np.testing.assert_array_equal(sparse.pairs(rows, cols), dense[rows, cols])
+    np.testing.assert_array_equal(sparse[rows[:20, None], cols[None, :20]], dense[rows[:20, None], cols[None, :20]])
+    assert [sparse.item(i, j) for i, j in zip(rows[:50], cols[:50])] == dense[rows[:50], cols[:50]].tolist()
+    assert sparse.misses > 0
+    np.testing.assert_array_equal(np.asarray(sparse), dense)
+
+
+def test_sparse_contest_scores_match_dense(contest, contest_submissions):
+    arrays = contest.to_arrays()
+    sparse = HeroesInstance.from_arrays(arrays | {'dist_full': SparseDistances.from_dense(arrays['dist_full'], 10)})
+    swapped = HeroesInstance.from_arrays(arrays)
+    with pytest.warns(UserWarning, match = 'stays in RAM'):
+        swapped.use_sparse_distances(10)
+
+    for instance in (sparse, swapped):
+        assert isinstance(instance.dist_full, SparseDistances)
+        for submit in contest_submissions:
+            assert evaluations(instance, submit) == [contest.evaluate_solution(submit)] * 5
+
+
+def test_sparse_generated_instance_matches_dense():
+    dense = HeroesInstance.from_arrays(generate_arrays(200, num_heroes = 20, seed = 3))
+    sparse = HeroesInstance.from_arrays(generate_arrays(200, num_heroes = 20, seed = 3, sparse_k = 12))
+    assert isinstance(sparse.dist_full, SparseDistances)
+    np.testing.assert_array_equal(np.asarray(sparse.dist_full), dense.dist_full)
+
+    for seed in range(3):
+        submit = random_submission(dense, seed, num_heroes = 10, visits = 120)
+        assert evaluations(sparse, submit) == evaluations(dense, submit)
+
+    # Constructors see the same distances, so they build the same routes
+    assert GreedyConstructor(sparse).build() == GreedyConstructor(dense).build()
+
+
+def test_sparse_fallback_warning(contest, tmp_path):
+    arrays = contest.to_arrays()
+    np.save(tmp_path / 'dist_full.npy', arrays['dist_full'])
+    mapped = HeroesInstance.from_arrays(arrays | {'dist_full': np.load(tmp_path / 'dist_full.npy', mmap_mode = 'r')})
+    in_memory = HeroesInstance.from_arrays(arrays)
+
+    # A memory map or an explicit fallback keeps the dense matrix out of RAM, no warning
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        mapped.use_sparse_distances(10)
+        in_memory.use_sparse_distances(10, fallback = lambda rows, cols: np.asarray(arrays['dist_full'][rows, cols]))
+    assert isinstance(mapped.dist_full, SparseDistances) and isinstance(in_memory.dist_full, SparseDistances)
+
+
+def test_coordinate_fallback_matches_dense():
+    dense = generate_arrays(200, num_heroes = 20, seed = 3)['dist_full']
+    fallback = generate_arrays(200, num_heroes = 20, seed = 3, sparse_k = 12)['dist_full'].fallback
+    assert isinstance(fallback, CoordinateFallback)
+
+    rng = np.random.default_rng(0)
+    rows, cols = rng.integers(len(dense), size = 1000), rng.integers(len(dense), size = 1000)
+    np.testing.assert_array_equal(fallback(rows, cols), dense[rows, cols])
+    np.testing.assert_array_equal(fallback(np.arange(len(dense))[:, None], np.arange(len(dense))[None, :]), dense)
@@ -0,0 +1,100 @@
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from heroes_utils import HeroJourney
+from tests.helpers import reference_expanded, reference_score
+
+
+def test_numpy_engine_matches_evaluate_solution(contest, contest_submissions):
+    for submit in contest_submissions:
+        score, columns = contest.evaluate_solution_numpy(submit)
+        assert score == contest.evaluate_solution(submit) == reference_score(contest, submit)
+        assert_frame_equal(pl.DataFrame(columns), reference_expanded(contest, submit))
+
+    assert contest.evaluate_solution_numpy(contest_submissions[0].head(0)) == (0, {})
+
+
+def test_expand_solution_matches_reference(contest, contest_submissions):
+    for submit in contest_submissions:
+        checked = contest.basic_check(submit)
+        reference = reference_expanded(contest, submit)
+        assert_frame_equal(contest.expand_solution(checked), reference)
+        assert_frame_equal(contest.expand_solution(checked, remove_out_of_time = True),
+                           reference.filter(pl.col('day_arrive') <= 7))
+        assert contest.evaluate_solution(submit) == reference_score(contest, submit)
+
+
+def test_hero_journey_rows_match_simulate_hero_movement(contest, greedy_submit):
+    routes = greedy_submit.group_by('hero_id', maintain_order = True).agg('object_id').rows()
+    journey = HeroJourney(len(greedy_submit))
+    for hero_id, route in routes:
+        rows = contest.hero_journey(hero_id, route)
+        assert rows == reference_expanded(contest, pl.DataFrame({'hero_id': [hero_id] * len(route), 'object_id': route})).to_dicts()
+        contest.hero_journey_arrays(hero_id, route, out = journey)
+
+    # Appending into one block gives the concatenated journeys
+    assert journey.to_dicts() == [row for hero_id, route in routes for row in contest.hero_journey(hero_id, route)]
+
+
+def test_flat_routes_match_evaluate_solution(contest, contest_submissions):
+    for submit in contest_submissions:
+        object_ids, hero_offsets = contest.to_flat_routes(submit)
+        assert len(hero_offsets) == len(contest.heroes) + 1
+        assert contest.evaluate_flat(object_ids, hero_offsets, check = True) == contest.evaluate_solution(submit)
+
+        # Round trip keeps every route (hero order is normalized)
+        round_trip = contest.from_flat_routes(object_ids, hero_offsets)
+        assert_frame_equal(round_trip, contest.basic_check(submit).sort('hero_id', maintain_order = True),
+                           check_dtypes = False)
+
+
+def test_flat_check_rejects_invalid_routes(contest, greedy_submit):
+    object_ids, hero_offsets = contest.to_flat_routes(greedy_submit)
+    duplicated = object_ids.copy()
+    duplicated[1] = duplicated[0]
+    with pytest.raises(ValueError, match = 'Duplicate'):
+        contest.evaluate_flat(duplicated, hero_offsets, check = True)
+
+    out_of_range = object_ids.copy()
+    out_of_range[0] = len(contest.day_open_arr)
+    with pytest.raises(ValueError, match = 'Out-of-range'):
+        contest.evaluate_flat(out_of_range, hero_offsets, check = True)
+
+    with pytest.raises(ValueError, match = 'hero_offsets'):
+        contest.evaluate_flat(object_ids, hero_offsets[::-1], check = True)
+
+
+def padded_routes(instance, submissions: list) -> np.ndarray:
+    """
+    Padded (solutions x heroes x max route length) encoding of submissions, see batch_lanes
+    """
+
+    flat = [instance.to_flat_routes(submit) for submit in submissions]
+    max_length = max(int(np.diff(hero_offsets).max()) for _, hero_offsets in flat)
+    routes = np.zeros((len(flat), len(instance.heroes), max_length), dtype=np.int32)
+    for solution, (object_ids, hero_offsets) in enumerate(flat):
+        for row, (start, end) in enumerate(zip(hero_offsets[:-1], hero_offsets[1:])):
+            routes[solution, row, :end - start] = object_ids[start:end]
+    return routes
+
+
+def test_batch_matches_evaluate_solution(contest, contest_submissions):
+    expected = [contest.evaluate_solution(submit) for submit in contest_submissions]
+    flat = [contest.to_flat_routes(submit) for submit in contest_submissions]
+
+    assert [contest.evaluate_flat(*solution) for solution in flat] == expected
+    assert contest.evaluate_batch(flat, check = True).tolist() == expected
+    assert contest.evaluate_batch(padded_routes(contest, contest_submissions), check = True).tolist() == expected
+
+
+def test_batch_empty_solutions(contest, greedy_submit):
+    empty = contest.to_flat_routes(greedy_submit.head(0))
+    assert contest.evaluate_batch([]).tolist() == []
+    assert contest.evaluate_batch([empty, contest.to_flat_routes(greedy_submit), empty]).tolist() == \
+        [0, contest.evaluate_solution(greedy_submit), 0]
+    assert contest.evaluate_batch(np.zeros((2, len(contest.heroes), 3), dtype=np.int32)).tolist() == [0, 0]
+
+    with pytest.raises(ValueError, match = 'Padded routes'):
+        contest.evaluate_batch(np.zeros((2, 3), dtype=np.int32))
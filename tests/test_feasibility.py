@@ -0,0 +1,52 @@
+import numpy as np
+
+from heroes_feasibility import FeasibilityIndex
+from heroes_utils import simulate_transition
+
+
+def brute_force_successors(instance, object_id: int, hero_id: int, move_points_left: int, day: int) -> set:
+    """
+    Objects reached on time (or early) straight after object_id under the simulation rules
+    """
+
+    capacity = int(instance.hero_mp_arr[hero_id])
+    day_open = instance.day_open_arr
+    successors = set()
+    for target in instance.objects['object_id'].to_list():
+        if target == object_id or day_open[target] < day_open[object_id]:
+            continue
+        if object_id == 0:
+            start_day, start_move_points = day_open[target], capacity
+        else:
+            start_day, start_move_points = day, move_points_left
+        day_arrive = simulate_transition(capacity, start_day, start_move_points, int(instance.dist_full[object_id, target]),
+                                         int(day_open[target]), 1)[0]
+        if day_arrive <= day_open[target]:
+            successors.add(target)
+    return successors
+
+
+def test_feasible_successors_match_brute_force(synthetic):
+    index = FeasibilityIndex(synthetic)
+    rng = np.random.default_rng(0)
+    hero_ids = synthetic.heroes['hero_id'].to_numpy()
+
+    for _ in range(200):
+        object_id = int(rng.integers(len(synthetic.day_open_arr)))
+        hero_id = int(rng.choice(hero_ids))
+        day = int(synthetic.day_open_arr[object_id]) + int(rng.integers(0, 2))
+        move_points_left = int(rng.integers(0, synthetic.hero_mp_arr[hero_id] + 1))
+
+        successors = index.feasible_successors(object_id, hero_id, move_points_left, day)
+        assert len(successors) == len(set(successors.tolist()))
+        assert set(successors.tolist()) == brute_force_successors(synthetic, object_id, hero_id, move_points_left, day)
+        # Nearest first
+        assert np.all(np.diff(synthetic.dist_full[object_id, successors]) >= 0)
+
+
+def test_depot_reachability(synthetic):
+    index = FeasibilityIndex(synthetic)
+    for hero_id in synthetic.heroes['hero_id'].to_list()[:5]:
+        reachable = [object_id for object_id in synthetic.objects['object_id'].to_list()
+                     if index.reachable_from_depot(hero_id, object_id)]
+        assert set(reachable) == brute_force_successors(synthetic, 0, hero_id, 0, 1)
@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import polars as pl
+
+from generate_instance import generate_arrays, generate_instance, write_dist_csv
+from heroes_cache import is_cache_valid
+from heroes_utils import HeroesInstance
+from tests.helpers import random_submission
+
+
+def assert_same_instance(instance: HeroesInstance, arrays: dict):
+    np.testing.assert_array_equal(instance.dist_full, arrays['dist_full'])
+    np.testing.assert_array_equal(instance.hero_mp_arr[arrays['hero_id']], arrays['move_points'])
+    np.testing.assert_array_equal(instance.day_open_arr[arrays['object_id']], arrays['day_open'])
+
+
+def test_generated_formats_load_the_same_instance(tmp_path):
+    arrays = generate_arrays(150, num_heroes = 12, clusters = 4, seed = 3)
+    for matrix_format in ('csv', 'binary', 'both'):
+        data_path = generate_instance(f'{tmp_path}/{matrix_format}', 150, num_heroes = 12, clusters = 4, seed = 3,
+                                      matrix_format = matrix_format)
+        instance = HeroesInstance(data_path = data_path, use_cache = True)
+        assert is_cache_valid(data_path)
+        assert os.path.exists(f'{data_path}dist_objects.csv') == (matrix_format != 'binary')
+        assert_same_instance(instance, arrays)
+
+
+def test_regenerating_replaces_the_cache(tmp_path):
+    generate_instance(f'{tmp_path}/instance', 150, num_heroes = 12, seed = 1, matrix_format = 'binary')
+    HeroesInstance(data_path = f'{tmp_path}/instance/', use_cache = True)
+
+    # Another seed in binary form, then back to CSV only: the cache always follows the latest files
+    data_path = generate_instance(f'{tmp_path}/instance', 150, num_heroes = 12, seed = 2, matrix_format = 'binary')
+    assert_same_instance(HeroesInstance(data_path = data_path, use_cache = True), generate_arrays(150, num_heroes = 12, seed = 2))
+    data_path = generate_instance(f'{tmp_path}/instance', 150, num_heroes = 12, seed = 4, matrix_format = 'csv')
+    assert not is_cache_valid(data_path)
+    assert_same_instance(HeroesInstance(data_path = data_path, use_cache = True), generate_arrays(150, num_heroes = 12, seed = 4))
+
+
+def test_matrix_csv_added_to_binary_instance_takes_over(tmp_path):
+    data_path = generate_instance(f'{tmp_path}/instance', 150, num_heroes = 12, seed = 6, matrix_format = 'binary')
+    instance = HeroesInstance(data_path = data_path, use_cache = True)
+
+    dist_full = np.asarray(instance.dist_full).copy()
+    dist_full[1:, 1:] += 1
+    write_dist_csv(dist_full, f'{data_path}dist_objects.csv')
+    assert not is_cache_valid(data_path)
+    np.testing.assert_array_equal(HeroesInstance(data_path = data_path, use_cache = True).dist_full, dist_full)
+
+
+def test_binary_instance_follows_edited_csvs(tmp_path):
+    data_path = generate_instance(f'{tmp_path}/instance', 150, num_heroes = 12, seed = 5, matrix_format = 'binary')
+    before = HeroesInstance(data_path = data_path, use_cache = True)
+    submit = random_submission(before, 0, num_heroes = 5, visits = 80)
+
+    objects = pl.read_csv(f'{data_path}data_objects.csv')
+    objects.with_columns(pl.col('reward') * 2).write_csv(f'{data_path}data_objects.csv')
+    dist_start = pl.read_csv(f'{data_path}dist_start.csv')
+    dist_start.with_columns(pl.col('dist_start') + 7).write_csv(f'{data_path}dist_start.csv')
+    assert not is_cache_valid(data_path)
+
+    # Rebuilt without dist_objects.csv, object distances come from the cached matrix
+    after = HeroesInstance(data_path = data_path, use_cache = True)
+    assert is_cache_valid(data_path)
+    np.testing.assert_array_equal(after.reward_arr, before.reward_arr * 2)
+    np.testing.assert_array_equal(after.dist_full[1:, 1:], before.dist_full[1:, 1:])
+    np.testing.assert_array_equal(after.dist_full[0, 1:], np.asarray(before.dist_full[0, 1:]) + 7)
+    np.testing.assert_array_equal(after.dist_full[1:, 0], np.asarray(before.dist_full[1:, 0]) + 7)
+    assert after.evaluate_solution(submit) == after.evaluate_solution_numpy(submit)[0]
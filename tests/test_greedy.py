@@ -0,0 +1,60 @@
+import numpy as np
+
+from generate_instance import generate_arrays
+from heroes_greedy import GreedyConstructor, greedy_solution
+from heroes_solver import routes_to_submit
+from heroes_utils import HeroesInstance
+
+
+def two_object_instance() -> HeroesInstance:
+    """
+    One day, two objects that no single hero can both visit:
+    - object 1 is close to Castle/Depot, heroes 1 and 2 can reach it
+    - object 2 is far, only hero 1 (the only large hero) can reach it
+    Cheapest insertion puts object 1 into hero 1 first and loses object 2, regret places object 2 first
+    """
+
+    return HeroesInstance.from_arrays({
+        'hero_id': np.array([1, 2, 3]),
+        'move_points': np.array([1000, 300, 300]),
+        'object_id': np.array([1, 2]),
+        'day_open': np.array([1, 1]),
+        'reward': np.array([5000, 5000]),
+        'dist_start_object_id': np.array([1, 2]),
+        'dist_start': np.array([200, 500]),
+        'dist_full': np.array([[0, 200, 500], [200, 0, 800], [500, 800, 0]], dtype=np.int32),
+    })
+
+
+def test_regret_places_constrained_object_first():
+    instance = two_object_instance()
+
+    greedy = GreedyConstructor(instance, regret_k = 1, initial_heroes = 2).build()
+    regret = GreedyConstructor(instance, regret_k = 2, initial_heroes = 2).build()
+
+    assert greedy == {1: [1]}
+    assert regret == {1: [2], 2: [1]}
+    assert instance.evaluate_solution(routes_to_submit(regret)) > instance.evaluate_solution(routes_to_submit(greedy))
+
+
+def test_regret_changes_contest_routes(contest):
+    routes = {k: GreedyConstructor(contest, regret_k = k).build() for k in (1, 2, 3)}
+    assert routes[1] != routes[2]
+    assert routes[2] != routes[3]
+
+
+def test_regret_improves_synthetic_scores_on_average():
+    totals = {1: 0, 2: 0}
+    for seed in range(10, 16):
+        instance = HeroesInstance.from_arrays(generate_arrays(700, seed = seed, clusters = 0 if seed % 2 else 8))
+        for k in totals:
+            totals[k] += instance.evaluate_solution(greedy_solution(instance, regret_k = k))
+    assert totals[2] > totals[1]
+
+
+def test_routes_are_on_time(synthetic):
+    routes = GreedyConstructor(synthetic, regret_k = 2).build()
+    submit = routes_to_submit(routes)
+    _, visits = synthetic.evaluate_solution_numpy(submit)
+    assert not visits['is_late'].any()
+    assert len(set(submit['object_id'].to_list())) == len(submit)
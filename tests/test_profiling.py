@@ -0,0 +1,83 @@
+import json
+import time
+
+import pytest
+
+from heroes_profiling import Profiler, stage
+from heroes_utils import HeroesInstance
+
+VISIT_COUNTERS = ['transitions', 'early_arrivals', 'late_arrivals', 'move_points_burned']
+
+
+def profiled(contest, profiler: Profiler) -> HeroesInstance:
+    instance = HeroesInstance.from_arrays(contest.to_arrays())
+    instance.profiler = profiler
+    return instance
+
+
+def test_disabled_profiling_is_a_shared_no_op(contest, greedy_submit):
+    assert stage(None, 'a') is stage(None, 'b')
+    with stage(None, 'a'):
+        pass
+    assert contest.profiler is None
+    assert profiled(contest, None).evaluate_solution(greedy_submit) == contest.evaluate_solution(greedy_submit)
+
+
+def test_stage_timers_and_counters():
+    profiler = Profiler()
+    for _ in range(3):
+        with profiler.stage('outer'):
+            with profiler.stage('inner'):
+                time.sleep(0.002)
+    profiler.count('things')
+    profiler.count('things', 4)
+
+    report = profiler.report()
+    assert list(report['stages']) == ['outer', 'inner']
+    assert report['stages']['inner']['calls'] == 3
+    assert report['stages']['outer']['total_s'] >= report['stages']['inner']['total_s'] >= 0.006
+    assert report['stages']['inner']['max_ms'] >= report['stages']['inner']['mean_ms']
+    assert report['counters'] == {'things': 5}
+    assert 'inner' in profiler.format_report() and 'things' in profiler.format_report()
+
+    profiler.reset()
+    assert profiler.report() == {'stages': {}, 'counters': {}}
+
+
+def test_engines_record_the_same_visit_counters(contest, contest_submissions):
+    counters = {}
+    for engine in ('expand_solution', 'evaluate_solution_numpy', 'evaluate_batch'):
+        profiler = Profiler()
+        instance = profiled(contest, profiler)
+        for submit in contest_submissions:
+            if engine == 'expand_solution':
+                instance.expand_solution(instance.basic_check(submit))
+            elif engine == 'evaluate_solution_numpy':
+                instance.evaluate_solution_numpy(submit)
+            else:
+                instance.evaluate_batch([instance.to_flat_routes(submit)])
+        counters[engine] = {name: profiler.counters[name] for name in VISIT_COUNTERS}
+
+    assert counters['expand_solution']['transitions'] > 0
+    assert counters['evaluate_batch'] == counters['evaluate_solution_numpy'] == counters['expand_solution']
+
+
+def test_write_json_and_chrome_trace(tmp_path, contest, greedy_submit):
+    profiler = Profiler(trace = True)
+    profiled(contest, profiler).evaluate_solution(greedy_submit)
+
+    profiler.write_json(f'{tmp_path}/profile.json')
+    with open(f'{tmp_path}/profile.json') as f:
+        assert json.load(f) == json.loads(json.dumps(profiler.report()))
+
+    profiler.write_chrome_trace(f'{tmp_path}/trace.json')
+    with open(f'{tmp_path}/trace.json') as f:
+        trace = json.load(f)
+    events = trace['traceEvents']
+    assert len(events) == sum(row['calls'] for row in profiler.report()['stages'].values())
+    assert {event['ph'] for event in events} == {'X'}
+    assert all(event['dur'] >= 0 and event['ts'] >= 0 for event in events)
+    assert trace['otherData'] == profiler.counters
+
+    with pytest.raises(ValueError, match = 'trace=False'):
+        Profiler().write_chrome_trace(f'{tmp_path}/none.json')
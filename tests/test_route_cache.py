@@ -0,0 +1,81 @@
+import numpy as np
+
+from heroes_solver import routes_to_submit
+from heroes_utils import HeroesInstance
+from tests.helpers import random_submission
+
+
+def cached_instance(contest, max_size: int = 4096) -> HeroesInstance:
+    instance = HeroesInstance.from_arrays(contest.to_arrays())
+    instance.enable_route_cache(max_size)
+    return instance
+
+
+def test_cached_scores_match_uncached(contest, contest_submissions):
+    instance = cached_instance(contest)
+    for _ in range(2):
+        for submit in contest_submissions:
+            assert instance.evaluate_solution(submit) == contest.evaluate_solution(submit)
+            assert instance.evaluate_solution(submit, batch_rows = 64) == contest.evaluate_solution(submit)
+            checked = contest.basic_check(submit)
+            assert instance.expand_solution(checked).equals(contest.expand_solution(checked))
+
+    stats = instance.route_cache.stats()
+    assert stats['misses'] == len(instance.route_cache) > 0
+    assert stats['hits'] > 2 * stats['misses']
+    assert stats['evictions'] == 0
+
+
+def test_changed_route_is_resimulated(contest, greedy_submit):
+    instance = cached_instance(contest)
+    instance.evaluate_solution(greedy_submit)
+    misses = instance.route_cache.misses
+
+    # Moving one visit between two heroes changes exactly two keys
+    routes = {hero_id: route for hero_id, route in
+              greedy_submit.group_by('hero_id', maintain_order = True).agg('object_id').rows()}
+    hero_a, hero_b = sorted(routes)[:2]
+    routes[hero_b] = routes[hero_b] + [routes[hero_a].pop()]
+    submit = routes_to_submit(routes)
+
+    assert instance.evaluate_solution(submit) == contest.evaluate_solution(submit)
+    assert instance.route_cache.misses == misses + 2
+
+
+def test_invalidate_after_changing_instance_data(contest, greedy_submit):
+    instance = cached_instance(contest)
+    score = instance.evaluate_solution(greedy_submit)
+    hero_id = int(greedy_submit['hero_id'][0])
+
+    # Fewer move points for one hero, stale journeys stay cached until invalidated
+    arrays = contest.to_arrays()
+    arrays['move_points'] = np.where(arrays['hero_id'] == hero_id, 600, arrays['move_points'])
+    changed = HeroesInstance.from_arrays(arrays)
+    instance.hero_mp_map[hero_id] = 600
+    instance.hero_mp_arr[hero_id] = 600
+    assert instance.evaluate_solution(greedy_submit) == score
+
+    instance.invalidate_route_cache(hero_id)
+    assert instance.evaluate_solution(greedy_submit) == changed.evaluate_solution(greedy_submit) < score
+
+    # Reloading arrays clears the whole cache
+    instance.load_arrays(arrays)
+    assert len(instance.route_cache) == 0
+
+
+def test_lru_eviction(contest):
+    instance = cached_instance(contest, max_size = 3)
+    submits = [random_submission(contest, seed, num_heroes = 1, visits = 20) for seed in range(4)]
+    for submit in submits:
+        instance.evaluate_solution(submit)
+
+    cache = instance.route_cache
+    assert len(cache) == 3 and cache.evictions == 1
+    # Oldest route was evicted, the most recent ones are still hits
+    instance.evaluate_solution(submits[3])
+    assert cache.hits == 1
+    instance.evaluate_solution(submits[0])
+    assert cache.misses == 5 and cache.evictions == 2
+
+    instance.route_cache = None
+    assert instance.evaluate_solution(submits[1]) == contest.evaluate_solution(submits[1])
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from heroes_batch import submission_stats
+from heroes_server import ScoringClient, ScoringServer
+
+MAX_REQUEST_BYTES = 1 << 16
+
+
+@pytest.fixture(params = [0, 1], ids = ['thread', 'process'])
+def socket_path(request, tmp_path, contest):
+    """
+    ScoringServer running in the event loop of a background thread, yields its Unix socket path
+    """
+
+    server = ScoringServer(contest, workers = request.param, max_request_bytes = MAX_REQUEST_BYTES)
+    path = f'{tmp_path}/scoring.sock'
+    loop = asyncio.new_event_loop()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(server.serve(socket_path = path))
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target = run, daemon = True)
+    thread.start()
+    # Wait until the socket accepts connections
+    for _ in range(100):
+        try:
+            ScoringClient(path, timeout = 1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+
+    yield path
+
+    loop.call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks(loop)])
+    thread.join(10)
+    loop.close()
+    server.close()
+
+
+def test_ping_and_scores(socket_path, contest, contest_submissions):
+    with ScoringClient(socket_path) as client:
+        ping = client.ping()
+        assert ping['ok'] and ping['requests'] == 0
+
+        for submit in contest_submissions:
+            expected = submission_stats(contest, submit)
+            assert expected['score'] == contest.evaluate_solution(submit)
+
+            response = client.score_submit(submit)
+            assert response['error'] is None
+            assert {key: response[key] for key in expected} == expected
+
+            flat = client.score_flat(*contest.to_flat_routes(submit))
+            assert flat['error'] is None and flat['score'] == expected['score']
+
+        assert client.ping()['requests'] == 2 * len(contest_submissions)
+
+
+def test_bad_requests_keep_the_connection(socket_path, greedy_submit, contest):
+    with ScoringClient(socket_path) as client:
+        for line, error in [(b'{"csv": \n', 'JSONDecodeError'), (b'[1, 2]\n', 'must be a JSON object')]:
+            client.stream.write(line)
+            client.stream.flush()
+            response = json.loads(client.stream.readline())
+            assert response['id'] is None and error in response['error']
+
+        response = client.request({'object_ids': [1]})
+        assert response['score'] is None and "'hero_offsets'" in response['error']
+        response = client.score_csv('hero_id,object_id\nx,y\n')
+        assert response['score'] is None and response['error']
+
+        # Still served after the errors
+        assert client.score_submit(greedy_submit)['score'] == contest.evaluate_solution(greedy_submit)
+
+
+def test_oversized_request_closes_the_connection(socket_path):
+    with ScoringClient(socket_path) as client:
+        # Just over the limit, the server answers before the whole line is read
+        response = client.score_csv('hero_id,object_id\n' + '1,1\n' * (MAX_REQUEST_BYTES // 4))
+        assert 'longer than' in response['error']
+        assert client.stream.readline() == b''
+
+    # Other connections are unaffected
+    with ScoringClient(socket_path) as client:
+        assert client.ping()['ok']
@@ -0,0 +1,43 @@
+from heroes_alns import instance_routes
+from heroes_solver import FIRST_SOLUTION_STRATEGIES, compact_heroes, multi_start_configs, routes_to_submit, solve, solve_routing
+from heroes_utils import HERO_COST
+from tests.helpers import DATA_PATH
+
+
+def test_compact_heroes_keeps_every_route_and_score(contest, greedy_submit):
+    routes = instance_routes(contest, greedy_submit)
+    # Gaps in used hero ids, routes of large capacity heroes may land on heroes that cannot run them
+    spread = {hero_id * 3 + 1: route for hero_id, route in routes.items() if hero_id * 3 + 1 <= len(contest.heroes)}
+
+    compacted = compact_heroes(contest, spread)
+
+    assert sorted(map(tuple, compacted.values())) == sorted(map(tuple, spread.values()))
+    moved_from = {tuple(route): hero_id for hero_id, route in spread.items()}
+    assert all(hero_id <= moved_from[tuple(route)] for hero_id, route in compacted.items())
+    assert max(compacted) < max(spread)
+    assert contest.evaluate_solution(routes_to_submit(compacted)) >= contest.evaluate_solution(routes_to_submit(spread))
+
+
+def test_solve_routing_visits_are_on_time(contest):
+    routes = solve_routing(contest, 12, time_limit = 2, first_solution = 'PARALLEL_CHEAPEST_INSERTION')
+    submit = routes_to_submit(routes)
+
+    assert routes and max(routes) <= 12
+    # Conservative model rounding: every visit collects its reward in the simulation
+    expanded = contest.expand_solution(submit)
+    assert not expanded['is_late'].any()
+    assert contest.evaluate_solution(submit) == expanded['reward'].sum() - max(routes) * HERO_COST
+
+
+def test_multi_start_fleet_sizes():
+    configs = multi_start_configs(12, 100, 20, seed = 1)
+    assert configs[0][0] == 25
+    assert all(20 <= num_heroes <= 30 for num_heroes, _, _ in configs)
+    assert {first_solution for _, first_solution, _ in configs} == set(FIRST_SOLUTION_STRATEGIES)
+    assert all(num_heroes <= 22 for num_heroes, _, _ in multi_start_configs(4, 22, 20))
+
+
+def test_solve_returns_score_of_its_submit(contest):
+    submit, score = solve(DATA_PATH, time_limit = 2, workers = 2, num_starts = 2, verbose = False)
+    assert len(submit) > 0
+    assert score == contest.evaluate_solution(submit)
@@ -0,0 +1,39 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+
+@pytest.mark.parametrize('batch_rows', [1, 37, 100000])
+def test_batches_match_expand_solution(contest, contest_submissions, batch_rows):
+    for submit in contest_submissions:
+        checked = contest.basic_check(submit)
+        expanded = contest.expand_solution(checked)
+        batches = list(contest.iter_expanded(checked, batch_rows))
+
+        assert all(len(batch) > 0 for batch in batches)
+        assert_frame_equal(pl.concat(batches) if batches else expanded, expanded)
+        assert contest.evaluate_solution(submit, batch_rows = batch_rows) == contest.evaluate_solution(submit)
+
+
+def test_scan_expanded_is_lazy_expand_solution(contest, greedy_submit):
+    checked = contest.basic_check(greedy_submit)
+    expanded = contest.expand_solution(checked, remove_out_of_time = True)
+    lazy = contest.scan_expanded(checked, batch_rows = 50, remove_out_of_time = True)
+
+    assert_frame_equal(lazy.collect(), expanded)
+    assert_frame_equal(lazy.filter(pl.col('is_late')).select('hero_id', 'reward').collect(),
+                       expanded.filter(pl.col('is_late')).select('hero_id', 'reward'))
+    assert_frame_equal(lazy.head(10).collect(), expanded.head(10))
+
+
+@pytest.mark.parametrize('name', ['expanded.parquet', 'expanded.arrow'])
+def test_write_expanded_round_trip(tmp_path, contest, greedy_submit, name):
+    checked = contest.basic_check(greedy_submit)
+    path = f'{tmp_path}/{name}'
+    contest.write_expanded(checked, path, batch_rows = 64)
+
+    written = pl.read_parquet(path) if name.endswith('.parquet') else pl.read_ipc(path)
+    assert_frame_equal(written, contest.expand_solution(checked))
+
+    with pytest.raises(ValueError, match = 'Unknown file format'):
+        contest.write_expanded(checked, path, file_format = 'csv')
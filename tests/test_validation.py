@@ -0,0 +1,87 @@
+import polars as pl
+import pytest
+
+from heroes_utils import CHECK_STATUSES, scan_submission
+
+# Rows in file order with the status check_plan gives them
+MESSY_ROWS = [
+    (1, 5, 'ok'),
+    (1, 6, 'ok'),           # day_open 7
+    (1, 10, 'ok'),          # day_open 1, visited after a day 7 object: late, kept with no reward
+    (0, 1, 'unknown_hero'),
+    (101, 20, 'unknown_hero'),
+    (None, 33, 'unknown_hero'),
+    (2, 0, 'out_of_range_object'),
+    (2, 701, 'out_of_range_object'),
+    (2, None, 'out_of_range_object'),
+    (3, 5, 'duplicate_object'),
+    (2, 10, 'duplicate_object'),
+    (2, 1, 'ok'),
+    (None, None, 'unknown_hero'),
+]
+
+
+@pytest.fixture
+def messy():
+    return pl.DataFrame({'hero_id': [row[0] for row in MESSY_ROWS], 'object_id': [row[1] for row in MESSY_ROWS]},
+                        schema = {'hero_id': pl.Int64, 'object_id': pl.Int64})
+
+
+def test_check_plan_statuses(contest, messy):
+    statuses = contest.check_plan(messy).collect()['status'].to_list()
+    assert [CHECK_STATUSES[status] for status in statuses] == [row[2] for row in MESSY_ROWS]
+
+    clean = contest.check_plan(messy, with_status = False).collect()
+    assert clean.rows() == [(hero_id, object_id) for hero_id, object_id, status in MESSY_ROWS if status == 'ok']
+    assert clean.equals(contest.basic_check(messy))
+
+
+@pytest.mark.parametrize('engine', ['in-memory', 'streaming'])
+def test_validation_report(contest, messy, engine):
+    clean, report = contest.validate_submission(messy, engine = engine)
+    assert clean.equals(contest.basic_check(messy))
+    assert report == {
+        'rows': 13, 'kept': 4,
+        'unknown_hero': {'rows': 4, 'ids': [0, 101, None]},
+        'out_of_range_object': {'rows': 3, 'ids': [0, 701, None]},
+        'duplicate_object': {'rows': 2, 'ids': [5, 10]},
+    }
+
+    # Late visits are valid rows, they only lose their reward
+    expanded = contest.expand_solution(clean)
+    assert expanded.filter(pl.col('is_late'))['object_id_to'].to_list() == [10]
+    assert contest.evaluate_submission(messy, engine = engine) == (contest.evaluate_solution(messy), report)
+
+
+def test_report_lists_at_most_report_ids(contest, greedy_submit):
+    doubled = pl.concat([greedy_submit, greedy_submit])
+    _, report = contest.validate_submission(doubled)
+    assert report['rows'] == 2 * len(greedy_submit) and report['kept'] == len(greedy_submit)
+    assert report['duplicate_object']['rows'] == len(greedy_submit)
+    assert report['duplicate_object']['ids'] == greedy_submit['object_id'].head(20).to_list()
+
+
+@pytest.mark.parametrize('name', ['submit.csv', 'submit.parquet', 'submit.arrow'])
+def test_file_scan_matches_evaluate_solution(tmp_path, contest, contest_submissions, messy, name):
+    path = f'{tmp_path}/{name}'
+    for submit in [messy, *contest_submissions]:
+        if name.endswith('.csv'):
+            submit.write_csv(path)
+        elif name.endswith('.parquet'):
+            submit.write_parquet(path)
+        else:
+            submit.write_ipc(path)
+        assert isinstance(scan_submission(path), pl.LazyFrame)
+
+        score, report = contest.evaluate_submission(path)
+        assert score == contest.evaluate_solution(submit)
+        assert report == contest.validate_submission(submit)[1]
+
+        routes, _ = contest.check_routes(path)
+        expected = contest.basic_check(submit).group_by('hero_id', maintain_order = True).agg(pl.col('object_id').alias('route'))
+        assert routes.equals(expected.sort('hero_id'))
+
+
+def test_missing_columns_raise(contest):
+    with pytest.raises(ValueError, match = 'hero_id'):
+        contest.check_plan(pl.DataFrame({'hero': [1], 'object_id': [2]}))
@@ -0,0 +1,122 @@
+import base64
+import json
+import zlib
+
+import numpy as np
+import polars as pl
+import pytest
+
+from generate_visualization import (DAY_LENGTH, EVENT_KINDS, PAGE_DTYPES, encode_columns, package_events,
+                                    package_journeys, package_nodes)
+from tests.helpers import DATA_PATH
+
+
+def decode_columns(payload: str) -> dict:
+    """
+    Python mirror of decodeColumns in the page: typed arrays by column, deltas restored by a running sum
+    """
+
+    columns = {}
+    for name, col in json.loads(payload).items():
+        dtype = np.dtype(PAGE_DTYPES[col['dtype']])
+        if 'values' in col:
+            columns[name] = np.array(col['values'], dtype = dtype)
+            continue
+        data = zlib.decompress(base64.b64decode(col['data']))
+        if 'delta' in col:
+            deltas = np.frombuffer(data, dtype = PAGE_DTYPES[col['delta']])
+            columns[name] = np.cumsum(deltas, dtype = np.int64).astype(dtype)
+        else:
+            columns[name] = np.frombuffer(data, dtype = dtype)
+    return columns
+
+
+@pytest.fixture(scope = 'module')
+def page_data(contest, greedy_submit):
+    detailed_submit = pl.DataFrame(contest.expand_solution_numpy(contest.basic_check(greedy_submit), remove_out_of_time = True))
+    nodes = package_nodes(contest, pl.read_csv(DATA_PATH + 'coords.csv'))
+    journeys = package_journeys(contest, detailed_submit)
+    events = package_events(journeys, int(journeys['time_leave'].max()))
+    return {'nodes': nodes, 'journeys': journeys, 'events': events}
+
+
+def test_package_nodes(contest, page_data):
+    nodes = page_data['nodes']
+    coords = pl.read_csv(DATA_PATH + 'coords.csv')
+
+    assert nodes['id'].to_list() == [0] + contest.objects['object_id'].to_list()
+    assert nodes['is_depot'].to_list() == [True] + [False] * len(contest.objects)
+    assert nodes['reward'].to_list()[1:] == contest.objects['reward'].to_list()
+    joined = nodes.join(coords, left_on = 'id', right_on = 'node_id')
+    assert len(joined) == len(nodes)
+    assert np.allclose(joined['x'].to_numpy(), joined['x_right'].to_numpy())
+    assert np.allclose(joined['y'].to_numpy(), joined['y_right'].to_numpy())
+
+
+def test_journeys_match_hero_journey_arrays(contest, greedy_submit, page_data):
+    max_mp = dict(contest.heroes.select('hero_id', 'move_points').iter_rows())
+    expected = []
+    for (hero_id,), route in greedy_submit.group_by('hero_id', maintain_order = True):
+        journey = contest.hero_journey_arrays(hero_id, route['object_id'].to_list())
+        for i in range(len(journey)):
+            row = journey.row(i)
+            if row['day_arrive'] > 7:
+                continue
+            mp = max_mp[hero_id]
+            expected.append((hero_id, row['object_id_from'], row['object_id_to'],
+                             (row['day_start'] - 1) * DAY_LENGTH + mp - row['move_points_start'],
+                             (row['day_arrive'] - 1) * DAY_LENGTH + mp - row['move_points_arrive'],
+                             (row['day_leave'] - 1) * DAY_LENGTH + mp - row['move_points_leave'],
+                             row['reward'], row['is_late']))
+
+    journeys = page_data['journeys'].select('hero_id', 'from', 'to', 'time_start', 'time_arrive', 'time_leave',
+                                            'reward', 'is_late')
+    assert sorted(journeys.rows()) == sorted(expected)
+
+
+def test_events_match_journeys(page_data):
+    journeys, events = page_data['journeys'], page_data['events']
+    kind = {name: code for code, name in enumerate(EVENT_KINDS)}
+    max_time = int(journeys['time_leave'].max())
+
+    expected = [(day * DAY_LENGTH, kind['day'], day + 1) for day in range(1, max_time // DAY_LENGTH + 1)]
+    for index, (time_start, time_arrive, time_leave) in enumerate(journeys.select('time_start', 'time_arrive', 'time_leave').iter_rows()):
+        expected += [(time_start, kind['depart'], index), (time_leave, kind['visit'], index),
+                     (time_arrive + 1, kind['arrive'], index), (time_leave + 1, kind['rest'], index)]
+
+    assert events.rows() == sorted(expected)
+    assert all(journeys['time_start'] <= journeys['time_arrive']) and all(journeys['time_arrive'] <= journeys['time_leave'])
+
+
+@pytest.mark.parametrize('table', ['nodes', 'journeys', 'events'])
+def test_binary_payload_decodes_to_json_columns(page_data, table):
+    df = page_data[table]
+    from_json = decode_columns(encode_columns(df, 'json'))
+    from_binary = decode_columns(encode_columns(df, 'binary'))
+
+    assert list(from_binary) == df.columns
+    for name in df.columns:
+        assert from_binary[name].dtype == from_json[name].dtype
+        assert np.array_equal(from_binary[name], from_json[name])
+        assert np.allclose(from_json[name], df[name].to_numpy().astype(np.float64), atol = 1e-3)
+
+
+def test_binary_payload_is_smaller(page_data):
+    json_size = sum(len(encode_columns(df, 'json')) for df in page_data.values())
+    binary_size = sum(len(encode_columns(df, 'binary')) for df in page_data.values())
+    assert binary_size * 3 < json_size
+
+
+def test_binary_payload_edge_columns():
+    for values in ([], [7]):
+        df = pl.DataFrame({'ids': pl.Series(values, dtype = pl.Int64)})
+        assert decode_columns(encode_columns(df, 'binary'))['ids'].tolist() == values
+
+    df = pl.DataFrame({'falling': [30000, 5, -20000], 'flags': [True, False, True], 'x': [0.5, -1.25, 3.0]})
+    decoded = decode_columns(encode_columns(df, 'binary'))
+    assert decoded['falling'].tolist() == [30000, 5, -20000]
+    assert decoded['flags'].tolist() == [1, 0, 1]
+    assert decoded['x'].tolist() == [0.5, -1.25, 3.0]
+
+    with pytest.raises(ValueError):
+        encode_columns(df, 'msgpack')